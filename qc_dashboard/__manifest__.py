@@ -11,13 +11,15 @@
     - Analytics en temps réel
     """,
     'category': 'Dashboard',
-    'depends': ['base', 'web'],
+    'depends': ['base', 'web', 'bus', 'workprogramm'],
     'data': [
         # 'views/kpi_card_views.xml',
         # 'qc_dashboard/static/src/xml/templates.xml',
         # 'qc_dashboard/static/src/xml/kpi_card.xml',
         'views/kpi_card_views.xml',
         # 'views/user_kpi_dashboard.xml',
+        'security/security.xml',
+        'data/ir_cron_data.xml',
 
     ],
     'assets': {
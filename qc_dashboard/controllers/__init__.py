@@ -1,3 +1 @@
-
-from . import card_controller
-from . import evaluation_controller
\ No newline at end of file
+from . import work_program_dashboard
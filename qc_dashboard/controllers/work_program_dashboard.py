@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo import http
+from odoo.http import request
+
+_logger = logging.getLogger(__name__)
+
+
+class WorkProgramDashboardController(http.Controller):
+
+    @http.route('/dashboard/kpis', type='json', auth='user')
+    def work_program_kpis(self, date_from=None, date_to=None, project_id=None, department_id=None,
+                          responsible_id=None, **kw):
+        """
+        Retourne l'ensemble des KPI du dashboard (compteurs, moyenne de
+        complétion, reports, répartition à temps / en retard) en une requête.
+        """
+        filters = dict(date_from=date_from, date_to=date_to, project_id=project_id,
+                       department_id=department_id, responsible_id=responsible_id)
+        try:
+            kpis = request.env['work.program.dashboard.cache'].fetch(
+                'kpis', filters, lambda: request.env['work.program'].get_dashboard_kpis(**filters))
+            return dict(kpis, error=False)
+        except Exception as e:
+            _logger.error(f"Erreur lors du calcul des KPI du dashboard : {e}", exc_info=True)
+            return {'error': True, 'message': str(e)}
+
+    @http.route('/dashboard/work_program_grid', type='json', auth='user')
+    def work_program_grid(self, date_from=None, date_to=None, project_id=None, department_id=None,
+                          responsible_id=None, start_row=0, end_row=100, sort_model=None, filter_model=None, **kw):
+        """
+        Page de la grille (modèle de lignes AG Grid 'infinite') : pagination
+        offset/limit, tri et filtres appliqués en SQL, avec le nombre total de lignes.
+        """
+        params = dict(start_row=start_row, end_row=end_row, sort_model=sort_model, filter_model=filter_model,
+                      date_from=date_from, date_to=date_to, project_id=project_id,
+                      department_id=department_id, responsible_id=responsible_id)
+        try:
+            result = request.env['work.program.dashboard.cache'].fetch(
+                'grid', params, lambda: request.env['work.program'].get_dashboard_grid(**params))
+            return dict(result, error=False)
+        except Exception as e:
+            _logger.error(f"Erreur lors du chargement de la grille du dashboard : {e}", exc_info=True)
+            return {'error': True, 'message': str(e)}
+
+    @http.route('/dashboard/changes', type='json', auth='user')
+    def work_program_changes(self, since=None, date_from=None, date_to=None, project_id=None, department_id=None,
+                             responsible_id=None, **kw):
+        """
+        Lignes de la grille créées / modifiées et ids supprimés depuis le
+        curseur `since`, avec le nouveau curseur (synchronisation incrémentale).
+        """
+        try:
+            result = request.env['work.program'].get_dashboard_changes(
+                since=since, date_from=date_from, date_to=date_to, project_id=project_id,
+                department_id=department_id, responsible_id=responsible_id,
+            )
+            return dict(result, error=False)
+        except Exception as e:
+            _logger.error(f"Erreur lors de la synchronisation du dashboard : {e}", exc_info=True)
+            return {'error': True, 'message': str(e)}
+
+    def _distribution(self, dimension, key, **filters):
+        """ Réponse commune des endpoints de répartition : {key: {'labels', 'values'}}. """
+        try:
+            data = request.env['work.program.dashboard.cache'].fetch(
+                f'distribution_{dimension}', filters,
+                lambda: request.env['work.program'].get_dashboard_distribution(dimension, **filters))
+            return {key: data, 'error': False}
+        except Exception as e:
+            _logger.error(f"Erreur lors du calcul de la répartition '{dimension}' du dashboard : {e}", exc_info=True)
+            return {'error': True, 'message': str(e)}
+
+    @http.route('/dashboard/work_program_status_distribution', type='json', auth='user')
+    def work_program_status_distribution(self, date_from=None, date_to=None, project_id=None, department_id=None,
+                                         responsible_id=None, **kw):
+        """ Répartition des programmes par statut (non démarré / en cours / terminé). """
+        return self._distribution('status', 'status_data', date_from=date_from, date_to=date_to,
+                                  project_id=project_id, department_id=department_id, responsible_id=responsible_id)
+
+    @http.route('/dashboard/work_program_complexity_distribution', type='json', auth='user')
+    def work_program_complexity_distribution(self, date_from=None, date_to=None, project_id=None,
+                                             department_id=None, responsible_id=None, **kw):
+        """ Répartition des programmes par complexité. """
+        return self._distribution('complexity', 'complexity_data', date_from=date_from, date_to=date_to,
+                                  project_id=project_id, department_id=department_id, responsible_id=responsible_id)
+
+    @http.route('/dashboard/work_program_priority_distribution', type='json', auth='user')
+    def work_program_priority_distribution(self, date_from=None, date_to=None, project_id=None,
+                                           department_id=None, responsible_id=None, **kw):
+        """ Répartition des programmes par priorité. """
+        return self._distribution('priority', 'priority_data', date_from=date_from, date_to=date_to,
+                                  project_id=project_id, department_id=department_id, responsible_id=responsible_id)
+
+    @http.route('/dashboard/work_program_state_distribution', type='json', auth='user')
+    def work_program_state_distribution(self, date_from=None, date_to=None, project_id=None, department_id=None,
+                                        responsible_id=None, **kw):
+        """ Répartition des programmes par état du workflow. """
+        return self._distribution('state', 'state_data', date_from=date_from, date_to=date_to,
+                                  project_id=project_id, department_id=department_id, responsible_id=responsible_id)
+
+    @http.route('/dashboard/cache_stats', type='json', auth='user')
+    def dashboard_cache_stats(self, **kw):
+        """ Taux de succès et latences du cache des réponses du dashboard (worker courant). """
+        if not request.env['work.program'].get_user_permissions()['is_manager_or_admin']:
+            return {'error': True, 'message': "Accès réservé aux managers et administrateurs."}
+        return dict(request.env['work.program.dashboard.cache'].get_cache_stats(), error=False)
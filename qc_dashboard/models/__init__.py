@@ -1,2 +1,8 @@
 from . import qc_dashboard
+from . import work_program_daily_stat
+from . import work_program_tombstone
+from . import work_program_dashboard
+from . import work_program_dashboard_cache
+from . import work_program_dashboard_bus
+from . import work_program_benchmark
 # from . import sale_order
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from dateutil.relativedelta import relativedelta
+
+from odoo import models, api, fields
+
+
+class WorkProgramBenchmark(models.AbstractModel):
+    """ Ajoute à l'audit des plans les requêtes SQL directes du dashboard. """
+    _inherit = 'work.program.benchmark'
+
+    @api.model
+    def _get_benchmark_cases(self, samples):
+        cases = super()._get_benchmark_cases(samples)
+        WorkProgram = self.env['work.program']
+        today = fields.Date.context_today(self)
+        periods = [
+            ('dashboard_mois', {'date_from': today.replace(day=1), 'date_to': today}),
+            ('dashboard_trimestre', {'date_from': today - relativedelta(months=3), 'date_to': today}),
+        ]
+        for name, filters in periods:
+            cases.append((f'{name}_kpis', *WorkProgram._dashboard_kpis_sql(**filters)))
+            cases.append((f'{name}_grille', *WorkProgram._dashboard_grid_sql(0, 100, **filters)))
+        employee = self.env['hr.employee'].sudo().search([('user_id', '=', samples['user_id'])], limit=1)
+        if employee:
+            filters = {'responsible_id': employee.id}
+            cases.append(('dashboard_responsable_kpis', *WorkProgram._dashboard_kpis_sql(**filters)))
+            cases.append(('dashboard_responsable_grille', *WorkProgram._dashboard_grid_sql(0, 100, **filters)))
+        return cases
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo import models, api, fields
+
+_logger = logging.getLogger(__name__)
+
+# Clé de cr.precommit.data sous laquelle sont accumulés les jours à recalculer
+PENDING_DAYS_KEY = 'work_program_daily_stat.days'
+
+# Champs de work.program dont la modification change les agrégats
+STAT_SOURCE_FIELDS = {
+    'assignment_date', 'project_id', 'responsible_id', 'state', 'priority', 'complexity',
+    'duration_effort', 'completion_percentage', 'nb_postpones', 'initial_deadline', 'actual_deadline',
+}
+
+# Agrégation d'un ensemble de jours (ou de toute la table si la condition est TRUE)
+STAT_INSERT_QUERY = """
+    INSERT INTO work_program_daily_stat
+           (day, department_id, project_id, responsible_id, state, priority, complexity,
+            program_count, effort_sum, completion_sum, postpone_sum, on_time_count, late_count)
+    SELECT wp.assignment_date, emp.department_id, wp.project_id, wp.responsible_id,
+           wp.state, wp.priority, wp.complexity,
+           COUNT(*),
+           COALESCE(SUM(wp.duration_effort), 0),
+           COALESCE(SUM(wp.completion_percentage), 0),
+           COALESCE(SUM(wp.nb_postpones), 0),
+           COUNT(*) FILTER (WHERE wp.actual_deadline <= wp.initial_deadline),
+           COUNT(*) FILTER (WHERE wp.actual_deadline > wp.initial_deadline)
+      FROM work_program wp
+      LEFT JOIN hr_employee emp ON emp.id = wp.responsible_id
+     WHERE {condition}
+     GROUP BY wp.assignment_date, emp.department_id, wp.project_id, wp.responsible_id,
+              wp.state, wp.priority, wp.complexity
+"""
+
+
+class WorkProgramDailyStat(models.Model):
+    """
+    Table de faits pré-agrégée des programmes de travail : une ligne par
+    jour d'assignation × département du responsable × projet × responsable ×
+    état × priorité × complexité. Les programmes sans date d'assignation
+    sont agrégés sur un jour vide, pour que les totaux soient ceux des
+    programmes. Elle est maintenue par les méthodes `_refresh_*`
+    (incrémental à chaque transaction, complet par cron) et ne doit pas être
+    modifiée par l'ORM.
+    """
+    _name = 'work.program.daily.stat'
+    _description = 'Statistiques journalières des programmes de travail'
+    _order = 'day desc'
+    _log_access = False
+
+    day = fields.Date(string='Jour', index=True, readonly=True)
+    department_id = fields.Many2one('hr.department', string='Département', index=True, readonly=True)
+    project_id = fields.Many2one('project.project', string='Projet', index=True, readonly=True)
+    responsible_id = fields.Many2one('hr.employee', string='Responsable', index=True, readonly=True)
+    state = fields.Char(string='État', readonly=True)
+    priority = fields.Char(string='Priorité', readonly=True)
+    complexity = fields.Char(string='Complexité', readonly=True)
+    program_count = fields.Integer(string='Nombre de tâches', readonly=True)
+    effort_sum = fields.Float(string='Effort total (heures)', readonly=True)
+    completion_sum = fields.Float(string='Somme des pourcentages d\'achèvement', readonly=True)
+    postpone_sum = fields.Integer(string='Nombre de reports', readonly=True)
+    on_time_count = fields.Integer(string='Terminées à temps', readonly=True)
+    late_count = fields.Integer(string='Terminées en retard', readonly=True)
+
+    def init(self):
+        # Remplissage initial à l'installation seulement : ensuite, tenue par transaction et par le cron
+        self.env.cr.execute("SELECT 1 FROM work_program_daily_stat LIMIT 1")
+        if not self.env.cr.fetchone():
+            self._refresh_all()
+
+    # -------------------------------------------------------------------------
+    # RAFRAÎCHISSEMENT
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _mark_days(self, days):
+        """
+        Enregistre les jours d'assignation à recalculer (False : programmes
+        sans date). Le recalcul est fait une seule fois, juste avant le
+        commit de la transaction.
+        """
+        days = {day or False for day in days}
+        if not days:
+            return
+        data = self.env.cr.precommit.data
+        if PENDING_DAYS_KEY not in data:
+            data[PENDING_DAYS_KEY] = set()
+            self.env.cr.precommit.add(self.sudo()._refresh_pending_days)
+        data[PENDING_DAYS_KEY].update(days)
+
+    @api.model
+    def _refresh_pending_days(self):
+        days = self.env.cr.precommit.data.pop(PENDING_DAYS_KEY, set())
+        self._refresh_days(days)
+
+    @api.model
+    def _refresh_days(self, days):
+        """ Recalcule les agrégats des jours donnés (suppression puis réinsertion). """
+        dated = tuple(sorted(day for day in days if day))
+        undated = any(not day for day in days)
+        if not dated and not undated:
+            return
+        stat_conditions, program_conditions, params = [], [], []
+        if dated:
+            stat_conditions.append("day IN %s")
+            program_conditions.append("wp.assignment_date IN %s")
+            params.append(dated)
+        if undated:
+            stat_conditions.append("day IS NULL")
+            program_conditions.append("wp.assignment_date IS NULL")
+        self.env['work.program'].flush()
+        self.env.cr.execute(f"DELETE FROM work_program_daily_stat WHERE {' OR '.join(stat_conditions)}", params)
+        self.env.cr.execute(STAT_INSERT_QUERY.format(condition=' OR '.join(program_conditions)), params)
+        self.invalidate_cache()
+
+    @api.model
+    def _update_responsible_departments(self, employees):
+        """
+        Reporte le département courant des responsables sur leurs lignes :
+        le responsable fait partie de la clé d'agrégation, ses lignes n'ont
+        qu'un département.
+        """
+        employees.flush(['department_id'])
+        self.env.cr.execute("""
+            UPDATE work_program_daily_stat stat
+               SET department_id = emp.department_id
+              FROM hr_employee emp
+             WHERE emp.id = stat.responsible_id
+               AND emp.id IN %s
+               AND stat.department_id IS DISTINCT FROM emp.department_id
+        """, [tuple(employees.ids)])
+        self.invalidate_cache()
+
+    @api.model
+    def _refresh_all(self):
+        """ Reconstruit toute la table (cron de sécurité et installation). """
+        self.env['work.program'].flush()
+        self.env.cr.execute("DELETE FROM work_program_daily_stat")
+        self.env.cr.execute(STAT_INSERT_QUERY.format(condition="TRUE"))
+        self.invalidate_cache()
+        _logger.info(f"Statistiques journalières reconstruites : {self.env.cr.rowcount} lignes")
+
+
+class HrEmployee(models.Model):
+    _inherit = 'hr.employee'
+
+    def write(self, vals):
+        result = super().write(vals)
+        if 'department_id' in vals and self:
+            self.env['work.program.daily.stat'].sudo()._update_responsible_departments(self)
+        return result
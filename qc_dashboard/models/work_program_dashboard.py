@@ -0,0 +1,557 @@
+# -*- coding: utf-8 -*-
+import unicodedata
+
+from odoo import models, api, fields
+
+from .work_program_daily_stat import STAT_SOURCE_FIELDS
+
+# Taille de page maximale acceptée par l'endpoint de la grille
+GRID_MAX_PAGE_SIZE = 500
+
+# Colonnes de la grille triables / filtrables : colonne AG Grid -> expression SQL
+GRID_TEXT_COLUMNS = {
+    'project': 'grid_project.name',
+    'description': 'grid_formulation.name',
+    'responsible_display': 'grid_responsible.name',
+}
+GRID_SELECTION_COLUMNS = {
+    'state': '"work_program"."state"',
+    'priority': '"work_program"."priority"',
+    'complexity': '"work_program"."complexity"',
+}
+GRID_DATE_COLUMNS = {
+    'start_date': '"work_program"."assignment_date"',
+    'due_date': '"work_program"."initial_deadline"',
+    'completion_date': '"work_program"."actual_deadline"',
+}
+GRID_SORT_COLUMNS = dict(GRID_TEXT_COLUMNS, **GRID_SELECTION_COLUMNS, **GRID_DATE_COLUMNS)
+
+# États considérés comme clos pour le calcul des tâches en retard
+CLOSED_STATES = ('validated', 'done', 'cancelled')
+
+# Regroupement des états pour le graphique des statuts (libellés attendus par le composant OWL)
+STATUS_LABELS = ['Not Started', 'In Progress', 'Done', 'Unknown']
+STATUS_BY_STATE = {
+    'draft': 'Not Started',
+    'ongoing': 'In Progress',
+    'to_validate': 'In Progress',
+    'refused': 'In Progress',
+    'to_redo': 'In Progress',
+    'incomplete': 'In Progress',
+    'validated': 'Done',
+    'done': 'Done',
+}
+
+# Libellés du graphique des états (le composant OWL les retraduit en clés au clic)
+STATE_LABELS = {
+    'draft': 'Brouillon',
+    'ongoing': 'En cours',
+    'to_validate': 'À valider',
+    'validated': 'Validé',
+    'refused': 'Refusé',
+    'to_redo': 'À refaire',
+    'incomplete': 'Inachevé',
+    'done': 'Terminé',
+    'cancelled': 'Annulé',
+}
+
+# Synchronisation incrémentale : lignes par réponse
+CHANGES_MAX_ROWS = GRID_MAX_PAGE_SIZE
+
+# Dimensions de répartition : dimension -> colonne groupée
+DISTRIBUTION_COLUMNS = {
+    'status': 'state',
+    'state': 'state',
+    'priority': 'priority',
+    'complexity': 'complexity',
+}
+
+
+def _normalize(text):
+    """ Minuscules sans accents, pour comparer un filtre aux libellés affichés. """
+    return ''.join(c for c in unicodedata.normalize('NFD', str(text or '')) if unicodedata.category(c) != 'Mn').lower()
+
+
+class WorkProgram(models.Model):
+    _inherit = 'work.program'
+
+    def init(self):
+        super().init()
+        # Transaction de la dernière création / modification de chaque ligne, tenue par trigger
+        # (ORM, COPY du générateur, SQL direct) : curseur de la synchronisation incrémentale
+        self.env.cr.execute("ALTER TABLE work_program ADD COLUMN IF NOT EXISTS change_txid BIGINT")
+        self.env.cr.execute("""
+            CREATE OR REPLACE FUNCTION work_program_set_change_txid() RETURNS trigger AS $$
+            BEGIN
+                NEW.change_txid := txid_current();
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        self.env.cr.execute("""
+            SELECT 1 FROM pg_trigger
+             WHERE tgname = 'work_program_change_txid' AND tgrelid = 'work_program'::regclass
+        """)
+        if not self.env.cr.fetchone():
+            self.env.cr.execute("""
+                CREATE TRIGGER work_program_change_txid BEFORE INSERT OR UPDATE ON work_program
+                FOR EACH ROW EXECUTE PROCEDURE work_program_set_change_txid()
+            """)
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS work_program_change_txid_id_idx ON work_program (change_txid, id)
+        """)
+
+    # -------------------------------------------------------------------------
+    # MAINTENANCE DES STATISTIQUES JOURNALIÈRES
+    # -------------------------------------------------------------------------
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['work.program.daily.stat']._mark_days(records.mapped('assignment_date'))
+        self.env['work.program.dashboard.notifier']._mark_changes(records)
+        return records
+
+    def write(self, vals):
+        # Ancien département notifié aussi lorsque le responsable change
+        self.env['work.program.dashboard.notifier']._mark_changes(self)
+        if not STAT_SOURCE_FIELDS.intersection(vals):
+            result = super().write(vals)
+        else:
+            # Les anciens jours d'assignation sont aussi à recalculer si la date change
+            days = set(self.mapped('assignment_date'))
+            result = super().write(vals)
+            self.env['work.program.daily.stat']._mark_days(days | set(self.mapped('assignment_date')))
+        if 'responsible_id' in vals:
+            self.env['work.program.dashboard.notifier']._mark_changes(self)
+        return result
+
+    def unlink(self):
+        days = set(self.mapped('assignment_date'))
+        program_ids = self.ids
+        self.env['work.program.dashboard.notifier']._mark_changes(self)
+        result = super().unlink()
+        self.env['work.program.daily.stat']._mark_days(days)
+        self.env['work.program.tombstone']._log_deletions(program_ids)
+        return result
+
+    # -------------------------------------------------------------------------
+    # FILTRES DU DASHBOARD
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _dashboard_domain(self, date_from=None, date_to=None, project_id=None, department_id=None,
+                          responsible_id=None, program_ids=None):
+        """
+        Domaine correspondant aux filtres du dashboard (mêmes critères que
+        les actions de navigation du composant OWL), éventuellement restreint
+        à `program_ids` (synchronisation incrémentale).
+        """
+        domain = [('id', 'in', list(program_ids))] if program_ids is not None else []
+        # Bornes sur la semaine (index composite semaine / état / département) en
+        # plus du filtre exact sur la date d'assignation
+        if date_from:
+            domain += [('week_start', '>=', self._get_period_buckets(date_from)[0]),
+                       ('assignment_date', '>=', date_from)]
+        if date_to:
+            domain += [('week_start', '<=', date_to), ('assignment_date', '<=', date_to)]
+        if project_id:
+            domain.append(('project_id', '=', int(project_id)))
+        if department_id:
+            domain.append(('responsible_id.department_id', '=', int(department_id)))
+        if responsible_id:
+            domain += ['|', ('responsible_id', '=', int(responsible_id)),
+                       ('support_ids', 'in', [int(responsible_id)])]
+        return domain
+
+    @api.model
+    def _dashboard_query(self, domain):
+        """
+        Traduit un domaine en clauses SQL en appliquant les règles d'accès de
+        l'utilisateur courant.
+
+        :return: (from_clause, where_clause, params)
+        """
+        self.flush()
+        query = self._where_calc(domain)
+        self._apply_ir_rules(query, 'read')
+        from_clause, where_clause, params = query.get_sql()
+        return from_clause, where_clause or 'TRUE', params
+
+    @api.model
+    def _dashboard_use_stats(self, responsible_id=None, **filters):
+        """
+        Les statistiques journalières ne portent ni les supports ni les règles
+        d'accès : elles ne sont utilisées que pour les utilisateurs voyant tous
+        les programmes et sans filtre sur un responsable.
+        """
+        if responsible_id:
+            return False
+        return self.env.is_superuser() or self.get_user_permissions()['is_manager_or_admin']
+
+    @api.model
+    def _dashboard_stat_where(self, date_from=None, date_to=None, project_id=None, department_id=None, **filters):
+        """ Conditions SQL sur work_program_daily_stat équivalentes à `_dashboard_domain`. """
+        conditions, params = ['TRUE'], []
+        if date_from:
+            conditions.append("day >= %s")
+            params.append(date_from)
+        if date_to:
+            conditions.append("day <= %s")
+            params.append(date_to)
+        if project_id:
+            conditions.append("project_id = %s")
+            params.append(int(project_id))
+        if department_id:
+            conditions.append("department_id = %s")
+            params.append(int(department_id))
+        return ' AND '.join(conditions), params
+
+    @api.model
+    def _dashboard_kpis_from_stats(self, **filters):
+        """
+        KPI calculés en sommant les statistiques journalières. Seules les
+        tâches en retard dépendent de la date du jour et sont comptées sur
+        les programmes eux-mêmes.
+        """
+        where_clause, params = self._dashboard_stat_where(**filters)
+        self.env.cr.execute(f"""
+            SELECT COALESCE(SUM(program_count), 0),
+                   COUNT(DISTINCT project_id),
+                   COALESCE(SUM(program_count) FILTER (WHERE state = 'validated'), 0),
+                   COALESCE(SUM(program_count) FILTER (WHERE state = 'to_validate'), 0),
+                   COALESCE(SUM(program_count) FILTER (WHERE state = 'ongoing'), 0),
+                   COALESCE(SUM(postpone_sum), 0),
+                   SUM(completion_sum) / NULLIF(SUM(program_count), 0),
+                   COALESCE(SUM(on_time_count), 0),
+                   COALESCE(SUM(late_count), 0)
+              FROM work_program_daily_stat
+             WHERE {where_clause}
+        """, params)
+        (total, projects, valid, to_validate, in_progress, postpones, completion_mean,
+         on_time, late) = self.env.cr.fetchone()
+        delayed = self.search_count(self._dashboard_domain(**filters) + [
+            ('state', 'not in', CLOSED_STATES),
+            ('initial_deadline', '<', fields.Date.context_today(self)),
+        ])
+        return {
+            'total_tasks': total,
+            'total_projects': projects,
+            'tasks_valid': valid,
+            'tasks_to_validate': to_validate,
+            'in_progress_count': in_progress,
+            'total_reports': postpones,
+            'completion_mean': round(completion_mean or 0.0, 2),
+            'delayed_count': delayed,
+            'on_time_count': on_time,
+            'late_count': late,
+        }
+
+    @api.model
+    def _dashboard_kpis_sql(self, **filters):
+        """
+        Requête groupée des KPI sur les programmes visibles par l'utilisateur
+        (utilisée par `get_dashboard_kpis` et par l'audit des plans de requête).
+
+        :return: (requête, paramètres)
+        """
+        from_clause, where_clause, params = self._dashboard_query(self._dashboard_domain(**filters))
+        today = fields.Date.context_today(self)
+        query = f"""
+            SELECT COUNT(*),
+                   COUNT(DISTINCT "work_program"."project_id"),
+                   COUNT(*) FILTER (WHERE "work_program"."state" = 'validated'),
+                   COUNT(*) FILTER (WHERE "work_program"."state" = 'to_validate'),
+                   COUNT(*) FILTER (WHERE "work_program"."state" = 'ongoing'),
+                   COALESCE(SUM("work_program"."nb_postpones"), 0),
+                   AVG("work_program"."completion_percentage"),
+                   COUNT(*) FILTER (WHERE "work_program"."state" NOT IN %s
+                                      AND "work_program"."initial_deadline" < %s),
+                   COUNT(*) FILTER (WHERE "work_program"."actual_deadline" <= "work_program"."initial_deadline"),
+                   COUNT(*) FILTER (WHERE "work_program"."actual_deadline" > "work_program"."initial_deadline")
+              FROM {from_clause}
+             WHERE {where_clause}
+        """
+        return query, [CLOSED_STATES, today] + params
+
+    @api.model
+    def get_dashboard_kpis(self, **filters):
+        """
+        Calcule tous les compteurs du dashboard : à partir des statistiques
+        journalières lorsque c'est possible, sinon en une seule requête
+        groupée sur les programmes visibles par l'utilisateur.
+        """
+        if self._dashboard_use_stats(**filters):
+            return self._dashboard_kpis_from_stats(**filters)
+        self.env.cr.execute(*self._dashboard_kpis_sql(**filters))
+        (total, projects, valid, to_validate, in_progress, postpones, completion_mean,
+         delayed, on_time, late) = self.env.cr.fetchone()
+        return {
+            'total_tasks': total,
+            'total_projects': projects,
+            'tasks_valid': valid,
+            'tasks_to_validate': to_validate,
+            'in_progress_count': in_progress,
+            'total_reports': postpones,
+            'completion_mean': round(completion_mean or 0.0, 2),
+            'delayed_count': delayed,
+            'on_time_count': on_time,
+            'late_count': late,
+        }
+
+    @api.model
+    def get_dashboard_distribution(self, dimension, **filters):
+        """
+        Répartition des programmes selon `dimension` ('status', 'state',
+        'priority' ou 'complexity') au format des graphiques Plotly.
+
+        :return: {'labels': [...], 'values': [...]}
+        """
+        column = DISTRIBUTION_COLUMNS[dimension]
+        if self._dashboard_use_stats(**filters):
+            where_clause, params = self._dashboard_stat_where(**filters)
+            self.env.cr.execute(f"""
+                SELECT {column}, SUM(program_count)
+                  FROM work_program_daily_stat
+                 WHERE {where_clause}
+                 GROUP BY {column}
+            """, params)
+        else:
+            from_clause, where_clause, params = self._dashboard_query(self._dashboard_domain(**filters))
+            self.env.cr.execute(f"""
+                SELECT "work_program"."{column}", COUNT(*)
+                  FROM {from_clause}
+                 WHERE {where_clause}
+                 GROUP BY "work_program"."{column}"
+            """, params)
+        counts = dict(self.env.cr.fetchall())
+
+        if dimension == 'status':
+            totals = dict.fromkeys(STATUS_LABELS, 0)
+            for state, count in counts.items():
+                totals[STATUS_BY_STATE.get(state, 'Unknown')] += count
+            labels = [label for label in STATUS_LABELS if totals[label]]
+            return {'labels': labels, 'values': [totals[label] for label in labels]}
+
+        # Ordre de la sélection, valeurs vides exclues
+        keys = [key for key, label in self._fields[column]._description_selection(self.env) if counts.get(key)]
+        labels = [STATE_LABELS.get(key, key) for key in keys] if dimension == 'state' else keys
+        return {'labels': labels, 'values': [counts[key] for key in keys]}
+
+    # -------------------------------------------------------------------------
+    # GRILLE PAGINÉE CÔTÉ SERVEUR
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _grid_filter_sql(self, filter_model):
+        """
+        Traduit le filterModel AG Grid en conditions SQL.
+
+        - colonnes texte : 'contains' / 'equals' / 'startsWith' (insensible à la casse)
+        - colonnes de sélection : le texte est comparé à la clé et au libellé
+          affiché (sans accents), comme le faisait le filtre côté client
+        - colonnes date : 'equals' / 'lessThan' / 'greaterThan' / 'inRange'
+
+        :return: (liste de conditions, paramètres)
+        """
+        conditions, params = [], []
+        for column, model in (filter_model or {}).items():
+            value = model.get('filter')
+            if column in GRID_TEXT_COLUMNS and value:
+                operator = model.get('type', 'contains')
+                value = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                pattern = {'equals': '%s', 'startsWith': '%s%%'}.get(operator, '%%%s%%') % value
+                conditions.append(f"{GRID_TEXT_COLUMNS[column]} ILIKE %s")
+                params.append(pattern)
+            elif column in GRID_SELECTION_COLUMNS and value:
+                needle = _normalize(value)
+                exact = model.get('type') == 'equals'
+                keys = [
+                    key for key, label in self._fields[column]._description_selection(self.env)
+                    if any((_normalize(text) == needle) if exact else (needle in _normalize(text))
+                           for text in (key, label))
+                ]
+                conditions.append(f"{GRID_SELECTION_COLUMNS[column]} IN %s" if keys else "FALSE")
+                if keys:
+                    params.append(tuple(keys))
+            elif column in GRID_DATE_COLUMNS and model.get('dateFrom'):
+                expression = GRID_DATE_COLUMNS[column]
+                date_from = model['dateFrom'][:10]
+                operator = model.get('type', 'equals')
+                if operator == 'inRange' and model.get('dateTo'):
+                    conditions.append(f"{expression} BETWEEN %s AND %s")
+                    params += [date_from, model['dateTo'][:10]]
+                else:
+                    sql_operator = {'lessThan': '<', 'greaterThan': '>', 'notEqual': '<>'}.get(operator, '=')
+                    conditions.append(f"{expression} {sql_operator} %s")
+                    params.append(date_from)
+        return conditions, params
+
+    @api.model
+    def _grid_order_sql(self, sort_model):
+        """ Traduit le sortModel AG Grid en clause ORDER BY (colonnes en liste blanche). """
+        terms = [
+            f"{GRID_SORT_COLUMNS[sort['colId']]} {'DESC' if sort.get('sort') == 'desc' else 'ASC'} NULLS LAST"
+            for sort in (sort_model or []) if sort.get('colId') in GRID_SORT_COLUMNS
+        ]
+        return ', '.join(terms + ['"work_program"."id" DESC'])
+
+    @api.model
+    def _dashboard_grid_sql(self, start_row=0, end_row=100, sort_model=None, filter_model=None, **filters):
+        """
+        Requête d'une page de la grille (utilisée par `get_dashboard_grid` et
+        par l'audit des plans de requête).
+
+        :return: (requête, paramètres)
+        """
+        from_clause, where_clause, params = self._dashboard_query(self._dashboard_domain(**filters))
+        grid_conditions, grid_params = self._grid_filter_sql(filter_model)
+        offset = max(int(start_row or 0), 0)
+        limit = min(max(int(end_row or 0) - offset, 1), GRID_MAX_PAGE_SIZE)
+        support = self._fields['support_ids']
+
+        query = f"""
+            SELECT "work_program"."id",
+                   grid_project.name,
+                   grid_formulation.name,
+                   grid_responsible.id,
+                   grid_responsible.name,
+                   grid_department.name,
+                   ARRAY(SELECT support.name
+                           FROM "{support.relation}" rel
+                           JOIN hr_employee support ON support.id = rel."{support.column2}"
+                          WHERE rel."{support.column1}" = "work_program"."id"
+                          ORDER BY support.name),
+                   "work_program"."assignment_date",
+                   "work_program"."initial_deadline",
+                   "work_program"."actual_deadline",
+                   "work_program"."priority",
+                   "work_program"."complexity",
+                   "work_program"."state",
+                   COUNT(*) OVER ()
+              FROM {from_clause}
+              LEFT JOIN project_project grid_project ON grid_project.id = "work_program"."project_id"
+              LEFT JOIN workflow_task_formulation grid_formulation
+                     ON grid_formulation.id = "work_program"."task_description_id"
+              LEFT JOIN hr_employee grid_responsible ON grid_responsible.id = "work_program"."responsible_id"
+              LEFT JOIN hr_department grid_department ON grid_department.id = grid_responsible.department_id
+             WHERE {' AND '.join([where_clause] + grid_conditions)}
+             ORDER BY {self._grid_order_sql(sort_model)}
+             LIMIT %s OFFSET %s
+        """
+        return query, params + grid_params + [limit, offset]
+
+    @api.model
+    def get_dashboard_grid(self, start_row=0, end_row=100, sort_model=None, filter_model=None, **filters):
+        """
+        Page de la grille du dashboard, triée et filtrée côté serveur, en une
+        seule requête SQL avec jointures (le total est calculé par fenêtre).
+
+        :return: {'data': [lignes aplaties], 'total': nombre total de lignes}
+        """
+        self.env.cr.execute(*self._dashboard_grid_sql(start_row, end_row, sort_model, filter_model, **filters))
+        rows = self.env.cr.fetchall()
+        # Sans ligne (page au-delà de la fin), le décalage est le total connu
+        total = rows[0][13] if rows else max(int(start_row or 0), 0)
+        return {'data': self._dashboard_grid_rows(rows), 'total': total}
+
+    @api.model
+    def _dashboard_grid_rows(self, rows):
+        """ Lignes SQL de `_dashboard_grid_sql` au format attendu par AG Grid. """
+        return [{
+            'id': row[0],
+            'project': row[1] or '',
+            'description': row[2] or '',
+            'responsible_display': row[4] or '',
+            'responsible_image': f'/web/image/hr.employee/{row[3]}/avatar_128' if row[3] else False,
+            'department_display': row[5] or '',
+            'support': row[6],
+            'start_date': fields.Date.to_string(row[7]) if row[7] else False,
+            'due_date': fields.Date.to_string(row[8]) if row[8] else False,
+            'completion_date': fields.Date.to_string(row[9]) if row[9] else False,
+            'priority': row[10],
+            'complexity': row[11],
+            'state': row[12],
+        } for row in rows]
+
+    # -------------------------------------------------------------------------
+    # SYNCHRONISATION INCRÉMENTALE
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _encode_changes_cursor(self, txid, record_id):
+        return f"{txid},{record_id}"
+
+    @api.model
+    def _decode_changes_cursor(self, cursor):
+        """ Curseur 'txid,id' -> (txid, id) ; ValueError si invalide. """
+        txid, record_id = cursor.split(',')
+        return int(txid), int(record_id)
+
+    @api.model
+    def get_dashboard_changes(self, since=None, **filters):
+        """
+        Programmes créés, modifiés ou supprimés depuis le curseur `since`
+        (change_txid, id), pour mettre à jour la grille du client sans la
+        recharger : le coût dépend de l'activité et non de la taille de la
+        table.
+
+        change_txid est la transaction de la dernière écriture d'une ligne.
+        Une transaction encore en cours peut committer plus tard des lignes
+        d'un txid inférieur à celui de lignes déjà visibles : le curseur
+        n'avance donc jamais au-delà de la plus ancienne transaction en
+        cours de l'instantané (xmin). Les lignes déjà lues au-delà de xmin
+        sont renvoyées au passage suivant et le client les applique de façon
+        idempotente ; aucune durée de transaction n'est supposée.
+
+        :param since: curseur d'un appel précédent (None : curseur courant seul)
+        :return: {'cursor', 'upserts': [lignes de la grille], 'removed': [ids],
+                  'has_more', 'reset'} ; reset = True lorsque le curseur est
+                  invalide, plus ancien que la rétention des suppressions, ou
+                  bloqué par une transaction longue avec plus de
+                  CHANGES_MAX_ROWS lignes à relire (le client doit tout recharger)
+        """
+        self.flush()
+        # Plus ancienne transaction en cours dans l'instantané de la requête
+        self.env.cr.execute("SELECT txid_snapshot_xmin(txid_current_snapshot())")
+        xmin = self.env.cr.fetchone()[0]
+        result = {'upserts': [], 'removed': [], 'has_more': False, 'reset': False}
+        try:
+            since_txid, since_id = self._decode_changes_cursor(since) if since else (None, None)
+        except ValueError:
+            since_txid = since_id = None
+            result['reset'] = True
+        if since_txid is None or since_txid < self.env['work.program.tombstone']._get_purge_horizon():
+            result['reset'] = result['reset'] or bool(since)
+            result['cursor'] = self._encode_changes_cursor(xmin, 0)
+            return result
+
+        # Lignes modifiées, toutes visibilités confondues : celles qui ne sont plus
+        # visibles ou ne correspondent plus aux filtres sont retirées chez le client
+        self.env.cr.execute("""
+            SELECT change_txid, id
+              FROM work_program
+             WHERE (change_txid, id) > (%s, %s)
+             ORDER BY change_txid, id
+             LIMIT %s
+        """, [since_txid, since_id, CHANGES_MAX_ROWS + 1])
+        changed = self.env.cr.fetchall()
+        result['has_more'] = len(changed) > CHANGES_MAX_ROWS
+        changed = changed[:CHANGES_MAX_ROWS]
+
+        # Le curseur s'arrête à la dernière ligne lue, sans dépasser xmin
+        cursor = min(changed[-1], (xmin, 0)) if result['has_more'] else (xmin, 0)
+        if result['has_more'] and cursor <= (since_txid, since_id):
+            # Page pleine qu'une transaction en cours empêche de dépasser
+            result.update(has_more=False, reset=True, cursor=self._encode_changes_cursor(xmin, 0))
+            return result
+
+        changed_ids = [record_id for txid, record_id in changed]
+        if changed_ids:
+            self.env.cr.execute(*self._dashboard_grid_sql(0, len(changed_ids), program_ids=changed_ids, **filters))
+            result['upserts'] = self._dashboard_grid_rows(self.env.cr.fetchall())
+        visible_ids = {row['id'] for row in result['upserts']}
+        result['removed'] = [record_id for record_id in changed_ids if record_id not in visible_ids]
+        result['removed'] += self.env['work.program.tombstone']._get_deleted_ids(since_txid)
+        result['cursor'] = self._encode_changes_cursor(*cursor)
+        return result
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo import models, api, _
+from odoo.exceptions import AccessError
+from odoo.addons.bus.models.bus import channel_with_db, json_dump
+
+_logger = logging.getLogger(__name__)
+
+# Clé de cr.precommit.data sous laquelle sont accumulés les programmes modifiés de la transaction
+PENDING_CHANGES_KEY = 'qc_dashboard.bus_changes'
+
+# Canaux du bus : tous les programmes (managers) et programmes d'un département (du responsable)
+CHANNEL_ALL = 'qc_dashboard_work_program_all'
+CHANNEL_DEPARTMENT = 'qc_dashboard_work_program_department_{}'
+
+# Type des notifications
+NOTIFICATION_TYPE = 'qc_dashboard_work_program_changes'
+
+# Intervalle minimal (secondes) entre deux notifications d'un même canal, tous workers confondus.
+# Le client se resynchronise à la fin de l'intervalle qui suit une notification reçue.
+CHANNEL_THROTTLE = 5
+
+# Nombre maximal d'ids de programmes transmis dans une notification
+NOTIFICATION_MAX_IDS = 200
+
+
+def _build_notification(channel, program_ids):
+    return [channel, NOTIFICATION_TYPE, {
+        'count': len(program_ids),
+        'program_ids': sorted(program_ids)[:NOTIFICATION_MAX_IDS],
+        'throttle': CHANNEL_THROTTLE,
+    }]
+
+
+class WorkProgramDashboardNotifier(models.AbstractModel):
+    """
+    Notifications temps réel du dashboard sur le bus. Les programmes créés,
+    modifiés ou supprimés sont accumulés pendant la transaction et une seule
+    notification compacte par canal est envoyée juste avant le commit (une
+    validation en masse de 500 programmes donne un message par canal).
+
+    Un canal reçoit au plus une notification par CHANNEL_THROTTLE secondes.
+    La dernière notification d'un canal est lue dans bus_bus, partagé par
+    tous les workers : aucun état par processus, aucune ligne verrouillée.
+    Les modifications limitées ne sont pas perdues : chaque client qui a
+    reçu la notification précédente se resynchronise par /dashboard/changes
+    à la fin de l'intervalle.
+
+    Les notifications ne portent que des ids et des compteurs : le client
+    récupère les lignes par /dashboard/changes, qui applique les règles
+    d'accès.
+    """
+    _name = 'work.program.dashboard.notifier'
+    _description = 'Notifications temps réel du dashboard des programmes'
+
+    @api.model
+    def _get_channels(self, department_id=None):
+        """
+        Canaux auxquels le dashboard de l'utilisateur s'abonne : le
+        département filtré, sinon tous les programmes pour un manager, sinon
+        les départements de ses employés. Un utilisateur qui n'est pas
+        manager ne peut écouter que les départements de ses employés.
+        """
+        is_manager = self.env['work.program'].get_user_permissions()['is_manager_or_admin']
+        user_department_ids = self.env.user.employee_ids.department_id.ids
+        if department_id:
+            department_id = int(department_id)
+            if not is_manager and department_id not in user_department_ids:
+                raise AccessError(_("Vous ne pouvez pas suivre les programmes de ce département."))
+            return [CHANNEL_DEPARTMENT.format(department_id)]
+        if is_manager:
+            return [CHANNEL_ALL]
+        return [CHANNEL_DEPARTMENT.format(department_id) for department_id in user_department_ids]
+
+    @api.model
+    def get_subscription(self, department_id=None):
+        """ Canaux à écouter et intervalle de limitation, pour le composant OWL. """
+        return {
+            'channels': self._get_channels(department_id),
+            'notification_type': NOTIFICATION_TYPE,
+            'throttle': CHANNEL_THROTTLE,
+        }
+
+    @api.model
+    def _mark_changes(self, programs):
+        """
+        Enregistre des programmes modifiés (avec le département de leur
+        responsable au moment de l'appel). L'envoi est fait une seule fois,
+        juste avant le commit de la transaction.
+        """
+        if not programs:
+            return
+        data = self.env.cr.precommit.data
+        if PENDING_CHANGES_KEY not in data:
+            data[PENDING_CHANGES_KEY] = {}
+            self.env.cr.precommit.add(self.sudo()._send_pending_changes)
+        pending = data[PENDING_CHANGES_KEY]
+        for program in programs.sudo():
+            pending.setdefault(program.responsible_id.department_id.id or False, set()).add(program.id)
+
+    @api.model
+    def _send_pending_changes(self):
+        pending = self.env.cr.precommit.data.pop(PENDING_CHANGES_KEY, {})
+        if not pending:
+            return
+        program_ids_by_channel = {CHANNEL_ALL: set().union(*pending.values())}
+        for department_id, program_ids in pending.items():
+            if department_id:
+                program_ids_by_channel[CHANNEL_DEPARTMENT.format(department_id)] = program_ids
+
+        # Canaux notifiés depuis moins de CHANNEL_THROTTLE secondes (par n'importe quel worker)
+        dbname = self.env.cr.dbname
+        channel_keys = {json_dump(channel_with_db(dbname, channel)): channel for channel in program_ids_by_channel}
+        self.env.cr.execute("""
+            SELECT DISTINCT channel FROM bus_bus
+             WHERE channel IN %s
+               AND create_date > (clock_timestamp() at time zone 'UTC') - make_interval(secs => %s)
+        """, [tuple(channel_keys), CHANNEL_THROTTLE])
+        throttled = {channel_keys[row[0]] for row in self.env.cr.fetchall()}
+
+        notifications = [_build_notification(channel, program_ids)
+                         for channel, program_ids in program_ids_by_channel.items() if channel not in throttled]
+        if notifications:
+            self.env['bus.bus']._sendmany(notifications)
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from odoo import models, api, fields
+
+_logger = logging.getLogger(__name__)
+
+# Nombre maximal de réponses conservées par worker (éviction LRU)
+DASHBOARD_CACHE_SIZE = 256
+
+# Durée de vie maximale d'une réponse (secondes) : borne la fraîcheur des libellés des modèles liés
+DASHBOARD_CACHE_TTL = 300
+
+# Cache par worker : (base, endpoint, filtres, périmètre) -> (version, date de calcul, réponse)
+_cache = OrderedDict()
+_cache_lock = threading.RLock()
+_cache_stats = {
+    'hits': 0,
+    'misses': 0,
+    'evictions': 0,
+    'hit_ms': 0.0,
+    'miss_ms': 0.0,
+}
+
+
+class WorkProgramDashboardCache(models.AbstractModel):
+    """
+    Cache par worker des réponses des endpoints /dashboard/*, indexé par
+    (endpoint, filtres normalisés, périmètre d'accès de l'utilisateur) et
+    borné en taille (LRU).
+
+    Une réponse n'est servie que si la version des programmes n'a pas
+    changé. La version est lue dans les tables elles-mêmes : transaction de
+    la dernière écriture d'un programme (change_txid, tenu par trigger, y
+    compris pour le générateur par COPY) et de la dernière suppression
+    (journal des suppressions). Aucune ligne partagée n'est écrite : les
+    écritures de programmes ne se bloquent pas entre elles. La version est
+    lue dans le même instantané que celui où la réponse est calculée.
+    """
+    _name = 'work.program.dashboard.cache'
+    _description = 'Cache des réponses du dashboard des programmes'
+
+    # -------------------------------------------------------------------------
+    # VERSION
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _get_version(self):
+        """
+        Version des programmes dans l'instantané courant, et si elle peut
+        être mise en cache : seulement si toutes les transactions jusqu'au
+        plus grand txid visible sont terminées (txid < xmin de l'instantané),
+        sinon une transaction en cours pourrait committer plus tard des
+        lignes sans changer la version.
+
+        :return: (version, cacheable)
+        """
+        # Écritures en attente de la transaction courante : visibles (et donc non mises en cache)
+        self.env['work.program'].flush()
+        self.env.cr.execute("""
+            SELECT txid_snapshot_xmin(txid_current_snapshot()),
+                   (SELECT max(change_txid) FROM work_program),
+                   (SELECT max(change_txid) FROM work_program_tombstone)
+        """)
+        xmin, *version = self.env.cr.fetchone()
+        max_txid = max((txid for txid in version if txid is not None), default=0)
+        return tuple(version), max_txid < xmin
+
+    # -------------------------------------------------------------------------
+    # CLÉS
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _get_access_scope(self):
+        """
+        Périmètre d'accès de l'utilisateur : partagé par les managers et
+        administrateurs (ils voient tous les programmes), propre à
+        l'utilisateur sinon (règles d'accès par responsable / département).
+        """
+        if self.env.is_superuser() or self.env['work.program'].get_user_permissions()['is_manager_or_admin']:
+            scope = 'all'
+        else:
+            scope = f'user:{self.env.uid}'
+        return (scope, tuple(self.env.companies.ids), self.env.lang or 'en_US')
+
+    @api.model
+    def _normalize_params(self, params):
+        """
+        Filtres sous une forme canonique : paramètres vides ignorés, ids
+        comparés en texte ('3' == 3), structures sérialisées avec clés triées.
+        """
+        normalized = {key: str(value) if isinstance(value, (int, float)) else value
+                      for key, value in params.items() if value not in (None, '', False, [], {})}
+        return json.dumps(normalized, sort_keys=True, default=str)
+
+    # -------------------------------------------------------------------------
+    # LECTURE
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def fetch(self, endpoint, params, compute):
+        """
+        Réponse de `endpoint` pour `params`, servie depuis le cache si la
+        version des programmes est inchangée, sinon calculée par `compute()`.
+        Les exceptions ne sont pas mises en cache. La réponse retournée est
+        partagée : l'appelant ne doit pas la modifier.
+        """
+        start = time.perf_counter()
+        version, cacheable = self._get_version()
+        # La date du jour fait partie de la clé (tâches en retard)
+        key = (self.env.cr.dbname, endpoint, self._normalize_params(params), self._get_access_scope(),
+               fields.Date.context_today(self))
+        with _cache_lock:
+            cached = _cache.get(key)
+            if cached and cached[0] == version and time.monotonic() - cached[1] < DASHBOARD_CACHE_TTL:
+                _cache.move_to_end(key)
+                _cache_stats['hits'] += 1
+                _cache_stats['hit_ms'] += (time.perf_counter() - start) * 1000
+                return cached[2]
+
+        # compute() lit le même instantané que `version`
+        result = compute()
+        with _cache_lock:
+            if cacheable:
+                _cache[key] = (version, time.monotonic(), result)
+                _cache.move_to_end(key)
+                while len(_cache) > DASHBOARD_CACHE_SIZE:
+                    _cache.popitem(last=False)
+                    _cache_stats['evictions'] += 1
+            _cache_stats['misses'] += 1
+            _cache_stats['miss_ms'] += (time.perf_counter() - start) * 1000
+        return result
+
+    @api.model
+    def get_cache_stats(self):
+        """
+        Indicateurs du worker courant : taux de succès et latences moyennes
+        (ms) des réponses servies depuis le cache et des réponses calculées.
+        """
+        with _cache_lock:
+            hits, misses = _cache_stats['hits'], _cache_stats['misses']
+            return {
+                'size': len(_cache),
+                'max_size': DASHBOARD_CACHE_SIZE,
+                'hits': hits,
+                'misses': misses,
+                'evictions': _cache_stats['evictions'],
+                'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+                'avg_hit_ms': round(_cache_stats['hit_ms'] / hits, 3) if hits else None,
+                'avg_miss_ms': round(_cache_stats['miss_ms'] / misses, 3) if misses else None,
+            }
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import logging
+from datetime import timedelta
+
+from odoo import models, api, fields
+
+_logger = logging.getLogger(__name__)
+
+# Durée de conservation des suppressions ; un curseur plus ancien impose un rechargement complet
+TOMBSTONE_RETENTION_DAYS = 7
+
+# Paramètre système : txid sous lequel des suppressions ont pu être purgées
+PURGE_HORIZON_PARAM = 'qc_dashboard.tombstone_purge_txid'
+
+
+class WorkProgramTombstone(models.Model):
+    """
+    Journal en ajout seul des programmes supprimés, lu par la
+    synchronisation incrémentale du dashboard (`get_dashboard_changes`)
+    et purgé par cron après TOMBSTONE_RETENTION_DAYS jours.
+    """
+    _name = 'work.program.tombstone'
+    _description = 'Suppression d\'un programme de travail'
+    _order = 'deleted_at desc, id desc'
+    _log_access = False
+
+    program_id = fields.Integer(string='Programme supprimé', required=True, readonly=True)
+    deleted_at = fields.Datetime(string='Supprimé le', required=True, index=True, readonly=True)
+
+    def init(self):
+        # Transaction de la suppression, comparée au curseur (change_txid, id) de la synchronisation
+        self.env.cr.execute("ALTER TABLE work_program_tombstone ADD COLUMN IF NOT EXISTS change_txid BIGINT")
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS work_program_tombstone_change_txid_idx
+                ON work_program_tombstone (change_txid)
+        """)
+
+    @api.model
+    def _log_deletions(self, program_ids):
+        if not program_ids:
+            return
+        self.env.cr.execute("""
+            INSERT INTO work_program_tombstone (program_id, deleted_at, change_txid)
+            SELECT unnest(%s), (now() at time zone 'UTC'), txid_current()
+        """, [list(program_ids)])
+
+    @api.model
+    def _get_deleted_ids(self, since_txid):
+        """
+        Ids des programmes supprimés par une transaction de txid supérieur ou
+        égal à `since_txid` (les suppressions déjà transmises peuvent être
+        renvoyées ; le client les ignore).
+        """
+        self.env.cr.execute("SELECT DISTINCT program_id FROM work_program_tombstone WHERE change_txid >= %s",
+                            [since_txid])
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    @api.model
+    def _get_purge_horizon(self):
+        """ Un curseur de txid inférieur a pu perdre des suppressions purgées. """
+        return int(self.env['ir.config_parameter'].sudo().get_param(PURGE_HORIZON_PARAM, 0))
+
+    @api.model
+    def _purge(self):
+        """ Supprime les suppressions plus anciennes que la rétention (cron quotidien). """
+        horizon = fields.Datetime.now() - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+        self.env.cr.execute("""
+            WITH purged AS (
+                DELETE FROM work_program_tombstone WHERE deleted_at < %s RETURNING change_txid
+            )
+            SELECT COUNT(*), MAX(change_txid) FROM purged
+        """, [horizon])
+        purged, max_txid = self.env.cr.fetchone()
+        if max_txid is not None and max_txid + 1 > self._get_purge_horizon():
+            self.env['ir.config_parameter'].sudo().set_param(PURGE_HORIZON_PARAM, str(max_txid + 1))
+        _logger.info(f"Suppressions de programmes purgées : {purged} lignes")
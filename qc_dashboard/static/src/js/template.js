@@ -37,11 +37,12 @@ export class UserKPIDashboard extends Component {
             totalProjects: '--', 
             tasksValid:'--',
             tasksToValid:'--',
-            // totalReports: '--',
-            // taskInprogress:'--',
-            // taskDelayed:'--',
-            // taskOntime:"--",
-            // taskLate:'--',
+            totalReports: '--',
+            completionMean: '--',
+            taskInprogress:'--',
+            taskDelayed:'--',
+            taskOntime:"--",
+            taskLate:'--',
             chartData: {
                 statusDistribution: { labels: [], values: [] },
                 complexityDistribution: { labels: [], values: [] },
@@ -50,6 +51,7 @@ export class UserKPIDashboard extends Component {
                 
             },
             tableData: [],
+            tableTotal: 0,
             
         });
 
@@ -69,6 +71,18 @@ export class UserKPIDashboard extends Component {
         this.gridColumnApi = null;
         this.gridInitialized = false;
 
+        // Synchronisation incrémentale : curseur serveur et filtres pour lesquels il est valide
+        this.syncCursor = null;
+        this.syncFilterKey = null;
+        this.syncParams = null;
+        this.syncPromise = null;
+
+        // Mises à jour temps réel (bus) : canaux écoutés et resynchronisations programmées
+        this.busService = this.env.services.bus_service || null;
+        this.busChannels = [];
+        this.busSubscription = null;
+        this.liveSyncTimers = [];
+
         // Instances flatpickr
         this.flatpickrFrom = null;
         this.flatpickrTo = null;
@@ -76,6 +90,7 @@ export class UserKPIDashboard extends Component {
 
         onMounted(async () => {
             await this.checkUserPermissions();
+            this.setupLiveUpdates();
             await this.loadInitialData();
             // Ajouter un délai pour s'assurer que les éléments DOM sont bien montés
             setTimeout(() => {
@@ -87,6 +102,7 @@ export class UserKPIDashboard extends Component {
         });
 
         onWillUnmount(() => {
+            this.teardownLiveUpdates();
             this.destroyDatePickers();
             this.destroyGrid();
         });
@@ -338,10 +354,10 @@ async checkUserPermissions() {
         const userId = this.user.userId; // ✅ MODIFIER ICI
         console.log("Vérification des permissions pour user ID:", userId);
         
-        const isManager = await this.user.hasGroup('workprogramm.workprogramm_group_manager'); // ✅ MODIFIER ICI
-        const isAdmin = await this.user.hasGroup('workprogramm.workprogramm_group_admin'); // ✅ MODIFIER ICI
-        
-        this.state.isManagerOrAdmin = isManager || isAdmin;
+        // Un seul appel : les droits sont calculés et mis en cache côté serveur
+        const permissions = await this.orm.call("work.program", "get_user_permissions", []);
+
+        this.state.isManagerOrAdmin = permissions.is_manager_or_admin;
         console.log("✅ Utilisateur est manager ou admin :", this.state.isManagerOrAdmin);
     } catch (error) {
         console.error("Erreur lors de la vérification des permissions:", error);
@@ -468,7 +484,12 @@ onProjectChange(event) {
         }
         this.state.loading = true;
         try {
-            await this.loadAllData();
+            // Mêmes filtres que le dernier chargement : seules les modifications sont récupérées
+            if (this.syncCursor && this.syncFilterKey === JSON.stringify(this.getSyncFilters(this.getFilterParams()))) {
+                await this.syncChanges();
+            } else {
+                await this.loadAllData();
+            }
         } catch (error) {
             console.error("Erreur lors de l'application des filtres:", error);
             this.state.error = "Erreur lors de l'application des filtres";
@@ -515,20 +536,26 @@ onProjectChange(event) {
 
 
     // ===== CHARGEMENT DES DONNÉES =====
-    async loadAllData() {
-        const params = {
+    getFilterParams() {
+        return {
             start_date: this.state.selectedStartDate,
             end_date: this.state.selectedEndDate,
-            // department_id: this.state.selectedDepartmentId,
-            // responsible_id: this.state.selectedResponsibleId
             project_id: this.state.selectedProjectId === "" ? null : this.state.selectedProjectId,
             department_id: this.state.selectedDepartmentId === "" ? null : this.state.selectedDepartmentId,
             responsible_id: this.state.selectedResponsibleId === "" ? null : this.state.selectedResponsibleId
-
         };
+    }
+
+    async loadAllData() {
+        const params = this.getFilterParams();
         
         try {
-            await Promise.all([this.loadKPIData(params), this.loadChartData(params),this.loadTableData(params)]);
+            await Promise.all([
+                this.loadSyncCursor(params),
+                this.loadKPIData(params),
+                this.loadChartData(params),
+                this.loadTableData(params),
+            ]);
             this.renderCharts();
             this.updateGridData();
         } catch (error) {
@@ -537,6 +564,201 @@ onProjectChange(event) {
         }
     }
 
+    // ===== SYNCHRONISATION INCRÉMENTALE =====
+    getSyncFilters(params) {
+        return {
+            date_from: params.start_date,
+            date_to: params.end_date,
+            project_id: params.project_id ?? null,
+            department_id: params.department_id ?? null,
+            responsible_id: params.responsible_id ?? null
+        };
+    }
+
+    async loadSyncCursor(params) {
+        // Curseur courant (sans lignes) : les prochaines actualisations ne lisent que les modifications
+        const filters = this.getSyncFilters(params);
+        try {
+            const result = await this.rpc("/dashboard/changes", { ...filters, since: null });
+            if (result.error) {
+                throw new Error(result.message);
+            }
+            this.syncCursor = result.cursor;
+            this.syncFilterKey = JSON.stringify(filters);
+            this.syncParams = params;
+        } catch (error) {
+            console.warn("Synchronisation incrémentale indisponible:", error);
+            this.syncCursor = null;
+            this.syncFilterKey = null;
+        }
+        await this.updateBusChannels(params);
+    }
+
+    async syncChanges() {
+        // Une seule synchronisation à la fois (bouton et notifications du bus)
+        if (!this.syncPromise) {
+            this.syncPromise = this._syncChanges().finally(() => {
+                this.syncPromise = null;
+            });
+        }
+        return this.syncPromise;
+    }
+
+    async _syncChanges() {
+        // Filtres du dernier chargement : le curseur n'est valide que pour eux
+        const params = this.syncParams;
+        const filters = this.getSyncFilters(params);
+        const upserts = new Map();
+        const removed = new Set();
+        let result;
+        do {
+            result = await this.rpc("/dashboard/changes", { ...filters, since: this.syncCursor });
+            if (result.error) {
+                throw new Error(result.message);
+            }
+            if (result.reset) {
+                // Curseur trop ancien (suppressions purgées) : rechargement complet
+                await this.loadAllData();
+                return;
+            }
+            for (const row of result.upserts) {
+                upserts.set(row.id, row);
+                removed.delete(row.id);
+            }
+            for (const id of result.removed) {
+                upserts.delete(id);
+                removed.add(id);
+            }
+            this.syncCursor = result.cursor;
+        } while (result.has_more);
+
+        if (!upserts.size && !removed.size) {
+            console.log("Aucune modification depuis le dernier chargement");
+            return;
+        }
+        console.log("Modifications reçues:", upserts.size, "lignes modifiées,", removed.size, "supprimées");
+        this.patchGridRows(upserts, removed);
+        // Les compteurs et graphiques ne sont recalculés que si des programmes ont changé
+        await Promise.all([this.loadKPIData(params), this.loadChartData(params)]);
+        this.renderCharts();
+    }
+
+    // ===== MISES À JOUR TEMPS RÉEL (BUS) =====
+    setupLiveUpdates() {
+        if (!this.busService) {
+            console.warn("Service bus indisponible : pas de mises à jour temps réel");
+            return;
+        }
+        this.onBusNotifications = (notifications) => {
+            const type = this.busSubscription && this.busSubscription.notification_type;
+            const received = (notifications || []).filter((notification) => {
+                const message = notification.type ? notification : (notification.message || notification.payload || {});
+                return message.type === type;
+            });
+            if (received.length) {
+                this.scheduleLiveSync();
+            }
+        };
+        if (this.busService.addEventListener) {
+            this.busListener = ({ detail }) => this.onBusNotifications(detail);
+            this.busService.addEventListener("notification", this.busListener);
+        } else if (this.busService.onNotification) {
+            this.busService.onNotification(this, this.onBusNotifications);
+        }
+    }
+
+    async updateBusChannels(params) {
+        if (!this.busService) {
+            return;
+        }
+        try {
+            this.busSubscription = await this.orm.call(
+                "work.program.dashboard.notifier", "get_subscription", [], { department_id: params.department_id ?? null }
+            );
+        } catch (error) {
+            console.warn("Abonnement aux mises à jour temps réel impossible:", error);
+            return;
+        }
+        const channels = this.busSubscription.channels;
+        for (const channel of this.busChannels.filter((c) => !channels.includes(c))) {
+            this.busService.deleteChannel(channel);
+        }
+        for (const channel of channels.filter((c) => !this.busChannels.includes(c))) {
+            this.busService.addChannel(channel);
+        }
+        this.busChannels = channels;
+        if (this.busService.startPolling) {
+            this.busService.startPolling();
+        }
+    }
+
+    scheduleLiveSync() {
+        // Synchronisation immédiate (regroupée sur une seconde), puis une seconde à la fin de
+        // l'intervalle de limitation du serveur : les modifications limitées ne sont pas notifiées
+        const throttle = (this.busSubscription && this.busSubscription.throttle) || 0;
+        if (this.liveSyncTimers.length) {
+            return;
+        }
+        const schedule = (delay) => {
+            const timer = setTimeout(() => {
+                this.liveSyncTimers = this.liveSyncTimers.filter((pending) => pending !== timer);
+                run();
+            }, delay);
+            this.liveSyncTimers.push(timer);
+        };
+        const run = async () => {
+            if (this.syncCursor && !this.state.loading) {
+                try {
+                    await this.syncChanges();
+                } catch (error) {
+                    console.error("Erreur lors de la mise à jour temps réel:", error);
+                }
+            }
+        };
+        schedule(1000);
+        if (throttle) {
+            schedule((throttle + 1) * 1000);
+        }
+    }
+
+    teardownLiveUpdates() {
+        this.liveSyncTimers.forEach((timer) => clearTimeout(timer));
+        this.liveSyncTimers = [];
+        if (!this.busService) {
+            return;
+        }
+        for (const channel of this.busChannels) {
+            this.busService.deleteChannel(channel);
+        }
+        this.busChannels = [];
+        if (this.busListener) {
+            this.busService.removeEventListener("notification", this.busListener);
+        } else if (this.busService.off) {
+            this.busService.off("notification", this);
+        }
+    }
+
+    patchGridRows(upserts, removed) {
+        if (!this.gridApi || !this.gridInitialized) {
+            return;
+        }
+        // Lignes déjà affichées : mises à jour sur place ; sinon (ajouts, suppressions, lignes
+        // d'autres pages) seuls les blocs en cache sont relus
+        let patched = 0;
+        this.gridApi.forEachNode((node) => {
+            if (node.data && upserts.has(node.data.id)) {
+                node.setData(upserts.get(node.data.id));
+                patched++;
+            }
+        });
+        const loadedIds = new Set();
+        this.gridApi.forEachNode((node) => node.data && loadedIds.add(node.data.id));
+        const needsRefresh = [...removed].some((id) => loadedIds.has(id)) || patched < upserts.size;
+        if (needsRefresh) {
+            this.gridApi.refreshInfiniteCache();
+        }
+    }
+
     async loadKPIData(params) {
     try {
         // Préparer les paramètres en convertissant null/undefined en valeurs appropriées
@@ -548,31 +770,22 @@ onProjectChange(event) {
             responsible_id: params.responsible_id ?? null  
         };
 
-        const [ tasksResponse,projectsResponse,tasksValidResponse,tasksToValidReponse,reportsResponse,completionmeanReports,taskInprogressResponse,taskDelayedResponse,taskOntimeResponse,taskLateResponse] = await Promise.all([
-            this.rpc('/dashboard/work_program_count', apiParams),
-            this.rpc('/dashboard/work_program_projects_count', apiParams),
-            this.rpc('/dashboard/work_program_valid', apiParams),
-            this.rpc('/dashboard/work_program_to_validate', apiParams),
-            // this.rpc('/dashboard/work_program_total_reports', apiParams),
-            // this.rpc('/dashboard/work_program_completion_mean', apiParams),
-            // this.rpc('/dashboard/work_program_in_progress', apiParams),
-            // this.rpc('/dashboard/work_program_delayed', apiParams),
-            // this.rpc('/dashboard/work_program_on_time', apiParams),
-            // this.rpc('/dashboard/work_program_late', apiParams),
-        ]);
-        
+        // Un seul appel : tous les compteurs sont calculés en une requête SQL côté serveur
+        const result = await this.rpc('/dashboard/kpis', apiParams);
 
-        // this.state.deadlineCompliance = deadlineResponse.deadline_compliance;
-        this.state.totalTasks = tasksResponse.error ? '--' : tasksResponse.total_tasks;
-        this.state.totalProjects = projectsResponse.error ? '--' : projectsResponse.total_projects;
-        this.state.tasksValid = tasksValidResponse.error ? '--' : tasksValidResponse.tasks_valid;
-        this.state.tasksToValid = tasksToValidReponse.error ? '--' : tasksToValidReponse.tasks_to_validate;
-        // this.state.totalReports = reportsResponse.error ? '--' : reportsResponse.total_reports;
-        // this.state.completionMean = completionmeanReports.error ? '--' : completionmeanReports.completion_mean;
-        // this.state.taskInprogress = taskInprogressResponse.error ? '--' : taskInprogressResponse.in_progress_count;
-        // this.state.taskDelayed = taskDelayedResponse.error ? '--' : taskDelayedResponse.delayed_count;
-        // this.state.taskOntime = taskOntimeResponse.error ? '--' : taskOntimeResponse.on_time_count;
-        // this.state.taskLate = taskLateResponse.error ? '--' : taskLateResponse.late_count;
+        if (result.error) {
+            throw new Error(result.message);
+        }
+        this.state.totalTasks = result.total_tasks;
+        this.state.totalProjects = result.total_projects;
+        this.state.tasksValid = result.tasks_valid;
+        this.state.tasksToValid = result.tasks_to_validate;
+        this.state.totalReports = result.total_reports;
+        this.state.completionMean = result.completion_mean;
+        this.state.taskInprogress = result.in_progress_count;
+        this.state.taskDelayed = result.delayed_count;
+        this.state.taskOntime = result.on_time_count;
+        this.state.taskLate = result.late_count;
     } catch (error) {
         console.error("Erreur lors du chargement des KPI:", error);
         this.state.totalTasks = '--';
@@ -581,6 +794,10 @@ onProjectChange(event) {
         this.state.tasksToValid='--';
         this.state.totalReports = '--';
         this.state.completionMean = '--';
+        this.state.taskInprogress = '--';
+        this.state.taskDelayed = '--';
+        this.state.taskOntime = '--';
+        this.state.taskLate = '--';
     }
 }
 
@@ -1413,27 +1630,42 @@ async onStateBarClick(clickedLabel) {
 
 
     async loadTableData(params) {
-    try {
-        console.log("Chargement des données du tableau...");
-        const apiParams = {
-            date_from: params.start_date,
-            date_to: params.end_date,
-            department_id: params.department_id ?? null,
-            project_id: params.project_id ?? null,
-            responsible_id: params.responsible_id ?? null
-        };
-        const result = await this.rpc("/dashboard/work_program_grid", apiParams);
-        if (result.error) {
-            console.error("Erreur lors du chargement du tableau:", result.message);
-            this.state.tableData = [];
-        } else {
-            this.state.tableData = result.data;
-            console.log("Données du tableau chargées:", result.data.length, "lignes");
+    // La grille charge ses pages elle-même (modèle 'infinite') : on ne mémorise que les filtres actifs
+    this.gridFilterParams = {
+        date_from: params.start_date,
+        date_to: params.end_date,
+        department_id: params.department_id ?? null,
+        project_id: params.project_id ?? null,
+        responsible_id: params.responsible_id ?? null
+    };
+}
+
+getGridDatasource() {
+    return {
+        getRows: async (params) => {
+            try {
+                const result = await this.rpc("/dashboard/work_program_grid", {
+                    ...(this.gridFilterParams || {}),
+                    start_row: params.startRow,
+                    end_row: params.endRow,
+                    sort_model: params.sortModel,
+                    filter_model: params.filterModel
+                });
+                if (result.error) {
+                    console.error("Erreur lors du chargement du tableau:", result.message);
+                    params.failCallback();
+                    return;
+                }
+                this.state.tableData = result.data;
+                this.state.tableTotal = result.total;
+                console.log("Données du tableau chargées:", result.data.length, "lignes sur", result.total);
+                params.successCallback(result.data, result.total);
+            } catch (error) {
+                console.error("Erreur lors du chargement du tableau:", error);
+                params.failCallback();
+            }
         }
-    } catch (error) {
-        console.error("Erreur lors du chargement du tableau:", error);
-        this.state.tableData = [];
-    }
+    };
 }
 
 
@@ -1464,7 +1696,7 @@ initializeGrid() {
                 headerName: "Projet",
                 width: 400,
                 filter: true,
-                sortable: false,
+                sortable: true,
                 tooltipField: "project",
                 cellClass: 'flex items-center '
             },
@@ -1473,7 +1705,7 @@ initializeGrid() {
                 headerName: "Description",
                 width: 400,
                 filter: true,
-                sortable: false,
+                sortable: true,
                 tooltipField: "description",
                 cellClass: 'flex items-center '
                 // wrapText: true,
@@ -1482,7 +1714,7 @@ initializeGrid() {
             {
                 field: "responsible_display",
                 headerName: "Responsable",
-                sortable: false,
+                sortable: true,
                 width: 380,
                 filter: true,
                 cellRenderer: (params) => {
@@ -1557,7 +1789,7 @@ initializeGrid() {
             {
     field: "priority",
     headerName: "Priorité",
-    sortable: false,
+    sortable: true,
     width: 150,
     filter: 'agTextColumnFilter',
     filterParams: {
@@ -1614,7 +1846,7 @@ initializeGrid() {
             {
     field: "complexity",
     headerName: "Complexité",
-    sortable: false,
+    sortable: true,
     width: 150,
     filter: 'agTextColumnFilter',
     filterParams: {
@@ -1736,7 +1968,11 @@ initializeGrid() {
         ];
 
         const gridOptions = {
-            rowData: this.state.tableData,
+            // Pagination, tri et filtres exécutés côté serveur
+            rowModelType: 'infinite',
+            datasource: this.getGridDatasource(),
+            cacheBlockSize: 20,
+            maxBlocksInCache: 10,
             columnDefs: columnDefs,
             defaultColDef: {
                 sortable: true,
@@ -1754,7 +1990,7 @@ initializeGrid() {
             headerHeight: 55,
             pagination: true,
             paginationPageSize: 4,
-            paginationPageSizeSelector: [4, 10, 20, 50],
+            paginationPageSizeSelector: [4, 10, 20],
             suppressRowClickSelection: true,
             suppressCellFocus: true,
             suppressColumnVirtualisation: false,
@@ -1765,7 +2001,10 @@ initializeGrid() {
         background: params.node.rowIndex % 2 === 0 ? '#FFFFFF' : '#F3F4F6'
     };
 
-    // Couleurs et bordures pour les états spécifiques
+    // Couleurs et bordures pour les états spécifiques (ligne en cours de chargement : pas de données)
+    if (!params.data) {
+        return style;
+    }
     if (params.data.state === 'validated') {
         style.background = '#F0FDF4'; // vert clair
         style.borderLeft = '4px solid #16A34A';
@@ -1806,7 +2045,6 @@ initializeGrid() {
 updateGridData() {
     console.log("Mise à jour des données de la grille...", {
         hasGridApi: !!this.gridApi,
-        dataLength: this.state.tableData.length,
         initialized: this.gridInitialized
     });
     if (!this.gridApi || !this.gridInitialized) {
@@ -1814,13 +2052,9 @@ updateGridData() {
         return;
     }
     try {
-        this.gridApi.setGridOption('rowData', this.state.tableData);
-        console.log(`✅ Données mises à jour: ${this.state.tableData.length} lignes`);
-        setTimeout(() => {
-            if (this.gridApi) {
-                this.gridApi.sizeColumnsToFit();
-            }
-        }, 100);
+        // Les filtres du dashboard ont changé : les pages en cache sont rechargées depuis le serveur
+        this.gridApi.purgeInfiniteCache();
+        console.log("✅ Cache de la grille purgé");
     } catch (error) {
         console.error("❌ Erreur lors de la mise à jour des données de la grille:", error);
         this.reinitializeGrid();
@@ -1853,6 +2087,7 @@ debugGridState() {
         hasGridApi: !!this.gridApi,
         hasGridElement: !!this.gridRef.el,
         dataLength: this.state.tableData.length,
+        totalRows: this.state.tableTotal,
         currentFilters: {
             start_date: this.state.selectedStartDate,
             end_date: this.state.selectedEndDate,
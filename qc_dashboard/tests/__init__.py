@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+
+from . import test_work_program_changes
+from . import test_work_program_daily_stat
+from . import test_work_program_dashboard_bus
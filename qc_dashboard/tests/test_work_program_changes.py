@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import TransactionCase, tagged
+
+from odoo.addons.qc_dashboard.models.work_program_tombstone import PURGE_HORIZON_PARAM
+
+
+@tagged('post_install', '-at_install')
+class TestWorkProgramChanges(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.WorkProgram = cls.env['work.program']
+        cls.project, cls.other_project = cls.env['project.project'].create([
+            {'name': 'Sync Projet'}, {'name': 'Sync Autre Projet'},
+        ])
+        cls.program = cls.WorkProgram.create({'name': 'SYNC-1', 'project_id': cls.project.id, 'priority': 'low'})
+
+    def _cursor(self):
+        result = self.WorkProgram.get_dashboard_changes()
+        self.assertFalse(result['reset'])
+        self.assertFalse(result['upserts'])
+        return result['cursor']
+
+    def test_cursor_format(self):
+        """ Le curseur est 'txid,id' et s'arrête à la plus ancienne transaction en cours. """
+        txid, record_id = self.WorkProgram._decode_changes_cursor(self._cursor())
+        self.assertEqual(record_id, 0)
+        self.env.cr.execute("SELECT txid_current()")
+        # La transaction du test est encore en cours : le curseur ne la dépasse pas
+        self.assertLessEqual(txid, self.env.cr.fetchone()[0])
+
+    def test_upserts_after_write(self):
+        """ Un programme modifié est renvoyé avec ses nouvelles valeurs, ou retiré s'il sort des filtres. """
+        cursor = self._cursor()
+        self.program.priority = 'high'
+        result = self.WorkProgram.get_dashboard_changes(since=cursor, project_id=self.project.id)
+        self.assertFalse(result['reset'])
+        rows = {row['id']: row for row in result['upserts']}
+        self.assertEqual(rows[self.program.id]['priority'], 'high')
+
+        self.program.project_id = self.other_project
+        result = self.WorkProgram.get_dashboard_changes(since=result['cursor'], project_id=self.project.id)
+        self.assertNotIn(self.program.id, [row['id'] for row in result['upserts']])
+        self.assertIn(self.program.id, result['removed'])
+
+    def test_removed_after_unlink(self):
+        """ Un programme supprimé est renvoyé dans 'removed' depuis le journal des suppressions. """
+        cursor = self._cursor()
+        program_id = self.program.id
+        self.program.unlink()
+        result = self.WorkProgram.get_dashboard_changes(since=cursor)
+        self.assertFalse(result['reset'])
+        self.assertIn(program_id, result['removed'])
+        self.assertNotIn(program_id, [row['id'] for row in result['upserts']])
+
+    def test_reset_on_invalid_cursor(self):
+        """ Un curseur illisible ou antérieur à la purge des suppressions impose un rechargement complet. """
+        for since in ('invalide', '12', 'a,b'):
+            result = self.WorkProgram.get_dashboard_changes(since=since)
+            self.assertTrue(result['reset'])
+            self.assertFalse(result['upserts'])
+            self.WorkProgram._decode_changes_cursor(result['cursor'])
+
+        cursor = self._cursor()
+        txid = self.WorkProgram._decode_changes_cursor(cursor)[0]
+        self.env['ir.config_parameter'].sudo().set_param(PURGE_HORIZON_PARAM, str(txid + 1))
+        self.assertTrue(self.WorkProgram.get_dashboard_changes(since=cursor)['reset'])
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from datetime import date
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestWorkProgramDailyStat(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.WorkProgram = cls.env['work.program']
+        cls.department_a = cls.env['hr.department'].create({'name': 'Stat Dpt A'})
+        cls.department_b = cls.env['hr.department'].create({'name': 'Stat Dpt B'})
+        cls.employee = cls.env['hr.employee'].create({'name': 'Stat Responsable',
+                                                       'department_id': cls.department_a.id})
+        cls.project = cls.env['project.project'].create({'name': 'Stat Projet'})
+
+    def _stat_total(self, **filters):
+        # Recalcul des jours marqués, fait normalement juste avant le commit
+        self.env.cr.precommit.run()
+        return self.WorkProgram._dashboard_kpis_from_stats(**filters)['total_tasks']
+
+    def _program_total(self, **filters):
+        return self.WorkProgram.search_count(self.WorkProgram._dashboard_domain(**filters))
+
+    def test_undated_programs_counted(self):
+        """ Les programmes sans date d'assignation sont comptés comme par la requête sur les programmes. """
+        self.WorkProgram.create([
+            {'name': 'STAT-DATED', 'project_id': self.project.id, 'assignment_date': date(2025, 3, 3)},
+            {'name': 'STAT-UNDATED', 'project_id': self.project.id, 'assignment_date': False},
+        ])
+        self.assertEqual(self._stat_total(project_id=self.project.id), 2)
+        self.assertEqual(self._stat_total(project_id=self.project.id), self._program_total(project_id=self.project.id))
+
+        self.WorkProgram.search([('name', '=', 'STAT-UNDATED')]).unlink()
+        self.assertEqual(self._stat_total(project_id=self.project.id), 1)
+
+    def test_responsible_department_change(self):
+        """ Le changement de département d'un responsable est reporté sur ses statistiques. """
+        self.WorkProgram.create({'name': 'STAT-DPT', 'responsible_id': self.employee.id,
+                                 'assignment_date': date(2025, 3, 4)})
+        self.assertEqual(self._stat_total(department_id=self.department_a.id), 1)
+
+        self.employee.department_id = self.department_b
+        self.assertEqual(self._stat_total(department_id=self.department_a.id), 0)
+        self.assertEqual(self._stat_total(department_id=self.department_b.id), 1)
+        self.assertEqual(self._stat_total(department_id=self.department_b.id),
+                         self._program_total(department_id=self.department_b.id))
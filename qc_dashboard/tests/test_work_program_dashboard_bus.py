@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+from odoo.exceptions import AccessError
+from odoo.tests import TransactionCase, new_test_user, tagged
+
+from odoo.addons.qc_dashboard.models.work_program_dashboard_bus import CHANNEL_ALL, CHANNEL_DEPARTMENT
+
+
+@tagged('post_install', '-at_install')
+class TestWorkProgramDashboardBus(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Notifier = cls.env['work.program.dashboard.notifier']
+        cls.department, cls.other_department = cls.env['hr.department'].create([
+            {'name': 'Bus Dpt'}, {'name': 'Bus Autre Dpt'},
+        ])
+        cls.user = new_test_user(cls.env, login='bus_user', groups='base.group_user,workprogramm.workprogramm_group_user')
+        cls.manager = new_test_user(cls.env, login='bus_manager',
+                                    groups='base.group_user,workprogramm.workprogramm_group_manager')
+        cls.env['hr.employee'].create({'name': 'Bus Employé', 'user_id': cls.user.id,
+                                       'department_id': cls.department.id})
+
+    def _channel_notifications(self, channel):
+        self.env['bus.bus'].flush()
+        return self.env['bus.bus'].search_count([('channel', 'like', channel)])
+
+    def test_subscription_departments(self):
+        """ Un utilisateur n'écoute que les départements de ses employés ; un manager, tous. """
+        notifier = self.Notifier.with_user(self.user)
+        self.assertEqual(notifier.get_subscription()['channels'], [CHANNEL_DEPARTMENT.format(self.department.id)])
+        self.assertEqual(notifier.get_subscription(self.department.id)['channels'],
+                         [CHANNEL_DEPARTMENT.format(self.department.id)])
+        with self.assertRaises(AccessError):
+            notifier.get_subscription(self.other_department.id)
+
+        manager_notifier = self.Notifier.with_user(self.manager)
+        self.assertEqual(manager_notifier.get_subscription()['channels'], [CHANNEL_ALL])
+        self.assertEqual(manager_notifier.get_subscription(self.other_department.id)['channels'],
+                         [CHANNEL_DEPARTMENT.format(self.other_department.id)])
+
+    def test_channel_throttle(self):
+        """ Une seconde notification sur un canal dans l'intervalle n'est pas envoyée, quel que soit le worker. """
+        before = self._channel_notifications(CHANNEL_ALL)
+        self.env['work.program'].create({'name': 'BUS-1'})
+        self.env.cr.precommit.run()
+        self.assertEqual(self._channel_notifications(CHANNEL_ALL), before + 1)
+
+        self.env['work.program'].create({'name': 'BUS-2'})
+        self.env.cr.precommit.run()
+        self.assertEqual(self._channel_notifications(CHANNEL_ALL), before + 1)
@@ -28,7 +28,7 @@
     'website': "https://www.yourcompany.com",
 
     'category': 'Project',  # Plus approprié que 'Uncategorized'
-    'version': '1.0.0',
+    'version': '1.0.1',
 
     # Dépendances nécessaires
     'depends': [
@@ -53,6 +53,7 @@
         'data/subcategory_data.xml',
         # 4. Données du cadre de reference
         'data/cd_ref_workflow_data.xml',
+        'data/ir_cron_data.xml',
         'views/practice_views.xml',
         'views/project_views.xml',
         'views/hr_department_view.xml',
@@ -69,6 +70,8 @@
         'views/reponses_templates.xml',
         'views/work_program_search_view.xml',
         'views/work_program_kanban_view.xml',  # <-- Kanban ajouté ici
+        'views/work_program_import_views.xml',
+        'views/work_program_job_views.xml',
 
     ],
 
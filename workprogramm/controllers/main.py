@@ -1,6 +1,30 @@
 # -*- coding: utf-8 -*-
-from odoo import http
-from odoo.http import request
+import hashlib
+import json
+import logging
+
+from werkzeug.exceptions import BadRequest, Forbidden
+
+from odoo import http, api, fields
+from odoo.exceptions import AccessError, UserError
+from odoo.http import request, content_disposition
+
+from ..models.work_program_export import EXPORT_FORMATS
+
+_logger = logging.getLogger(__name__)
+
+# Nombre maximal d'options retournées par page de recherche
+OPTIONS_MAX_LIMIT = 50
+# Durée de mise en cache navigateur des listes d'options (secondes)
+OPTIONS_MAX_AGE = 300
+
+# Cascade du formulaire : (modèle enfant, colonne de l'ancêtre sélectionné, parent direct ou ancêtre stocké)
+FORM_CASCADE = {
+    'activities': ('workflow.activity', 'domain_id'),
+    'procedures': ('workflow.procedure', 'activity_id'),
+    'deliverables': ('workflow.deliverable', 'activity_id'),
+    'task_descriptions': ('workflow.task.formulation', 'procedure_id'),
+}
 
 
 class WorkProgramController(http.Controller):
@@ -9,31 +33,16 @@ class WorkProgramController(http.Controller):
     def work_program_form(self):
         """
         Affiche le formulaire pour créer un programme de travail.
-        Récupère toutes les données nécessaires du backend pour les menus déroulants.
+        Les listes dépendantes (départements, projets, activités, procédures,
+        livrables, formulations) et les employés sont chargées à la demande par
+        les endpoints /work_program/form/options/*.
         """
-        # Utilisation de sudo() pour accéder aux modèles avec les droits de super-utilisateur,
-        # ce qui est courant pour les pages publiques.
-        employees = request.env['hr.employee'].sudo().search([])
-        projects = request.env['project.project'].sudo().search([])
-        activities = request.env['workflow.activity'].sudo().search([])
-        procedures = request.env['workflow.procedure'].sudo().search([])
-        task_descriptions = request.env['workflow.task.formulation'].sudo().search([])
-        deliverables = request.env['workflow.deliverable'].sudo().search([])
-        departments = request.env['hr.department'].sudo().search([])
-
         # Récupération des listes de sélection directement depuis le modèle
         priorities = request.env['work.program']._fields['priority'].selection
         complexities = request.env['work.program']._fields['complexity'].selection
         satisfaction_levels = request.env['work.program']._fields['satisfaction_level'].selection
 
         values = {
-            'employees': employees,
-            'projects': projects,
-            'activities': activities,
-            'procedures': procedures,
-            'task_descriptions': task_descriptions,
-            'deliverables': deliverables,
-            'departments': departments,
             'priorities': priorities,
             'complexities': complexities,
             'satisfaction_levels': satisfaction_levels,
@@ -42,51 +51,92 @@ class WorkProgramController(http.Controller):
         # Rendre le template du formulaire
         return request.render('workprogramm.work_program_form_template', values)
 
+    # -------------------------------------------------------------------------
+    # OPTIONS DU FORMULAIRE (chargement à la demande)
+    # -------------------------------------------------------------------------
+
+    def _options_response(self, options, has_more=False):
+        """
+        Réponse JSON des listes d'options, avec ETag calculé sur le contenu
+        et Cache-Control : un navigateur qui renvoie un ETag connu reçoit 304.
+        """
+        body = json.dumps({'options': options, 'has_more': has_more})
+        response = request.make_response(body, headers=[
+            ('Content-Type', 'application/json'),
+            ('Cache-Control', f'public, max-age={OPTIONS_MAX_AGE}'),
+        ])
+        # Werkzeug met l'ETag entre guillemets et compare If-None-Match sans eux
+        response.set_etag(hashlib.sha1(body.encode()).hexdigest())
+        return response.make_conditional(request.httprequest)
+
+    def _search_options(self, model_name, domain, q=None, offset=0, limit=20, fields=('name',)):
+        """ Page de recherche par nom : options {'id', 'name', ...} et indicateur de page suivante. """
+        limit = min(max(int(limit or 20), 1), OPTIONS_MAX_LIMIT)
+        offset = max(int(offset or 0), 0)
+        if q:
+            domain = domain + [('name', 'ilike', q)]
+        rows = request.env[model_name].sudo().search_read(domain, list(fields), offset=offset, limit=limit + 1,
+                                                          order='name, id')
+        return rows[:limit], len(rows) > limit
+
+    @http.route('/work_program/form/options/departments', type='http', auth='public', website=True,
+                methods=['GET'])
+    def work_program_form_departments(self, **kw):
+        """ Départements, avec leur type (interne / externe). """
+        rows = request.env['hr.department'].sudo().search_read([], ['name', 'dpt_type'], order='name, id')
+        return self._options_response([
+            {'id': row['id'], 'name': row['name'], 'is_external': row['dpt_type'] == 'external'} for row in rows
+        ])
+
+    @http.route('/work_program/form/options/projects', type='http', auth='public', website=True, methods=['GET'])
+    def work_program_form_projects(self, department_id=None, q=None, offset=0, limit=20, **kw):
+        """ Projets du type du département sélectionné (même filtre que l'onchange du backend), paginés. """
+        domain = []
+        if department_id:
+            department = request.env['hr.department'].sudo().browse(int(department_id)).exists()
+            if department.dpt_type:
+                domain = [('project_type', '=', department.dpt_type)]
+        options, has_more = self._search_options('project.project', domain, q, offset, limit)
+        return self._options_response(options, has_more)
+
+    @http.route('/work_program/form/options/employees', type='http', auth='public', website=True,
+                methods=['GET'])
+    def work_program_form_employees(self, q=None, offset=0, limit=20, **kw):
+        """ Recherche paginée des employés (responsable et support). """
+        options, has_more = self._search_options('hr.employee', [], q, offset, limit)
+        return self._options_response(options, has_more)
+
+    @http.route('/work_program/form/options/<string:level>/<int:parent_id>', type='http', auth='public',
+                website=True, methods=['GET'])
+    def work_program_form_children(self, level, parent_id, **kw):
+        """
+        Enfants du parent sélectionné, lus dans le cache du référentiel :
+        activités du domaine du projet, procédures et livrables d'une
+        activité, formulations d'une procédure.
+        """
+        if level not in FORM_CASCADE:
+            return request.not_found()
+        model_name, ancestor_field = FORM_CASCADE[level]
+        cache = request.env['workflow.referential.cache'].sudo()
+        # Comme dans l'onchange du backend, le domaine (stocké) de l'activité est comparé à l'id du projet
+        ids = cache.get_by_ancestor(model_name, ancestor_field, parent_id)
+        options = sorted(
+            ({'id': record_id, 'name': cache.get_name(model_name, record_id)} for record_id in ids),
+            key=lambda option: (option['name'] or '', option['id'])
+        )
+        return self._options_response(options)
+
     @http.route('/work_program/submit', type='http', auth='public', website=True, methods=['POST'])
     def work_program_submit(self, **post):
         """
         Traite les données du formulaire soumis.
         """
         try:
-            # Récupère les IDs des champs many2one
-            project_id = int(post.get('project_id')) if post.get('project_id') else False
-            activity_id = int(post.get('activity_id')) if post.get('activity_id') else False
-            procedure_id = int(post.get('procedure_id')) if post.get('procedure_id') else False
-            task_description_id = int(post.get('task_description_id')) if post.get('task_description_id') else False
-            responsible_id = int(post.get('responsible_id')) if post.get('responsible_id') else False
-            department_id = int(post.get('work_programm_department_id')) if post.get('work_programm_department_id') else False
-
-            # Récupération des IDs des champs many2many
-            # CORRECTION CLÉ : Utilisation de request.httprequest.form.getlist() pour les champs multiples
-            deliverable_ids_list = [int(d) for d in request.httprequest.form.getlist('deliverable_ids')]
-            support_ids_list = [int(s) for s in request.httprequest.form.getlist('support_ids')]
-
-            # Prépare les valeurs pour la création de l'enregistrement
-            vals = {
-                'project_id': project_id,
-                'activity_id': activity_id,
-                'procedure_id': procedure_id,
-                'task_description_id': task_description_id,
-                'inputs_needed': post.get('inputs_needed'),
-                'responsible_id': responsible_id,
-                'deliverable_ids': [(6, 0, deliverable_ids_list)],
-                'support_ids': [(6, 0, support_ids_list)],
-                'work_programm_department_id': department_id,
-                'my_month': post.get('my_month'),
-                'my_week_of': post.get('my_week_of'),
-                'priority': post.get('priority'),
-                'complexity': post.get('complexity'),
-                'assignment_date': post.get('assignment_date'),
-                'duration_effort': float(post.get('duration_effort') or 0.0),
-                'initial_deadline': post.get('initial_deadline'),
-                'nb_postpones': int(post.get('nb_postpones') or 0),
-                'actual_deadline': post.get('actual_deadline'),
-                'completion_percentage': float(post.get('completion_percentage') or 0.0),
-                'satisfaction_level': post.get('satisfaction_level'),
-                'comments': post.get('comments'),
-                'champ1': post.get('champ1'),
-                'champ2': post.get('champ2'),
-            }
+            # Les champs many2many multiples sont lus avec request.httprequest.form.getlist()
+            payload = dict(post,
+                           deliverable_ids=request.httprequest.form.getlist('deliverable_ids'),
+                           support_ids=request.httprequest.form.getlist('support_ids'))
+            vals = request.env['work.program'].sudo()._prepare_submission_vals(payload)
 
             # Crée l'enregistrement dans Odoo
             new_record = request.env['work.program'].sudo().create(vals)
@@ -96,4 +146,59 @@ class WorkProgramController(http.Controller):
 
         except Exception as e:
             # Gérer les erreurs et afficher un message approprié
-            return request.render('workprogramm.work_program_error_template', {'error_message': str(e)})
\ No newline at end of file
+            return request.render('workprogramm.work_program_error_template', {'error_message': str(e)})
+
+    @http.route('/work_program/submit_batch', type='json', auth='user', methods=['POST'])
+    def work_program_submit_batch(self, programs=None, **kw):
+        """
+        Soumission par lot (outils de planification externes) : `programs` est
+        une liste de programmes avec les champs de /work_program/submit et une
+        `idempotency_key` optionnelle. Retourne le statut, l'id et l'erreur
+        éventuelle de chaque programme.
+        """
+        try:
+            results = request.env['work.program'].submit_work_programs(programs or [])
+            return {'error': False, 'results': results}
+        except Exception as e:
+            _logger.error(f"Erreur lors de la soumission par lot : {e}", exc_info=True)
+            return {'error': True, 'message': str(e)}
+
+    # -------------------------------------------------------------------------
+    # EXPORT
+    # -------------------------------------------------------------------------
+
+    @http.route('/work_program/export', type='http', auth='user', methods=['GET'])
+    def work_program_export(self, format='csv', domain='[]', **kw):
+        """
+        Export en flux des programmes du domaine (JSON) au format de l'import,
+        en CSV ou XLSX. Le droit de lecture, le domaine et le format sont
+        vérifiés avant l'envoi des en-têtes ; les lignes sont ensuite lues
+        lot par lot pendant l'envoi de la réponse.
+        """
+        # Requête invalide -> 400, droit de lecture manquant -> 403 (AccessError hérite de UserError)
+        try:
+            domain = json.loads(domain or '[]')
+            request.env['work.program.export']._check_format(format)
+            request.env['work.program'].check_access_rights('read')
+            request.env['work.program']._where_calc(domain)
+        except AccessError as e:
+            raise Forbidden(str(e))
+        except (ValueError, UserError) as e:
+            raise BadRequest(str(e))
+
+        # La réponse est émise après la fermeture du curseur de la requête :
+        # le générateur ouvre son propre curseur (une seule transaction, donc un
+        # instantané cohérent de la table pendant tout l'export).
+        registry, uid, context = request.registry, request.env.uid, dict(request.env.context)
+        mimetype, method = EXPORT_FORMATS[format]
+
+        def generate():
+            with registry.cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                yield from getattr(env['work.program.export'], method)(domain)
+
+        filename = f"work_programs_{fields.Date.context_today(request.env['work.program'])}.{format}"
+        return request.make_response(generate(), headers=[
+            ('Content-Type', mimetype),
+            ('Content-Disposition', content_disposition(filename)),
+        ])
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Nombre d'identifiants traités par UPDATE
+BATCH_SIZE = 50000
+
+
+def migrate(cr, version):
+    """ Remplit week_start / period_month par tranches d'identifiants. """
+    if not version:
+        return
+    cr.execute("SELECT MIN(id), MAX(id) FROM work_program")
+    min_id, max_id = cr.fetchone()
+    if min_id is None:
+        return
+    updated = 0
+    for start in range(min_id, max_id + 1, BATCH_SIZE):
+        # date_trunc('week') donne le lundi, comme WorkProgram._get_period_buckets
+        cr.execute("""
+            UPDATE work_program
+               SET week_start = date_trunc('week', assignment_date)::date,
+                   period_month = date_trunc('month', assignment_date)::date
+             WHERE id >= %s AND id < %s
+               AND assignment_date IS NOT NULL
+               AND week_start IS NULL
+        """, [start, start + BATCH_SIZE])
+        updated += cr.rowcount
+        _logger.info(f"work_program : périodes renseignées jusqu'à l'id {start + BATCH_SIZE - 1} ({updated} lignes)")
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """
+    Crée les colonnes week_start / period_month avant le chargement du
+    module : l'ORM ne recalcule alors pas les champs calculés stockés sur
+    toute la table en une fois, le remplissage est fait par lots en
+    post-migration.
+    """
+    if not version:
+        return
+    cr.execute("""
+        ALTER TABLE work_program
+            ADD COLUMN IF NOT EXISTS week_start date,
+            ADD COLUMN IF NOT EXISTS period_month date
+    """)
+    _logger.info("work_program : colonnes week_start / period_month créées")
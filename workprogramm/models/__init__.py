@@ -1,8 +1,15 @@
 # -*- coding: utf-8 -*-
 
 from . import models
+from . import workflow_referential_cache
+from . import work_program_calendar
 from . import work_program
 from . import cd_ref_workflow
 from . import hr_department_extension
 from . import project_extension
-from . import generate
\ No newline at end of file
+from . import generate
+from . import work_program_transition
+from . import work_program_import
+from . import work_program_job
+from . import work_program_export
+from . import work_program_benchmark
\ No newline at end of file
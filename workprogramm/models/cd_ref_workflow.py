@@ -1,10 +1,23 @@
 # -*- coding: utf-8 -*-
 import logging
+from collections import defaultdict
+
 from odoo import models, api, fields
 from odoo.exceptions import UserError, ValidationError
 
 _logger = logging.getLogger(__name__)
 
+# Colonnes d'import de la hiérarchie : (colonne du fichier, champ M2M, modèle cible)
+HIERARCHY_IMPORT_COLUMNS = [
+    ('domain', 'domain_ids', 'workflow.domain'),
+    ('process', 'process_ids', 'workflow.process'),
+    ('sub_process', 'sub_process_ids', 'workflow.subprocess'),
+    ('activity', 'activity_ids', 'workflow.activity'),
+    ('procedure', 'procedure_ids', 'workflow.procedure'),
+    ('deliverable', 'deliverable_ids', 'workflow.deliverable'),
+    ('task_formulation', 'task_formulation_ids', 'workflow.task.formulation'),
+]
+
 
 # NOTE: L'extension du modèle hr.department (avec le champ dpt_type)
 # est délibérément omise ici car elle est gérée dans le fichier
@@ -64,61 +77,111 @@ class WorkflowHierarchy(models.Model):
         store=False
     )
 
+    def _get_valid_elements(self):
+        """
+        Calcule, pour tout le lot, les éléments valides de chaque niveau et la
+        sélection de l'utilisateur restreinte à ces éléments. Un niveau n'est
+        filtré qu'à partir de la sélection valide des niveaux supérieurs.
+
+        Chaque niveau est lu en une requête `IN` sur sa colonne d'ancêtre
+        stockée (domain_id, ou process_id pour les sous-processus) ; la
+        validité d'un élément se vérifie ensuite sur ses ancêtres stockés,
+        sans remonter la chaîne des parents.
+
+        :return: liste de tuples (enregistrement, {niveau: (ids valides, ids sélectionnés valides)})
+        """
+        # (champ de sélection, modèle, [(colonne d'ancêtre, champ de sélection de l'ancêtre)])
+        levels = [
+            ('process_ids', 'workflow.process', [('domain_id', 'domain_ids')]),
+            ('sub_process_ids', 'workflow.subprocess', [('process_id', 'process_ids')]),
+            ('activity_ids', 'workflow.activity', [
+                ('domain_id', 'domain_ids'), ('process_id', 'process_ids'), ('sub_process_id', 'sub_process_ids'),
+            ]),
+            ('procedure_ids', 'workflow.procedure', [
+                ('domain_id', 'domain_ids'), ('process_id', 'process_ids'), ('sub_process_id', 'sub_process_ids'),
+                ('activity_id', 'activity_ids'),
+            ]),
+        ]
+        # Candidats : descendants de toute la sélection du lot (sur-ensemble des sélections valides)
+        candidates = {}
+        for field_name, model_name, ancestors in levels:
+            column, selection_field = ancestors[0]
+            rows = self.env[model_name].sudo().search_read(
+                [(column, 'in', self.mapped(selection_field).ids)], [column for column, _field in ancestors])
+            candidates[field_name] = [
+                (row['id'], [(row[column] and row[column][0], selection) for column, selection in ancestors])
+                for row in rows
+            ]
+
+        result = []
+        for rec in self:
+            selections = {'domain_ids': set(rec.domain_ids.ids)}
+            by_level = {}
+            for field_name, _model_name, _ancestors in levels:
+                valid = {
+                    record_id for record_id, ancestor_ids in candidates[field_name]
+                    if all(ancestor_id in selections[selection] for ancestor_id, selection in ancestor_ids)
+                }
+                selected = [record_id for record_id in rec[field_name].ids if record_id in valid]
+                by_level[field_name] = (valid, selected)
+                selections[field_name] = set(selected)
+            result.append((rec, by_level))
+        return result
+
     @api.depends('domain_ids', 'process_ids', 'sub_process_ids', 'activity_ids')
     def _compute_filtered_elements(self):
         """
         Calcule les listes d'éléments valides pour chaque niveau hiérarchique
-        en se basant sur la sélection du niveau supérieur.
+        en se basant sur la sélection du niveau supérieur, sans modifier la
+        sélection de l'utilisateur (voir `_prune_invalid_selections`).
         """
-        for rec in self:
-            # 1. Processus filtrés par Domaines
-            if rec.domain_ids:
-                all_valid_processes = rec.domain_ids.process_ids.ids
-                rec.filtered_process_ids = [(6, 0, all_valid_processes)]
-                # Nettoyage des processus déjà sélectionnés s'ils ne sont plus valides
-                rec.process_ids = [(6, 0, [pid for pid in rec.process_ids.ids if pid in all_valid_processes])]
-            else:
-                rec.filtered_process_ids = [(5, 0, 0)]
-                rec.process_ids = [(5, 0, 0)]
-
-            # 2. Sous-processus filtrés par Processus
-            if rec.process_ids:
-                all_valid_subprocesses = rec.process_ids.sub_process_ids.ids
-                rec.filtered_subprocess_ids = [(6, 0, all_valid_subprocesses)]
-                # Nettoyage des sous-processus
-                rec.sub_process_ids = [
-                    (6, 0, [spid for spid in rec.sub_process_ids.ids if spid in all_valid_subprocesses])]
-            else:
-                rec.filtered_subprocess_ids = [(5, 0, 0)]
-                rec.sub_process_ids = [(5, 0, 0)]
-
-            # 3. Activités filtrées par Sous-processus
-            if rec.sub_process_ids:
-                all_valid_activities = rec.sub_process_ids.activity_ids.ids
-                rec.filtered_activity_ids = [(6, 0, all_valid_activities)]
-                # Nettoyage des activités
-                rec.activity_ids = [(6, 0, [aid for aid in rec.activity_ids.ids if aid in all_valid_activities])]
-            else:
-                rec.filtered_activity_ids = [(5, 0, 0)]
-                rec.activity_ids = [(5, 0, 0)]
-
-            # 4. Procédures filtrées par Activités
-            if rec.activity_ids:
-                all_valid_procedures = rec.activity_ids.procedure_ids.ids
-                rec.filtered_procedure_ids = [(6, 0, all_valid_procedures)]
-                # Nettoyage des procédures
-                rec.procedure_ids = [(6, 0, [prid for prid in rec.procedure_ids.ids if prid in all_valid_procedures])]
-            else:
-                rec.filtered_procedure_ids = [(5, 0, 0)]
-                rec.procedure_ids = [(5, 0, 0)]
+        for rec, by_level in self._get_valid_elements():
+            rec.filtered_process_ids = [(6, 0, list(by_level['process_ids'][0]))]
+            rec.filtered_subprocess_ids = [(6, 0, list(by_level['sub_process_ids'][0]))]
+            rec.filtered_activity_ids = [(6, 0, list(by_level['activity_ids'][0]))]
+            rec.filtered_procedure_ids = [(6, 0, list(by_level['procedure_ids'][0]))]
+
+    def _prune_invalid_selections(self):
+        """
+        Retire de la sélection les processus, sous-processus, activités et
+        procédures qui ne dépendent plus du niveau supérieur. Seuls les
+        enregistrements dont la sélection change sont modifiés, avec un seul
+        `write` par jeu de valeurs identique.
+        """
+        ids_by_key = defaultdict(list)
+        vals_by_key = {}
+        for rec, by_level in self._get_valid_elements():
+            vals = {
+                field_name: [(6, 0, selected)]
+                for field_name, (_valid, selected) in by_level.items()
+                if len(selected) != len(rec[field_name])
+            }
+            if not vals:
+                continue
+            if isinstance(rec.id, models.NewId):
+                rec.update(vals)
+                continue
+            key = repr(sorted(vals.items()))
+            ids_by_key[key].append(rec.id)
+            vals_by_key[key] = vals
+        for key, record_ids in ids_by_key.items():
+            self.browse(record_ids).write(vals_by_key[key])
+
+    def action_prune_selections(self):
+        """
+        Nettoie explicitement la sélection des entrées (menu Action) : les
+        créations et écritures ne modifient pas la sélection enregistrée.
+        """
+        self._prune_invalid_selections()
+        return True
 
     @api.onchange('domain_ids', 'process_ids', 'sub_process_ids', 'activity_ids')
     def _trigger_compute_filtered_elements(self):
         """
-        Déclenche la mise à jour des champs calculés pour que le domaine dynamique
-        dans la vue XML s'applique immédiatement.
+        Nettoie la sélection dans le formulaire ; les champs filtered_* sont
+        recalculés par l'ORM à partir de leurs dépendances.
         """
-        self._compute_filtered_elements()
+        self._prune_invalid_selections()
         return {}
 
     @api.onchange('domain_ids')
@@ -179,80 +242,165 @@ class WorkflowHierarchy(models.Model):
             self.department_id = self.allowed_department_ids[0]
 
     @api.model
-    def _find_or_create_m2m_records(self, model_name, field_name_in_row):
-        # ... (méthode existante inchangée pour l'importation) ...
-        record_ids = []
-        names_str = self.env.context.get(field_name_in_row)
-        if not names_str:
-            return [(5, 0, 0)]
-        names = [name.strip() for name in names_str.split(',') if name.strip()]
-        for name in names:
-            record = self.env[model_name].search([('name', '=', name)], limit=1)
-            if not record:
-                _logger.info(f"Creating new {model_name}: {name}")
-                try:
-                    record = self.env[model_name].create({'name': name})
-                except Exception as e:
-                    _logger.error(f"Failed to create {model_name} '{name}': {e}", exc_info=True)
-                    continue
-            record_ids.append(record.id)
-        return [(6, 0, record_ids)]
+    def import_hierarchy(self, row):
+        """
+        Importe ou met à jour une ligne de hiérarchie, par `import_hierarchies`.
+        Une ligne en erreur est journalisée et aucune entrée n'est retournée
+        (pas d'entrée 'ERREUR-IMPORT-*').
+        """
+        line = self.import_hierarchies([row])[0]
+        if line['status'] == 'error':
+            _logger.error(f"Error importing workflow hierarchy row: {row}. Error: {line['message']}")
+            return self.browse()
+        return self.browse(line['id'])
+
+    @api.model
+    def _split_hierarchy_names(self, value):
+        """ Découpe une cellule 'A, B, C' en liste de noms. """
+        return [name.strip() for name in (value or '').split(',') if name.strip()]
 
     @api.model
-    def import_hierarchy(self, row):
-        # ... (méthode existante inchangée pour l'importation) ...
+    def _find_or_create_names(self, model_name, names):
         """
-        Méthode pour importer ou mettre à jour une ligne de données avec des champs Many2many.
+        Résout un ensemble de noms en une requête et crée les manquants en un
+        seul `create` groupé ; chaque nom est créé une seule fois. Si le lot
+        échoue, les noms sont créés un par un : un nom refusé est journalisé
+        et absent du résultat sans bloquer les autres.
+
+        :return: dict {nom: id}
+        """
+        name_map = {}
+        if not names:
+            return name_map
+        Model = self.env[model_name]
+        for record in Model.search_read([('name', 'in', list(names))], ['name']):
+            name_map.setdefault(record['name'], record['id'])
+        missing = sorted(set(names) - set(name_map))
+        if missing:
+            _logger.info(f"Creating {len(missing)} new {model_name} records")
+            try:
+                with self.env.cr.savepoint():
+                    name_map.update(zip(missing, Model.create([{'name': name} for name in missing]).ids))
+            except Exception:
+                for name in missing:
+                    try:
+                        with self.env.cr.savepoint():
+                            name_map[name] = Model.create({'name': name}).id
+                    except Exception as e:
+                        _logger.error(f"Failed to create {model_name} '{name}': {e}")
+        return name_map
+
+    @api.model
+    def import_hierarchies(self, rows):
         """
-        hierarchy_name = row.get('name', 'Nouvelle entrée')
-        vals = {'name': hierarchy_name}
-        try:
-            vals['domain_ids'] = self.with_context(domain=row.get('domain'))._find_or_create_m2m_records(
-                'workflow.domain', 'domain'
-            )
-            vals['process_ids'] = self.with_context(process=row.get('process'))._find_or_create_m2m_records(
-                'workflow.process', 'process'
-            )
-            vals['sub_process_ids'] = self.with_context(sub_process=row.get('sub_process'))._find_or_create_m2m_records(
-                'workflow.subprocess', 'sub_process'
-            )
-            vals['activity_ids'] = self.with_context(activity=row.get('activity'))._find_or_create_m2m_records(
-                'workflow.activity', 'activity'
-            )
-            vals['procedure_ids'] = self.with_context(procedure=row.get('procedure'))._find_or_create_m2m_records(
-                'workflow.procedure', 'procedure'
-            )
-            vals['deliverable_ids'] = self.with_context(deliverable=row.get('deliverable'))._find_or_create_m2m_records(
-                'workflow.deliverable', 'deliverable'
-            )
-            vals['task_formulation_ids'] = self.with_context(
-                task_formulation=row.get('task_formulation'))._find_or_create_m2m_records(
-                'workflow.task.formulation', 'task_formulation'
-            )
+        Import en masse de lignes de hiérarchie : colonnes 'name', 'notes',
+        'active' et une colonne de noms séparés par des virgules par niveau
+        (voir HIERARCHY_IMPORT_COLUMNS).
+
+        Tous les noms distincts de chaque niveau sont collectés sur l'ensemble
+        du fichier puis résolus ou créés avec une requête et un `create` groupé
+        par modèle ; les entrées de hiérarchie sont ensuite créées en lot et
+        mises à jour par un `write` par jeu de valeurs identique, à partir
+        d'une seule recherche sur `name`.
+
+        :param rows: itérable de dict
+        :return: liste de dict {'row', 'name', 'status', 'id', 'message'} où
+                 status vaut 'created', 'updated' ou 'error'
+        """
+        rows = list(rows)
+
+        # 1. Noms distincts par modèle sur tout le fichier
+        names_by_model = defaultdict(set)
+        for row in rows:
+            for column, _field, model_name in HIERARCHY_IMPORT_COLUMNS:
+                names_by_model[model_name].update(self._split_hierarchy_names(row.get(column)))
+        name_maps = {
+            model_name: self._find_or_create_names(model_name, names_by_model[model_name])
+            for _column, _field, model_name in HIERARCHY_IMPORT_COLUMNS
+        }
+
+        # 2. Valeurs de chaque ligne ; une entrée répétée est fusionnée dans l'ordre du fichier
+        report = []
+        vals_by_name = {}
+        indexes_by_name = defaultdict(list)
+        for index, row in enumerate(rows):
+            hierarchy_name = row.get('name', 'Nouvelle entrée')
+            report.append({'row': index, 'name': hierarchy_name, 'status': 'error', 'id': False, 'message': ''})
+            vals = {'name': hierarchy_name}
+            unresolved = []
+            for column, field_name, model_name in HIERARCHY_IMPORT_COLUMNS:
+                names = self._split_hierarchy_names(row.get(column))
+                unresolved += [name for name in names if name not in name_maps[model_name]]
+                vals[field_name] = [(6, 0, [name_maps[model_name].get(name) for name in names])] if names else [(5, 0, 0)]
+            if unresolved:
+                report[-1]['message'] = f"Could not create: {', '.join(unresolved)}"
+                continue
             if 'notes' in row:
                 vals['notes'] = row['notes']
             vals['active'] = row.get('active', '1') == '1'
-
-            existing_hierarchy_entry = self.search([('name', '=', hierarchy_name)], limit=1)
-            if existing_hierarchy_entry:
-                _logger.info(f"Updating existing workflow hierarchy entry: {hierarchy_name}")
-                existing_hierarchy_entry.write(vals)
-                return existing_hierarchy_entry
-            else:
-                _logger.info(f"Creating new workflow hierarchy entry: {hierarchy_name}")
-                return self.create(vals)
-        except Exception as e:
-            _logger.error(f"Error importing workflow hierarchy row: {row}. Error: {e}", exc_info=True)
-            return self.create({
-                'name': f"ERREUR-IMPORT-{hierarchy_name}",
-                'notes': f"Failed to import: {row}. Error: {e}",
-                'active': False,
-            })
+            vals_by_name.setdefault(hierarchy_name, {}).update(vals)
+            indexes_by_name[hierarchy_name].append(index)
+
+        def _report(name, status, record_id=False, message=''):
+            for index in indexes_by_name[name]:
+                report[index].update(status=status, id=record_id, message=message)
+
+        # 3. Séparation création / mise à jour (les entrées archivées comprises)
+        existing = {}
+        for record in self.with_context(active_test=False).search_read(
+                [('name', 'in', list(vals_by_name))], ['name']):
+            existing.setdefault(record['name'], record['id'])
+
+        # Mises à jour groupées : un seul write par jeu de valeurs identique
+        # ('name' est exclu, il est déjà égal à celui de l'entrée existante)
+        writes = defaultdict(list)
+        for name, vals in vals_by_name.items():
+            if name in existing:
+                update_vals = {key: value for key, value in vals.items() if key != 'name'}
+                writes[repr(sorted(update_vals.items()))].append((name, update_vals))
+        for group in writes.values():
+            names = [name for name, _vals in group]
+            try:
+                with self.env.cr.savepoint():
+                    self.browse([existing[name] for name in names]).write(group[0][1])
+                for name in names:
+                    _report(name, 'updated', existing[name])
+            except Exception:
+                # Repli entrée par entrée pour isoler les entrées en erreur
+                for name in names:
+                    try:
+                        with self.env.cr.savepoint():
+                            self.browse(existing[name]).write(group[0][1])
+                        _report(name, 'updated', existing[name])
+                    except Exception as e:
+                        _logger.error(f"Error updating workflow hierarchy entry {name}: {e}")
+                        _report(name, 'error', existing[name], str(e))
+
+        to_create = [name for name in vals_by_name if name not in existing]
+        if to_create:
+            try:
+                with self.env.cr.savepoint():
+                    records = self.create([vals_by_name[name] for name in to_create])
+                for name, record in zip(to_create, records):
+                    _report(name, 'created', record.id)
+            except Exception:
+                # Repli ligne par ligne pour isoler les entrées en erreur
+                for name in to_create:
+                    try:
+                        with self.env.cr.savepoint():
+                            _report(name, 'created', self.create(vals_by_name[name]).id)
+                    except Exception as e:
+                        _report(name, 'error', message=str(e))
+
+        _logger.info(f"Workflow hierarchy bulk import: {len(rows)} rows, {len(to_create)} created, "
+                     f"{len(vals_by_name) - len(to_create)} updated")
+        return report
 
 
 # --- MODÈLE workflow.domain ---
 class WorkflowDomain(models.Model):
     _name = 'workflow.domain'
+    _inherit = ['workflow.referential.mixin']
     _description = 'Domaines de workflow (One2many vers processus)'
     name = fields.Char(string='Nom du domaine', required=True)
     dpt_type = fields.Selection(
@@ -270,10 +418,12 @@ class WorkflowDomain(models.Model):
 # --- MODÈLE workflow.process ---
 class WorkflowProcess(models.Model):
     _name = 'workflow.process'
+    _inherit = ['workflow.referential.mixin']
     _description = 'Processus métier (One2many vers sous-processus, Many2one vers domaine)'
 
     name = fields.Char(string='Nom du processus', required=True)
-    domain_id = fields.Many2one('workflow.domain', string='Domaine associé', ondelete='restrict')
+    domain_id = fields.Many2one('workflow.domain', string='Domaine associé', ondelete='restrict',
+                                index=True)
     sub_process_ids = fields.One2many('workflow.subprocess', 'process_id', string='Sous-processus associés')
     # _sql_constraints = [('name_uniq', 'unique (name)', 'Le nom du processus doit être unique !')]
 
@@ -281,9 +431,11 @@ class WorkflowProcess(models.Model):
 # --- MODÈLE workflow.subprocess ---
 class WorkflowSubProcess(models.Model):
     _name = 'workflow.subprocess'
+    _inherit = ['workflow.referential.mixin']
     _description = 'Sous-processus (One2many vers activités, Many2one vers processus)'
     name = fields.Char(string='Nom du sous-processus', required=True)
-    process_id = fields.Many2one('workflow.process', string='Processus associé', ondelete='restrict')
+    process_id = fields.Many2one('workflow.process', string='Processus associé', ondelete='restrict',
+                                 index=True)
     activity_ids = fields.One2many('workflow.activity', 'sub_process_id', string='Activités associées')
     # _sql_constraints = [('name_uniq', 'unique (name)', 'Le nom du sous-processus doit être unique !')]
 
@@ -291,9 +443,16 @@ class WorkflowSubProcess(models.Model):
 # --- MODÈLE workflow.activity ---
 class WorkflowActivity(models.Model):
     _name = 'workflow.activity'
+    _inherit = ['workflow.referential.mixin']
     _description = 'Activités métier (One2many vers procédures et livrables, Many2one vers sous-processus)'
     name = fields.Char(string="Nom de l'activité", required=True)
-    sub_process_id = fields.Many2one('workflow.subprocess', string='Sous-processus associé', ondelete='restrict')
+    sub_process_id = fields.Many2one('workflow.subprocess', string='Sous-processus associé', ondelete='restrict',
+                                     index=True)
+    # Ancêtres dénormalisés (tenus à jour par l'ORM) : « descendants de X » = une égalité indexée
+    process_id = fields.Many2one(related='sub_process_id.process_id', store=True, index=True,
+                                 string='Processus')
+    domain_id = fields.Many2one(related='sub_process_id.process_id.domain_id', store=True, index=True,
+                                string='Domaine')
     procedure_ids = fields.One2many('workflow.procedure', 'activity_id', string='Procédures associées')
     deliverable_ids = fields.One2many('workflow.deliverable', 'activity_id', string='Livrables associés')
     # _sql_constraints = [('name_uniq', 'unique (name)', 'Le nom de l\'activité doit être unique !')]
@@ -302,10 +461,16 @@ class WorkflowActivity(models.Model):
 # --- MODÈLE workflow.procedure ---
 class WorkflowProcedure(models.Model):
     _name = 'workflow.procedure'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'workflow.referential.mixin']
     _description = 'Procédures de workflow (Many2one vers activité, One2many vers formulations de tâches)'
     name = fields.Char(string='Nom de la procédure', required=True)
-    activity_id = fields.Many2one('workflow.activity', string='Activité associée', ondelete='restrict')
+    activity_id = fields.Many2one('workflow.activity', string='Activité associée', ondelete='restrict',
+                                  index=True)
+    # Ancêtres dénormalisés (tenus à jour par l'ORM)
+    sub_process_id = fields.Many2one(related='activity_id.sub_process_id', store=True, index=True,
+                                     string='Sous-processus')
+    process_id = fields.Many2one(related='activity_id.process_id', store=True, index=True, string='Processus')
+    domain_id = fields.Many2one(related='activity_id.domain_id', store=True, index=True, string='Domaine')
     task_formulation_ids = fields.One2many('workflow.task.formulation', 'procedure_id',
                                            string='Formulations de tâches associées')
     # _sql_constraints = [('name_uniq', 'unique (name)', 'Le nom de la procédure doit être unique !')]
@@ -314,9 +479,16 @@ class WorkflowProcedure(models.Model):
 # --- MODÈLE workflow.deliverable ---
 class WorkflowDeliverable(models.Model):
     _name = 'workflow.deliverable'
+    _inherit = ['workflow.referential.mixin']
     _description = 'Livrables de workflow (Many2one vers activité)'
     name = fields.Char(string='Nom du livrable', required=True)
-    activity_id = fields.Many2one('workflow.activity', string='Activité associée', ondelete='restrict')
+    activity_id = fields.Many2one('workflow.activity', string='Activité associée', ondelete='restrict',
+                                  index=True)
+    # Ancêtres dénormalisés (tenus à jour par l'ORM)
+    sub_process_id = fields.Many2one(related='activity_id.sub_process_id', store=True, index=True,
+                                     string='Sous-processus')
+    process_id = fields.Many2one(related='activity_id.process_id', store=True, index=True, string='Processus')
+    domain_id = fields.Many2one(related='activity_id.domain_id', store=True, index=True, string='Domaine')
     # _sql_constraints = [('name_uniq', 'unique (name)', 'Le nom du livrable doit être unique !')]
     # Ajoutez ce champ pour les couleurs des tags
     color = fields.Integer('Color Index', default=0)
@@ -325,7 +497,15 @@ class WorkflowDeliverable(models.Model):
 # --- MODÈLE workflow.task.formulation ---
 class WorkflowTaskFormulation(models.Model):
     _name = 'workflow.task.formulation'
+    _inherit = ['workflow.referential.mixin']
     _description = 'Formulation des tâches (Many2one vers procédure)'
     name = fields.Char(string='Description de la tâche', required=True)
-    procedure_id = fields.Many2one('workflow.procedure', string='Procédure associée', ondelete='restrict')
+    procedure_id = fields.Many2one('workflow.procedure', string='Procédure associée', ondelete='restrict',
+                                   index=True)
+    # Ancêtres dénormalisés (tenus à jour par l'ORM)
+    activity_id = fields.Many2one(related='procedure_id.activity_id', store=True, index=True, string='Activité')
+    sub_process_id = fields.Many2one(related='procedure_id.sub_process_id', store=True, index=True,
+                                     string='Sous-processus')
+    process_id = fields.Many2one(related='procedure_id.process_id', store=True, index=True, string='Processus')
+    domain_id = fields.Many2one(related='procedure_id.domain_id', store=True, index=True, string='Domaine')
     # _sql_constraints = [('name_uniq', 'unique (name)', 'La description de la tâche doit être unique !')]
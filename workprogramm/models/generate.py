@@ -1,13 +1,72 @@
 
 # -*- coding: utf-8 -*-
+import csv
+import io
+import json
 import logging
 from datetime import datetime, timedelta
 import random
-from odoo import api, models
+from odoo import api, fields, models
 from odoo.exceptions import UserError
 
 _logger = logging.getLogger(__name__)
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Répartition des états selon l'ancienneté (jours) : (âge max, états, poids)
+STATE_WEIGHTS_BY_AGE = [
+    (2, ['draft', 'ongoing'], [30, 70]),
+    (5, ['draft', 'ongoing', 'to_validate'], [10, 75, 15]),
+    (10, ['ongoing', 'to_validate', 'validated', 'to_redo'], [55, 25, 15, 5]),
+    (15, ['ongoing', 'to_validate', 'validated', 'refused', 'to_redo', 'done'], [30, 20, 15, 8, 12, 15]),
+    (25, ['to_validate', 'validated', 'refused', 'to_redo', 'incomplete', 'done', 'cancelled'],
+     [12, 18, 5, 10, 10, 40, 5]),
+    (40, ['validated', 'to_redo', 'incomplete', 'done', 'cancelled'], [15, 5, 10, 65, 5]),
+    (None, ['validated', 'incomplete', 'done', 'cancelled'], [10, 8, 75, 7]),
+]
+
+# Pourcentage de complétion (bornes incluses) selon l'état
+COMPLETION_RANGES = {
+    'draft': (0, 10),
+    'ongoing': (20, 80),
+    'to_validate': (85, 99),
+    'validated': (100, 100),
+    'refused': (70, 95),
+    'to_redo': (50, 85),
+    'incomplete': (30, 75),
+    'done': (100, 100),
+    'cancelled': (5, 60),
+}
+
+# Niveau de satisfaction selon l'état : (niveaux, poids) ; False = non renseigné
+SATISFACTION_WEIGHTS = {
+    'done': (['high', 'medium', 'low'], [70, 25, 5]),
+    'validated': (['high', 'medium', 'low'], [60, 30, 10]),
+    'refused': (['low', 'medium', 'high'], [60, 30, 10]),
+    'to_redo': (['low', 'medium', 'high'], [60, 30, 10]),
+    'incomplete': (['low', 'medium'], [65, 35]),
+    'cancelled': ([False, 'low'], [50, 50]),
+}
+
+STATES_WITH_POSTPONES = ['ongoing', 'to_validate', 'validated', 'to_redo', 'done']
+
+# Nombre d'enregistrements par appel à create() en mode volume
+BULK_BATCH_SIZE = 1000
+
+# Nombre de lignes par instruction COPY en mode SQL direct
+COPY_BATCH_SIZE = 50000
+
+# Colonnes de work_program alimentées directement par COPY
+COPY_COLUMNS = [
+    'name', 'my_month', 'week_of', 'my_week_of', 'project_id', 'activity_id', 'procedure_id',
+    'task_description_id', 'work_programm_department_id', 'responsible_id', 'priority', 'complexity',
+    'duration_effort', 'assignment_date', 'initial_deadline', 'actual_deadline', 'nb_postpones', 'state',
+    'completion_percentage', 'satisfaction_level', 'inputs_needed', 'comments', 'champ1', 'champ2',
+]
+
 
 class WorkProgramDataGenerator(models.Model):
     _name = 'work.program.data.generator'
@@ -40,8 +99,6 @@ class WorkProgramDataGenerator(models.Model):
                 programs_per_month
             )
             
-            self.env.cr.commit()
-            
             _logger.info(f"=== GÉNÉRATION TERMINÉE: {programs_created} programmes créés ===")
             
             return {
@@ -57,7 +114,6 @@ class WorkProgramDataGenerator(models.Model):
             
         except Exception as e:
             _logger.error(f"ERREUR GÉNÉRATION: {e}", exc_info=True)
-            self.env.cr.rollback()
             raise UserError(f"Erreur lors de la génération: {str(e)}")
 
     @api.model
@@ -256,7 +312,7 @@ class WorkProgramDataGenerator(models.Model):
         nb_postpones = 0
         actual_deadline = initial_deadline
         
-        if state in ['ongoing', 'to_validate', 'validated', 'to_redo', 'done'] and random.random() < 0.35:
+        if state in STATES_WITH_POSTPONES and random.random() < 0.35:
             nb_postpones = random.randint(1, 3)
             actual_deadline = initial_deadline + timedelta(days=nb_postpones * random.randint(3, 7))
         
@@ -266,17 +322,17 @@ class WorkProgramDataGenerator(models.Model):
         comments = self._generate_comments(state, activity.name, department.name)
         
         # === RELATIONS WORKFLOW (utilise la hiérarchie existante) ===
-        procedure = self.env['workflow.procedure'].search([('activity_id', '=', activity.id)], limit=1)
+        cache = self.env['workflow.referential.cache']
+        procedure = self.env['workflow.procedure'].browse(cache.get_children('workflow.procedure', activity.id)[:1])
         
         task_description = False
         if procedure:
-            task_description = self.env['workflow.task.formulation'].search(
-                [('procedure_id', '=', procedure.id)], 
-                limit=1
+            task_description = self.env['workflow.task.formulation'].browse(
+                cache.get_children('workflow.task.formulation', procedure.id)[:1]
             )
         
         # Livrables (1 à 3 max)
-        deliverables = self.env['workflow.deliverable'].search([('activity_id', '=', activity.id)])
+        deliverables = self.env['workflow.deliverable'].browse(cache.get_children('workflow.deliverable', activity.id))
         deliverable_ids = False
         if deliverables:
             nb_deliverables = random.randint(1, min(3, len(deliverables)))
@@ -361,6 +417,445 @@ class WorkProgramDataGenerator(models.Model):
             'champ2': f"Contexte mission {activity.name[:30]}" if department.dpt_type == 'external' else '',
         }
 
+    # =========================================================================
+    # MODE VOLUME (TESTS DE CHARGE)
+    # =========================================================================
+
+    @api.model
+    def generate_work_programs_bulk(self, months_past=6, months_future=6, programs_per_month=1000,
+                                    seed=None, batch_size=BULK_BATCH_SIZE):
+        """
+        Génère un grand volume de WorkPrograms pour les tests de charge
+
+        Les correspondances activité → procédure → formulation → livrables et
+        les pools d'employés sont chargés une seule fois ; tous les attributs
+        aléatoires d'un mois sont tirés en une passe NumPy, puis les
+        programmes sont créés par lots.
+
+        :param programs_per_month: Nombre de programmes par mois et par type de département (défaut: 1000)
+        :param seed: Graine du générateur aléatoire pour des jeux de données reproductibles
+        :param batch_size: Nombre d'enregistrements par appel à create()
+        """
+        if np is None:
+            raise UserError("La bibliothèque Python 'numpy' est requise pour la génération en volume.")
+
+        _logger.info(f"=== DÉBUT GÉNÉRATION WORK PROGRAMS EN VOLUME (seed={seed}) ===")
+
+        try:
+            if not self._validate_prerequisites():
+                raise UserError("Données de base manquantes. Vérifiez les départements, employés, projets et workflows.")
+
+            base_data = self._get_base_data()
+            workflow_maps = self._preload_workflow_maps()
+            rng = np.random.default_rng(seed)
+
+            # Pas de suivi ni de message de chatter pour les données de test
+            WorkProgram = self.env['work.program'].with_context(
+                tracking_disable=True, mail_create_nolog=True, mail_create_nosubscribe=True)
+            programs_created = 0
+            base_date = datetime(2025, 10, 10)
+
+            for month_offset in range(-months_past, months_future + 1):
+                month_start, month_end = self._calculate_month_boundaries(base_date, month_offset)
+
+                for dpt_type in ('internal', 'external'):
+                    department = base_data[f'{dpt_type}_dept']
+                    employees = base_data[f'{dpt_type}_employees']
+                    activities = base_data[f'{dpt_type}_activities']
+                    if not (department and employees and activities):
+                        continue
+
+                    vals_list = self._build_month_batch(
+                        rng, programs_per_month, employees, base_data['projects'], activities,
+                        department, month_start, month_end, workflow_maps
+                    )
+                    for start in range(0, len(vals_list), batch_size):
+                        WorkProgram.create(vals_list[start:start + batch_size])
+                    programs_created += len(vals_list)
+
+                _logger.info(f"Mois {month_start:%Y-%m} généré ({programs_created} programmes au total)")
+
+            _logger.info(f"=== GÉNÉRATION EN VOLUME TERMINÉE: {programs_created} programmes créés ===")
+
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': 'Succès',
+                    'message': f'{programs_created} programmes de travail générés avec succès !',
+                    'type': 'success',
+                    'sticky': False,
+                }
+            }
+
+        except Exception as e:
+            _logger.error(f"ERREUR GÉNÉRATION EN VOLUME: {e}", exc_info=True)
+            raise UserError(f"Erreur lors de la génération: {str(e)}")
+
+    @api.model
+    def generate_work_programs_copy(self, months_past=6, months_future=6, programs_per_month=100000, seed=None):
+        """
+        Génère des jeux de données de plusieurs millions de programmes (planification de capacité)
+
+        Les valeurs sont tirées comme en mode volume puis écrites directement
+        dans `work_program` et ses tables de relation (livrables, supports)
+        par COPY PostgreSQL depuis un tampon mémoire : ni ORM, ni séquence,
+        ni suivi, ni chatter. Les caches de l'ORM sont invalidés à la fin.
+
+        :param programs_per_month: Nombre de programmes par mois et par type de département (défaut: 100000)
+        :param seed: Graine du générateur aléatoire pour des jeux de données reproductibles
+        """
+        if np is None:
+            raise UserError("La bibliothèque Python 'numpy' est requise pour la génération en volume.")
+
+        _logger.info(f"=== DÉBUT GÉNÉRATION WORK PROGRAMS PAR COPY (seed={seed}) ===")
+
+        try:
+            if not self._validate_prerequisites():
+                raise UserError("Données de base manquantes. Vérifiez les départements, employés, projets et workflows.")
+
+            base_data = self._get_base_data()
+            workflow_maps = self._preload_workflow_maps()
+            rng = np.random.default_rng(seed)
+            WorkProgram = self.env['work.program']
+            # Les écritures ORM en attente doivent précéder les COPY
+            WorkProgram.flush()
+
+            programs_created = 0
+            for month_offset, dpt_type in self._get_copy_steps(months_past, months_future):
+                programs_created += self._generate_copy_step(
+                    rng, base_data, workflow_maps, month_offset, dpt_type, programs_per_month)
+
+            WorkProgram.invalidate_cache()
+            self.env.cr.execute(f'ANALYZE "{WorkProgram._table}"')
+
+            _logger.info(f"=== GÉNÉRATION PAR COPY TERMINÉE: {programs_created} programmes créés ===")
+
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': 'Succès',
+                    'message': f'{programs_created} programmes de travail générés avec succès !',
+                    'type': 'success',
+                    'sticky': False,
+                }
+            }
+
+        except Exception as e:
+            _logger.error(f"ERREUR GÉNÉRATION PAR COPY: {e}", exc_info=True)
+            raise UserError(f"Erreur lors de la génération: {str(e)}")
+
+    @api.model
+    def enqueue_generation(self, months_past=6, months_future=6, programs_per_month=100000, seed=None):
+        """
+        Met en file une génération par COPY exécutée par le cron (une étape
+        committée par mois et type de département) ; retourne aussitôt l'id
+        de la tâche work.program.job à suivre.
+        """
+        if np is None:
+            raise UserError("La bibliothèque Python 'numpy' est requise pour la génération en volume.")
+        if not self._validate_prerequisites():
+            raise UserError("Données de base manquantes. Vérifiez les départements, employés, projets et workflows.")
+        job = self.env['work.program.job']._enqueue({
+            'name': f"Génération : {programs_per_month} programmes par mois",
+            'job_type': 'generate',
+            'total_steps': len(self._get_copy_steps(months_past, months_future)),
+            'params': json.dumps({
+                'months_past': months_past,
+                'months_future': months_future,
+                'programs_per_month': programs_per_month,
+                'seed': seed,
+            }),
+        })
+        return job.id
+
+    @api.model
+    def _get_copy_steps(self, months_past, months_future):
+        """Étapes de la génération par COPY : un couple (décalage du mois, type de département) par étape"""
+        return [(month_offset, dpt_type)
+                for month_offset in range(-months_past, months_future + 1)
+                for dpt_type in ('internal', 'external')]
+
+    @api.model
+    def _generate_copy_step(self, rng, base_data, workflow_maps, month_offset, dpt_type, programs_per_month):
+        """
+        Génère par COPY les programmes d'un mois pour un type de département ;
+        retourne le nombre de programmes créés (0 si les données de base manquent)
+        """
+        department = base_data[f'{dpt_type}_dept']
+        employees = base_data[f'{dpt_type}_employees']
+        activities = base_data[f'{dpt_type}_activities']
+        if not (department and employees and activities):
+            return 0
+
+        month_start, month_end = self._calculate_month_boundaries(datetime(2025, 10, 10), month_offset)
+        programs_created = 0
+        for start in range(0, programs_per_month, COPY_BATCH_SIZE):
+            vals_list = self._build_month_batch(
+                rng, min(COPY_BATCH_SIZE, programs_per_month - start), employees,
+                base_data['projects'], activities, department, month_start, month_end, workflow_maps
+            )
+            programs_created += self._copy_work_programs(vals_list)
+
+        _logger.info(f"Mois {month_start:%Y-%m} ({dpt_type}) généré : {programs_created} programmes")
+        return programs_created
+
+    @api.model
+    def _copy_work_programs(self, vals_list):
+        """Écrit un lot de valeurs dans work_program et ses tables M2M par COPY ; retourne le nombre de lignes"""
+        if not vals_list:
+            return 0
+
+        WorkProgram = self.env['work.program']
+        cr = self.env.cr
+
+        # Réservation des identifiants pour pouvoir remplir les tables de relation
+        cr.execute("SELECT nextval(%s) FROM generate_series(1, %s)", [f"{WorkProgram._table}_id_seq", len(vals_list)])
+        record_ids = [row[0] for row in cr.fetchall()]
+
+        now = fields.Datetime.now()
+        uid = self.env.uid
+        program_rows = []
+        relation_rows = {'deliverable_ids': [], 'support_ids': []}
+        for record_id, vals in zip(record_ids, vals_list):
+            program_rows.append(
+                [record_id] + [vals.get(column) for column in COPY_COLUMNS]
+                + list(WorkProgram._get_period_buckets(vals.get('assignment_date')))
+                + [uid, 0, uid, now, uid, now])
+            for field_name, rows in relation_rows.items():
+                for command in vals.get(field_name) or []:
+                    rows.extend((record_id, related_id) for related_id in command[2])
+
+        self._copy_rows(
+            WorkProgram._table,
+            ['id'] + COPY_COLUMNS + ['week_start', 'period_month',
+                                     'user_id', 'color', 'create_uid', 'create_date', 'write_uid', 'write_date'],
+            program_rows
+        )
+        for field_name, rows in relation_rows.items():
+            field = WorkProgram._fields[field_name]
+            self._copy_rows(field.relation, [field.column1, field.column2], rows)
+        # Les statistiques journalières du dashboard (qc_dashboard) ne sont pas tenues par l'ORM ici :
+        # les jours générés sont recalculés avant le commit
+        if 'work.program.daily.stat' in self.env:
+            self.env['work.program.daily.stat']._mark_days({vals.get('assignment_date') for vals in vals_list})
+
+        return len(record_ids)
+
+    @api.model
+    def _copy_rows(self, table, columns, rows):
+        """Envoie des lignes à PostgreSQL par COPY (format CSV, False/None = NULL)"""
+        if not rows:
+            return
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([None if value is False else value for value in row])
+        buffer.seek(0)
+        column_list = ', '.join(f'"{column}"' for column in columns)
+        self.env.cr.copy_expert(f'COPY "{table}" ({column_list}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+    @api.model
+    def _preload_workflow_maps(self):
+        """Correspondances de la hiérarchie workflow, lues dans le cache du référentiel"""
+        cache = self.env['workflow.referential.cache']
+
+        # Première procédure (ordre du modèle) par activité, première formulation par procédure
+        procedure_by_activity = {
+            activity_id: procedure_ids[0]
+            for activity_id, procedure_ids in cache.get_children_map('workflow.procedure').items() if activity_id
+        }
+        formulation_by_procedure = {
+            procedure_id: formulation_ids[0]
+            for procedure_id, formulation_ids in cache.get_children_map('workflow.task.formulation').items()
+            if procedure_id
+        }
+        deliverables_by_activity = {
+            activity_id: list(deliverable_ids)
+            for activity_id, deliverable_ids in cache.get_children_map('workflow.deliverable').items() if activity_id
+        }
+
+        return {
+            'procedure_by_activity': procedure_by_activity,
+            'formulation_by_procedure': formulation_by_procedure,
+            'deliverables_by_activity': deliverables_by_activity,
+        }
+
+    @api.model
+    def _draw_indexes(self, rng, weights, size):
+        """Tire `size` indices selon des poids relatifs"""
+        probabilities = np.asarray(weights, dtype=float)
+        return rng.choice(len(probabilities), size=size, p=probabilities / probabilities.sum())
+
+    @api.model
+    def _draw_states_by_age(self, rng, days_ago):
+        """Version vectorisée de _get_state_by_age"""
+        states = np.full(len(days_ago), 'draft', dtype=object)
+        previous_age = -1
+        for max_age, choices, weights in STATE_WEIGHTS_BY_AGE:
+            mask = days_ago > previous_age
+            if max_age is not None:
+                mask &= days_ago <= max_age
+            count = int(mask.sum())
+            if count:
+                states[mask] = np.array(choices, dtype=object)[self._draw_indexes(rng, weights, count)]
+            previous_age = max_age
+        return states
+
+    @api.model
+    def _draw_samples(self, rng, pool_size, size, nb_max):
+        """
+        Tire pour chaque ligne `nb_max` indices distincts dans [0, pool_size)
+        (clés aléatoires + argpartition, sans boucle Python)
+        """
+        nb_max = min(nb_max, pool_size)
+        if not nb_max:
+            return np.empty((size, 0), dtype=int)
+        keys = rng.random((size, pool_size), dtype=np.float32)
+        if nb_max == pool_size:
+            return np.argsort(keys, axis=1)
+        return np.argpartition(keys, nb_max - 1, axis=1)[:, :nb_max]
+
+    @api.model
+    def _build_month_batch(self, rng, size, employees, projects, activities, department,
+                           month_start, month_end, workflow_maps):
+        """Construit en une passe vectorisée les valeurs de `size` programmes d'un mois"""
+
+        # === SÉLECTIONS ALÉATOIRES ===
+        employee_ids = np.array([employee.id for employee in employees])
+        project_ids = projects.ids
+        project_names = projects.mapped('name')
+        activity_names = [activity.name for activity in activities]
+        activity_ids = np.array([activity.id for activity in activities])
+
+        employee_idx = rng.integers(0, len(employees), size)
+        project_idx = rng.integers(0, len(projects), size)
+        activity_idx = rng.integers(0, len(activities), size)
+
+        # === CALCULS TEMPORELS ===
+        days = rng.integers(1, month_end.day + 1, size)
+        deadline_offsets = rng.integers(7, 29, size)
+        today = datetime.now().date()
+        days_ago = (today - month_start.date()).days - (days - 1)
+        states = self._draw_states_by_age(rng, days_ago)
+
+        postponed = np.isin(states, STATES_WITH_POSTPONES) & (rng.random(size) < 0.35)
+        nb_postpones = np.where(postponed, rng.integers(1, 4, size), 0)
+        delays = nb_postpones * rng.integers(3, 8, size)
+
+        # === MÉTRIQUES SELON ÉTAT ===
+        completions = np.full(size, 50)
+        satisfactions = np.full(size, False, dtype=object)
+        for state in set(states):
+            mask = states == state
+            count = int(mask.sum())
+            if state in COMPLETION_RANGES:
+                low, high = COMPLETION_RANGES[state]
+                completions[mask] = rng.integers(low, high + 1, count)
+            if state in SATISFACTION_WEIGHTS:
+                levels, weights = SATISFACTION_WEIGHTS[state]
+                satisfactions[mask] = np.array(levels, dtype=object)[self._draw_indexes(rng, weights, count)]
+
+        levels = np.array(['low', 'medium', 'high'], dtype=object)
+        priorities = levels[rng.integers(0, 3, size)]
+        complexities = levels[rng.integers(0, 3, size)]
+
+        # === EFFORT SELON DÉPARTEMENT ===
+        if department.name == 'Support':
+            base_efforts = np.array([4, 8, 12, 16, 24, 32])
+        else:  # Consulting
+            base_efforts = np.array([8, 16, 24, 32, 40, 56, 72])
+        efforts = base_efforts[rng.integers(0, len(base_efforts), size)] + rng.integers(-4, 9, size)
+
+        # === COLLABORATEURS SUPPORT (0 à 3, hors responsable) ===
+        # Un tirage de 4 candidats distincts garantit 3 supports après exclusion du responsable
+        support_candidates = employee_ids[self._draw_samples(rng, len(employee_ids), size, 4)]
+        nb_supports = rng.integers(0, min(3, len(employee_ids) - 1) + 1, size)
+
+        # === LIVRABLES (1 à 3 parmi ceux de l'activité) ===
+        deliverable_ids = [False] * size
+        for index in np.unique(activity_idx):
+            pool = workflow_maps['deliverables_by_activity'].get(int(activity_ids[index]))
+            if not pool:
+                continue
+            rows = np.flatnonzero(activity_idx == index)
+            samples = np.array(pool)[self._draw_samples(rng, len(pool), len(rows), 3)]
+            counts = rng.integers(1, min(3, len(pool)) + 1, len(rows))
+            for row, sample, count in zip(rows, samples, counts):
+                deliverable_ids[row] = [(6, 0, sample[:count].tolist())]
+
+        comment_draws = rng.random(size)
+
+        # === CONSTRUCTION DES DICTIONNAIRES ===
+        is_external = department.dpt_type == 'external'
+        templates_by_activity = {}
+        vals_list = []
+        for i in range(size):
+            activity_id = int(activity_ids[activity_idx[i]])
+            activity_name = activity_names[activity_idx[i]]
+            employee_id = int(employee_ids[employee_idx[i]])
+            state = states[i]
+            assignment_date = datetime(month_start.year, month_start.month, int(days[i]))
+            initial_deadline = assignment_date + timedelta(days=int(deadline_offsets[i]))
+            actual_deadline = initial_deadline + timedelta(days=int(delays[i]))
+
+            procedure_id = workflow_maps['procedure_by_activity'].get(activity_id, False)
+            task_description_id = workflow_maps['formulation_by_procedure'].get(procedure_id, False)
+
+            supports = [int(emp_id) for emp_id in support_candidates[i] if emp_id != employee_id][:nb_supports[i]]
+
+            if activity_name not in templates_by_activity:
+                templates_by_activity[activity_name] = self._get_comments_templates(activity_name, department.name)
+            templates = templates_by_activity[activity_name].get(state, ["Programme en cours"])
+            week_number = assignment_date.isocalendar()[1]
+
+            vals_list.append({
+                'name': (f"{department.name[:3].upper()}-"
+                         f"{project_names[project_idx[i]][:12]}-"
+                         f"{activity_name[:20]}-"
+                         f"S{week_number:02d}"),
+                'my_month': self._get_month_name(assignment_date),
+                'week_of': week_number,
+                'my_week_of': self._get_monday_str(assignment_date),
+
+                # Relations
+                'project_id': project_ids[project_idx[i]],
+                'activity_id': activity_id,
+                'procedure_id': procedure_id,
+                'task_description_id': task_description_id,
+                'deliverable_ids': deliverable_ids[i],
+                'support_ids': [(6, 0, supports)] if supports else False,
+                'work_programm_department_id': department.id,
+                'responsible_id': employee_id,
+
+                # Caractéristiques
+                'priority': priorities[i],
+                'complexity': complexities[i],
+                'duration_effort': int(efforts[i]),
+
+                # Dates
+                'assignment_date': assignment_date.date(),
+                'initial_deadline': initial_deadline.date(),
+                'actual_deadline': actual_deadline.date(),
+                'nb_postpones': int(nb_postpones[i]),
+
+                # État et progression
+                'state': state,
+                'completion_percentage': int(completions[i]),
+                'satisfaction_level': satisfactions[i],
+
+                # Descriptions
+                'inputs_needed': self._generate_inputs(activity_name, department.name),
+                'comments': templates[int(comment_draws[i] * len(templates))],
+
+                # Champs externes (si applicable)
+                'champ1': f"Données {department.name}" if is_external else '',
+                'champ2': f"Contexte mission {activity_name[:30]}" if is_external else '',
+            })
+
+        return vals_list
+
     # =========================================================================
     # MÉTHODES DE GÉNÉRATION INTELLIGENTE
     # =========================================================================
@@ -373,73 +868,30 @@ class WorkProgramDataGenerator(models.Model):
         
         if days_ago < 0:  # Futur
             return 'draft'
-        elif days_ago <= 2:
-            return random.choices(['draft', 'ongoing'], weights=[30, 70])[0]
-        elif days_ago <= 5:
-            return random.choices(['draft', 'ongoing', 'to_validate'], weights=[10, 75, 15])[0]
-        elif days_ago <= 10:
-            return random.choices(
-                ['ongoing', 'to_validate', 'validated', 'to_redo'],
-                weights=[55, 25, 15, 5]
-            )[0]
-        elif days_ago <= 15:
-            return random.choices(
-                ['ongoing', 'to_validate', 'validated', 'refused', 'to_redo', 'done'],
-                weights=[30, 20, 15, 8, 12, 15]
-            )[0]
-        elif days_ago <= 25:
-            return random.choices(
-                ['to_validate', 'validated', 'refused', 'to_redo', 'incomplete', 'done', 'cancelled'],
-                weights=[12, 18, 5, 10, 10, 40, 5]
-            )[0]
-        elif days_ago <= 40:
-            return random.choices(
-                ['validated', 'to_redo', 'incomplete', 'done', 'cancelled'],
-                weights=[15, 5, 10, 65, 5]
-            )[0]
-        else:  # Ancien (40+ jours)
-            return random.choices(
-                ['validated', 'incomplete', 'done', 'cancelled'],
-                weights=[10, 8, 75, 7]
-            )[0]
+        for max_age, states, weights in STATE_WEIGHTS_BY_AGE:
+            if max_age is None or days_ago <= max_age:
+                return random.choices(states, weights=weights)[0]
 
     @api.model
     def _get_completion_by_state(self, state):
         """Pourcentage de complétion selon l'état"""
-        completion_map = {
-            'draft': random.randint(0, 10),
-            'ongoing': random.randint(20, 80),
-            'to_validate': random.randint(85, 99),
-            'validated': 100,
-            'refused': random.randint(70, 95),
-            'to_redo': random.randint(50, 85),
-            'incomplete': random.randint(30, 75),
-            'done': 100,
-            'cancelled': random.randint(5, 60)
-        }
-        return completion_map.get(state, 50)
+        if state not in COMPLETION_RANGES:
+            return 50
+        return random.randint(*COMPLETION_RANGES[state])
 
     @api.model
     def _get_satisfaction_by_state(self, state):
         """Niveau de satisfaction selon l'état"""
-        if state in ['draft', 'ongoing', 'to_validate']:
+        if state not in SATISFACTION_WEIGHTS:
             return False
-        elif state == 'done':
-            return random.choices(['high', 'medium', 'low'], weights=[70, 25, 5])[0]
-        elif state == 'validated':
-            return random.choices(['high', 'medium', 'low'], weights=[60, 30, 10])[0]
-        elif state in ['refused', 'to_redo']:
-            return random.choices(['low', 'medium', 'high'], weights=[60, 30, 10])[0]
-        elif state == 'incomplete':
-            return random.choices(['low', 'medium'], weights=[65, 35])[0]
-        else:  # cancelled
-            return random.choice([False, 'low'])
+        levels, weights = SATISFACTION_WEIGHTS[state]
+        return random.choices(levels, weights=weights)[0]
 
     @api.model
-    def _generate_comments(self, state, activity_name, dept_name):
-        """Génère des commentaires contextuels"""
+    def _get_comments_templates(self, activity_name, dept_name):
+        """Modèles de commentaires contextuels par état"""
         
-        comments_templates = {
+        return {
             'draft': [
                 "Programme planifié - En attente de démarrage",
                 "Nouvellement créé - Ressources à allouer",
@@ -494,8 +946,12 @@ class WorkProgramDataGenerator(models.Model):
                 "Plus nécessaire suite réorganisation"
             ]
         }
+
+    @api.model
+    def _generate_comments(self, state, activity_name, dept_name):
+        """Génère des commentaires contextuels"""
         
-        templates = comments_templates.get(state, ["Programme en cours"])
+        templates = self._get_comments_templates(activity_name, dept_name).get(state, ["Programme en cours"])
         return random.choice(templates)
 
     @api.model
@@ -536,15 +992,9 @@ class WorkProgramDataGenerator(models.Model):
     @api.model
     def _get_month_name(self, date_obj):
         """Retourne le nom du mois en français"""
-        months = {
-            1: 'janvier', 2: 'fevrier', 3: 'mars', 4: 'avril',
-            5: 'mai', 6: 'juin', 7: 'juillet', 8: 'aout',
-            9: 'septembre', 10: 'octobre', 11: 'novembre', 12: 'decembre'
-        }
-        return months.get(date_obj.month, 'janvier')
+        return self.env['work.program.calendar'].get_month_key(date_obj)
 
     @api.model
     def _get_monday_str(self, date_obj):
         """Retourne la date du lundi de la semaine au format YYYY-MM-DD"""
-        monday = date_obj - timedelta(days=date_obj.weekday())
-        return monday.strftime('%Y-%m-%d')
\ No newline at end of file
+        return self.env['work.program.calendar'].get_monday_str(date_obj)
\ No newline at end of file
@@ -1,3 +1,5 @@
+from collections import defaultdict
+
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
 
@@ -33,7 +35,14 @@ class ProjectProject(models.Model):
         help="Sous-catégories associées à la pratique sélectionnée."
     )
 
-
+    # Practice uniquement pour les projets externes (vérifié par la base, y compris en import de masse).
+    # Sur une base contenant déjà des lignes invalides, Odoo n'ajoute pas la contrainte (simple avertissement) :
+    # _check_practice_id reste donc en place.
+    _sql_constraints = [
+        ('practice_external_only',
+         "CHECK (practice_id IS NULL OR (project_type IS NOT NULL AND project_type = 'external'))",
+         "Le champ 'Practice' ne peut être défini que pour les projets de type 'External'."),
+    ]
 
     @api.onchange('project_type')
     def _onchange_project_type(self):
@@ -67,58 +76,35 @@ class ProjectProject(models.Model):
     @api.constrains('test_department_ids', 'project_type')
     def _check_test_department_ids(self):
         """
-        Vérifie que test_department_ids correspond au type de projet.
+        Vérifie que test_department_ids correspond au type de projet : une
+        requête par type de projet distinct, puis des tests d'appartenance.
         """
+        department_ids_by_type = defaultdict(set)
         for record in self:
             if record.project_type:
-                valid_dept_ids = self.env['hr.department'].search([('dpt_type', '=', record.project_type)]).ids
-                invalid_depts = [dept.id for dept in record.test_department_ids if dept.id not in valid_dept_ids]
-                if invalid_depts:
-                    raise ValidationError(
-                        "Les départements sélectionnés dans 'Departments' doivent correspondre au type de projet.")
-
-    @api.constrains('practice_id', 'project_type')
-    def _check_practice_id(self):
-        """
-        Vérifie que practice_id est défini uniquement pour les projets externes.
-        """
+                department_ids_by_type[record.project_type].update(record.test_department_ids.ids)
+
+        valid_ids_by_type = {
+            project_type: set(self.env['hr.department'].search([
+                ('id', 'in', list(department_ids)),
+                ('dpt_type', '=', project_type),
+            ]).ids)
+            for project_type, department_ids in department_ids_by_type.items() if department_ids
+        }
         for record in self:
-            if record.practice_id and record.project_type != 'external':
+            if record.project_type and not set(record.test_department_ids.ids) <= valid_ids_by_type.get(
+                    record.project_type, set()):
                 raise ValidationError(
-                    "Le champ 'Practice' ne peut être défini que pour les projets de type 'External'.")
-
-    @api.onchange('test_department_ids')
-    def _onchange_test_department(self):
-        """
-        Met à jour workflow_hierarchy_ids en fonction des départements sélectionnés.
-        """
-        related_workflows = self.env['workflow.hierarchy'].search([
-            ('department_id', 'in', self.test_department_ids.ids)
-        ])
-        self.workflow_hierarchy_ids = [(6, 0, related_workflows.ids)]
-
-    @api.constrains('test_department_ids', 'project_type')
-    def _check_test_department_ids(self):
-        """
-        Vérifie que test_department_ids correspond au type de projet.
-        """
-        for record in self:
-            if record.project_type:
-                valid_dept_ids = self.env['hr.department'].search([('dpt_type', '=', record.project_type)]).ids
-                invalid_depts = [dept.id for dept in record.test_department_ids if dept.id not in valid_dept_ids]
-                if invalid_depts:
-                    raise ValidationError(
-                        "Les départements sélectionnés dans 'Departments' doivent correspondre au type de projet.")
+                    "Les départements sélectionnés dans 'Departments' doivent correspondre au type de projet.")
 
     @api.constrains('practice_id', 'project_type')
     def _check_practice_id(self):
         """
         Vérifie que practice_id est défini uniquement pour les projets externes.
         """
-        for record in self:
-            if record.practice_id and record.project_type != 'external':
-                raise ValidationError(
-                    "Le champ 'Practice' ne peut être défini que pour les projets de type 'External'.")
+        if self.filtered(lambda record: record.practice_id and record.project_type != 'external'):
+            raise ValidationError(
+                "Le champ 'Practice' ne peut être défini que pour les projets de type 'External'.")
 
     @api.onchange('test_department_ids')
     def _onchange_test_department(self):
@@ -129,11 +115,11 @@ class ProjectProject(models.Model):
             ('department_id', 'in', self.test_department_ids.ids)
         ])
         self.workflow_hierarchy_ids = [(6, 0, related_workflows.ids)]
-        om_field_3 = fields.Many2one('res.partner', string='Partenaire Associé')
 
 
 class Practice(models.Model):
     _name = 'practice.practice'
+    _inherit = ['workflow.referential.mixin']
     _description = 'Practice'
 
     name = fields.Char(string='Name', required=True)
@@ -159,6 +145,7 @@ class Practice(models.Model):
 
 class PracticeSubcategory(models.Model):
     _name = 'practice.subcategory'
+    _inherit = ['workflow.referential.mixin']
     _description = 'Practice Subcategory'
 
     name = fields.Char(string='Name', required=True)
@@ -1,9 +1,14 @@
 # -*- coding: utf-8 -*-
-import calendar
+import json
 import logging
-from datetime import datetime, date, timedelta
+from collections import defaultdict
+from datetime import date, timedelta
 
-from odoo import models, api, fields, _
+from markupsafe import Markup
+from psycopg2 import IntegrityError, errorcodes
+from werkzeug.urls import url_encode
+
+from odoo import models, api, fields, tools, _
 from odoo.exceptions import UserError, ValidationError
 
 _logger = logging.getLogger(__name__)
@@ -15,13 +20,64 @@ MONTH_KEYS_MAP = {
     'september': 'septembre', 'october': 'octobre', 'november': 'novembre', 'december': 'decembre'
 }
 
+# Colonnes d'import résolues par nom : (colonne du fichier, champ work.program, modèle cible)
+IMPORT_MANY2ONE_COLUMNS = [
+    ('Departments', 'work_programm_department_id', 'hr.department'),
+    ('Project', 'project_id', 'project.project'),
+    ('Activity', 'activity_id', 'workflow.activity'),
+    ('Task Type (Procedure)', 'procedure_id', 'workflow.procedure'),
+    ('Task Description', 'task_description_id', 'workflow.task.formulation'),
+    ('Responsible', 'responsible_id', 'hr.employee'),
+]
+# Colonnes multi-valeurs séparées par des virgules
+IMPORT_MANY2MANY_COLUMNS = [
+    ('Task Deliverable(s)', 'deliverable_ids', 'workflow.deliverable'),
+    ('Support', 'support_ids', 'hr.employee'),
+]
+# Nombre d'enregistrements par appel à create() lors de l'import en masse
+IMPORT_BATCH_SIZE = 1000
+
+# Champs relationnels d'une soumission (formulaire public / API par lot) : champ -> modèle cible
+SUBMIT_MANY2ONE_FIELDS = {
+    'project_id': 'project.project',
+    'activity_id': 'workflow.activity',
+    'procedure_id': 'workflow.procedure',
+    'task_description_id': 'workflow.task.formulation',
+    'responsible_id': 'hr.employee',
+    'work_programm_department_id': 'hr.department',
+}
+SUBMIT_MANY2MANY_FIELDS = {
+    'deliverable_ids': 'workflow.deliverable',
+    'support_ids': 'hr.employee',
+}
+# Nombre maximal de programmes par appel à l'API de soumission par lot
+SUBMIT_MAX_BATCH_SIZE = 1000
+
+# Index composites et partiels des filtres fréquents (liste, recherche, dashboard) : nom -> définition
+PERFORMANCE_INDEXES = {
+    # Filtres semaine / mois combinés à l'état et au département
+    'work_program_week_state_department_idx': '(week_start, state, work_programm_department_id)',
+    'work_program_month_state_department_idx': '(period_month, state, work_programm_department_id)',
+    # "Mes Tâches" / grille filtrée par responsable, avec l'état
+    'work_program_responsible_state_idx': '(responsible_id, state)',
+    # "Mon Département" et projet, bornés par la date d'assignation
+    'work_program_department_assignment_idx': '(work_programm_department_id, assignment_date)',
+    'work_program_project_assignment_idx': '(project_id, assignment_date)',
+    # Tâches en retard : seuls les programmes non clôturés sont indexés
+    'work_program_open_deadline_idx': "(initial_deadline) WHERE state NOT IN ('validated', 'done', 'cancelled')",
+}
+
+# Nombre maximal de programmes listés dans une notification groupée de changement d'état
+DIGEST_MAX_LINES = 50
+
 
 class WorkProgram(models.Model):
     _name = 'work.program'
     _inherit = ['mail.thread', 'mail.activity.mixin']
     _description = 'Programme de travail'
 
-    user_id = fields.Many2one('res.users', default=lambda self: self.env.user, string='Utilisateur Associé')
+    user_id = fields.Many2one('res.users', default=lambda self: self.env.user, string='Utilisateur Associé',
+                              index=True)
 
     # Remplacement du champ 'status' par 'state' pour le workflow
     state = fields.Selection([
@@ -34,19 +90,27 @@ class WorkProgram(models.Model):
         ('incomplete', 'Inachevé'),
         ('done', 'Terminé'),
         ('cancelled', 'Annulé')
-    ], string='État', default='draft', tracking=True)
+    ], string='État', default='draft', tracking=True, index=True)
 
     work_programm_department_id = fields.Many2one(
         'hr.department',
         string="Département autorisé",
-        help="Sélectionnez le département autorisé pour ce workflow."
+        help="Sélectionnez le département autorisé pour ce workflow.",
+        index=True
     )
 
     name = fields.Char(string="Reference", required=True, copy=False, readonly=True,
                        default=lambda self: self.env['ir.sequence'].next_by_code('work.program.sequence'))
+    submission_key = fields.Char(string="Clé d'idempotence", copy=False, readonly=True, index=True,
+                                 help="Clé fournie par l'outil externe lors d'une soumission par lot ; "
+                                      "une nouvelle soumission avec la même clé ne crée pas de doublon.")
+
+    _sql_constraints = [
+        ('submission_key_uniq', 'unique (submission_key)', "La clé d'idempotence doit être unique !"),
+    ]
 
     week_of = fields.Integer(string='Semaine de', help="Numéro de semaine dans l'année")
-    project_id = fields.Many2one('project.project', string='Projet / Programme', ondelete='restrict')
+    project_id = fields.Many2one('project.project', string='Projet / Programme', ondelete='restrict', index=True)
     activity_id = fields.Many2one('workflow.activity', string='Activité', ondelete='restrict')
     procedure_id = fields.Many2one('workflow.procedure', string='Type de tâche (Procédure)', ondelete='restrict')
     task_description_id = fields.Many2one('workflow.task.formulation', string='Description de la tâche',
@@ -63,17 +127,18 @@ class WorkProgram(models.Model):
         ('medium', 'Moyenne'),
         ('high', 'Élevée')
     ], string='Complexité', default='medium')
-    assignment_date = fields.Date(string='Date d\'assignation', default=lambda self: date.today())
+    assignment_date = fields.Date(string='Date d\'assignation', default=lambda self: date.today(), index=True)
     duration_effort = fields.Float(string='Durée / Effort (heures)', help="Durée estimée ou effort en heures")
-    initial_deadline = fields.Date(string='Date limite initiale', default=lambda self: date.today())
+    initial_deadline = fields.Date(string='Date limite initiale', default=lambda self: date.today(), index=True)
     nb_postpones = fields.Integer(string='Nombre de reports', default=0)
-    actual_deadline = fields.Date(string='Date limite réelle')
+    actual_deadline = fields.Date(string='Date limite réelle', index=True)
     # responsible_id = fields.Many2one('hr.employee', string='Responsable', ondelete='restrict')
     responsible_id = fields.Many2one(
         'hr.employee',
         string='Responsable',
         ondelete='restrict',
-        default=lambda self: self.env.user.employee_ids[:1] if self.env.user.employee_ids else False
+        default=lambda self: self.env.user.employee_ids[:1] if self.env.user.employee_ids else False,
+        index=True
     )
     support_ids = fields.Many2many('hr.employee', string='Support')
 
@@ -93,15 +158,35 @@ class WorkProgram(models.Model):
         compute="_compute_state_readonly"
     )
 
+    @api.model
+    @tools.ormcache('self.env.uid')
+    def _get_user_permission_flags(self):
+        """
+        (is_manager, is_admin) pour l'utilisateur courant, en cache par
+        utilisateur. Odoo vide ce cache lorsque les groupes d'un utilisateur
+        ou les groupes impliqués changent.
+        """
+        user = self.env.user
+        return (user.has_group('workprogramm.workprogramm_group_manager'),
+                user.has_group('workprogramm.workprogramm_group_admin'))
+
+    @api.model
+    def get_user_permissions(self):
+        """ Droits de l'utilisateur courant, exposés au dashboard en un seul appel. """
+        is_manager, is_admin = self._get_user_permission_flags()
+        return {
+            'is_manager': is_manager,
+            'is_admin': is_admin,
+            'is_manager_or_admin': is_manager or is_admin,
+        }
+
     @api.depends('state')
     def _compute_state_readonly(self):
+        # Ne dépend que de l'utilisateur : évalué une seule fois pour tout le lot
+        state_readonly = not self.get_user_permissions()['is_manager_or_admin']
         for rec in self:
-            # Vérifie si l'utilisateur est dans les groupes admin/manager
-            if self.env.user.has_group('workprogramm.workprogramm_group_manager') \
-                    or self.env.user.has_group('workprogramm.workprogramm_group_admin'):
-                rec.state_readonly = False
-            else:
-                rec.state_readonly = True
+            rec.state_readonly = state_readonly
+
     # -------------------------------------------------------------------------
     # Gestion des mois et semaines
     # -------------------------------------------------------------------------
@@ -120,10 +205,7 @@ class WorkProgram(models.Model):
     @api.model
     def _get_default_current_month(self):
         """ Définit le mois actuel par défaut en utilisant la clé stable. """
-        # Utilise calendar.month_name (basé sur la locale par défaut) puis mappe à une clé stable
-        current_month_num = datetime.now().month
-        english_month_name = calendar.month_name[current_month_num].lower()
-        return MONTH_KEYS_MAP.get(english_month_name, 'janvier')
+        return self.env['work.program.calendar'].get_month_key(date.today())
 
     my_month = fields.Selection(
         selection=_get_default_current_month_selection,
@@ -132,31 +214,11 @@ class WorkProgram(models.Model):
     )
 
     def _get_default_my_week(self):
-        today = date.today()
-        current_monday = today - timedelta(days=today.weekday())
-        return current_monday.strftime("%Y-%m-%d")
+        return self.env['work.program.calendar'].get_monday_str(date.today())
 
     def _get_week_selection(self):
-        my_week = []
-        current_year = date.today().year
-        january_first = date(current_year, 1, 1)
-        # Trouver le lundi de la première semaine contenant le 1er janvier
-        monday_first = january_first - timedelta(days=january_first.weekday())
-        for i in range(0, 53):
-            week_start = monday_first + timedelta(weeks=i)
-            # Arrêter si on passe à l'année suivante
-            if week_start.year > current_year:
-                break
-
-            # Utilisation de Odoo _() pour la traduction du nom du mois
-            # Remarque: strftime("%B") donne le nom du mois selon la locale du système Odoo.
-            # L'utilisation de _() assure que la traduction est gérée par Odoo.
-            my_month_name = _(week_start.strftime("%B"))
-            my_day = week_start.day
-            my_label = f"{my_day} - {my_month_name}"
-            my_value = week_start.strftime("%Y-%m-%d")
-            my_week.append((my_value, my_label))
-        return my_week
+        # Liste mise en cache par le service calendrier (année, langue, fenêtre d'années)
+        return self.env['work.program.calendar'].get_week_selection()
 
     my_week_of = fields.Selection(
         selection=_get_week_selection,
@@ -164,6 +226,30 @@ class WorkProgram(models.Model):
         string="Selection week"
     )
 
+    # Périodes dérivées de la date d'assignation, stockées et indexées pour les
+    # filtres, regroupements et plages de dates (toutes années confondues)
+    week_start = fields.Date(string='Semaine du', compute='_compute_period_buckets', store=True, index=True,
+                             help="Lundi de la semaine de la date d'assignation.")
+    period_month = fields.Date(string='Mois du', compute='_compute_period_buckets', store=True, index=True,
+                               help="Premier jour du mois de la date d'assignation.")
+
+    @api.model
+    def _get_period_buckets(self, day):
+        """ (lundi de la semaine, premier jour du mois) d'une date, ou (False, False). """
+        if not day:
+            return False, False
+        day = fields.Date.to_date(day)
+        return day - timedelta(days=day.weekday()), day.replace(day=1)
+
+    @api.depends('assignment_date')
+    def _compute_period_buckets(self):
+        for rec in self:
+            rec.week_start, rec.period_month = self._get_period_buckets(rec.assignment_date)
+
+    def init(self):
+        for index_name, definition in PERFORMANCE_INDEXES.items():
+            self.env.cr.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON work_program {definition}")
+
     is_external_department = fields.Boolean(
         string='Département Externe',
         compute='_compute_external_department',
@@ -174,57 +260,134 @@ class WorkProgram(models.Model):
     # WORKFLOW METHODS
     # -------------------------------------------------------------------------
 
-    def action_start(self):
-        """ Mettre la tâche en cours. """
-        self.write({'state': 'ongoing','assignment_date': date.today(),'initial_deadline':date.today()})
-        # 🔁 Recharger la vue pour afficher le bouton "Soumettre à Valider"
+    def _write_state(self, vals):
+        """ Écrit un changement d'état et l'ajoute au journal des transitions. """
+        from_states = {record.id: record.state for record in self}
+        result = self.write(vals)
+        self.env['work.program.transition']._log_transitions(from_states, vals['state'])
+        return result
+
+    def _bulk_transition(self, to_state, allowed_states=None, forbidden_states=None, date_fields=(),
+                         error_message=None):
+        """
+        Change l'état de tous les programmes en une seule écriture.
+
+        Les préconditions sont vérifiées par une seule requête. Un programme
+        seul (bouton du formulaire) garde le suivi standard du chatter : le
+        changement d'état y est tracé et notifié aux abonnés selon leurs
+        sous-types. Pour un lot, ce suivi est désactivé et chaque abonné
+        reçoit à la place une notification unique listant ses programmes ; le
+        journal des transitions garde l'historique de chaque programme dans
+        les deux cas.
+
+        :param allowed_states: états de départ autorisés (None = tous)
+        :param forbidden_states: états de départ interdits
+        :param date_fields: champs date positionnés à la date du jour
+        :return: action de rechargement de la vue courante (liste ou formulaire)
+        """
+        if self:
+            conditions = []
+            if allowed_states is not None:
+                conditions.append(('state', 'not in', list(allowed_states)))
+            if forbidden_states:
+                conditions.append(('state', 'in', list(forbidden_states)))
+            if conditions:
+                self.flush(['state'])
+                domain = [('id', 'in', self.ids)] + ['|'] * (len(conditions) - 1) + conditions
+                if self.search_count(domain):
+                    raise UserError(error_message)
+
+            vals = dict.fromkeys(date_fields, date.today())
+            vals['state'] = to_state
+            if len(self) == 1:
+                self._write_state(vals)
+            else:
+                self.with_context(mail_notrack=True)._write_state(vals)
+                self._notify_transition_digest(to_state)
         return {
             'type': 'ir.actions.client',
-            'tag': 'reload',
+            'tag': 'soft_reload',
         }
 
+    def _notify_transition_digest(self, to_state):
+        """ Une notification par abonné (hors auteur) listant ses programmes passés à `to_state`. """
+        followers = self.env['mail.followers'].sudo().search_read([
+            ('res_model', '=', self._name),
+            ('res_id', 'in', self.ids),
+            ('partner_id', '!=', self.env.user.partner_id.id),
+        ], ['partner_id', 'res_id'])
+        program_ids_by_partner = defaultdict(list)
+        for follower in followers:
+            program_ids_by_partner[follower['partner_id'][0]].append(follower['res_id'])
+        if not program_ids_by_partner:
+            return
+
+        names = dict(self.name_get())
+        state_label = dict(self._fields['state']._description_selection(self.env))[to_state]
+        subject = _("%s programme(s) de travail : %s") % (len(self), state_label)
+        for partner_id, program_ids in program_ids_by_partner.items():
+            lines = Markup('').join(
+                Markup('<li><a href="/web#model=%s&amp;id=%s">%s</a></li>') % (self._name, program_id, names[program_id])
+                for program_id in program_ids[:DIGEST_MAX_LINES]
+            )
+            body = Markup('<p>%s</p><ul>%s</ul>') % (
+                _("%s a passé %s programme(s) à l'état « %s » :") % (self.env.user.name, len(program_ids), state_label),
+                lines,
+            )
+            if len(program_ids) > DIGEST_MAX_LINES:
+                body += Markup('<p>%s</p>') % (_("… et %s autre(s).") % (len(program_ids) - DIGEST_MAX_LINES))
+            self.env['work.program'].message_notify(
+                partner_ids=[partner_id],
+                subject=subject,
+                body=body,
+            )
+
+    def action_start(self):
+        """ Mettre la tâche en cours. """
+        return self._bulk_transition('ongoing', date_fields=('assignment_date', 'initial_deadline'))
+
     def action_submit_for_validation(self):
         """ Soumettre la tâche à validation. """
-        if self.filtered(lambda r: r.state not in ('draft', 'ongoing', 'to_redo', 'incomplete')):
-            raise UserError(
-                _("Seuls les programmes en Brouillon/En cours/À refaire/Inachevé peuvent être soumis à validation."))
-        self.write({'state': 'to_validate'})
+        return self._bulk_transition(
+            'to_validate', allowed_states=('draft', 'ongoing', 'to_redo', 'incomplete'),
+            error_message=_("Seuls les programmes en Brouillon/En cours/À refaire/Inachevé peuvent être soumis "
+                            "à validation."))
 
     def action_validate(self):
         """ Valider la tâche. Passe à l'état 'Validé'. """
-        if self.filtered(lambda r: r.state != 'to_validate'):
-            raise UserError(_("Seuls les programmes 'À Valider' peuvent être validés."))
-        self.write({'state': 'validated','actual_deadline':date.today()})
+        return self._bulk_transition(
+            'validated', allowed_states=('to_validate',), date_fields=('actual_deadline',),
+            error_message=_("Seuls les programmes 'À Valider' peuvent être validés."))
 
     def action_refuse(self):
         """ Refuser la tâche. Passe à l'état 'Refusé'. """
-        if self.filtered(lambda r: r.state != 'to_validate'):
-            raise UserError(_("Seuls les programmes 'À Valider' peuvent être refusés."))
-        self.write({'state': 'refused','actual_deadline':date.today()})
+        return self._bulk_transition(
+            'refused', allowed_states=('to_validate',), date_fields=('actual_deadline',),
+            error_message=_("Seuls les programmes 'À Valider' peuvent être refusés."))
 
     def action_to_redo(self):
         """ Marquer la tâche 'À refaire'. """
-        if self.filtered(lambda r: r.state not in ('validated', 'refused', 'incomplete')):
-            raise UserError(_("L'état actuel de la tâche ne permet pas de la mettre 'À refaire'."))
-        self.write({'state': 'to_redo'})
+        return self._bulk_transition(
+            'to_redo', allowed_states=('validated', 'refused', 'incomplete'),
+            error_message=_("L'état actuel de la tâche ne permet pas de la mettre 'À refaire'."))
 
     def action_mark_incomplete(self):
         """ Marquer la tâche comme 'Inachevée'. """
-        if self.filtered(lambda r: r.state in ('validated', 'refused', 'cancelled', 'done')):
-            raise UserError(_("Cette action est impossible après une validation ou un achèvement."))
-        self.write({'state': 'incomplete'})
+        return self._bulk_transition(
+            'incomplete', forbidden_states=('validated', 'refused', 'cancelled', 'done'),
+            error_message=_("Cette action est impossible après une validation ou un achèvement."))
 
     def action_done(self):
         """ Mettre la tâche en Terminé. """
-        self.write({'state': 'done','actual_deadline':date.today()})
+        return self._bulk_transition('done', date_fields=('actual_deadline',))
 
     def action_cancel(self):
         """ Annuler la tâche. """
-        self.write({'state': 'cancelled'})
+        return self._bulk_transition('cancelled')
 
     def action_reset_to_draft(self):
         """ Remettre la tâche en brouillon (pour correction). """
-        self.write({'state': 'draft'})
+        return self._bulk_transition('draft')
 
     # -------------------------------------------------------------------------
     # CONSTRAINTS AND COMPUTES
@@ -267,8 +430,8 @@ class WorkProgram(models.Model):
         if self.project_id:
             return {
                 'domain': {
-                    # La traversée Many2one validée : Activity -> SubProcess -> Process -> Domain (liée au Project)
-                    'activity_id': [('sub_process_id.process_id.domain_id', '=', self.project_id.id)]
+                    # Domaine dénormalisé sur l'activité (Activity -> SubProcess -> Process -> Domain)
+                    'activity_id': [('domain_id', '=', self.project_id.id)]
                 }
             }
         return {'domain': {'activity_id': []}}
@@ -310,33 +473,38 @@ class WorkProgram(models.Model):
     # IMPORT METHOD
     # -------------------------------------------------------------------------
 
+    @api.model
+    def _prepare_import_vals(self, row):
+        """ Convertit les colonnes scalaires d'une ligne d'import en valeurs du modèle. """
+        # Note: Le champ 'status' de l'import doit être adapté pour les nouvelles valeurs de 'state'
+        return {
+            'name': row.get('Task Description', 'Nouveau programme'),
+            # Utilisation des clés stables définies ci-dessus
+            'my_month': MONTH_KEYS_MAP.get(row.get('Month', '').lower()) if row.get('Month') else False,
+            'week_of': int(row.get('Week of')) if row.get('Week of') else False,
+            'inputs_needed': row.get('Inputs needed (If applicable)'),
+            'priority': row.get('Priority', 'medium').lower() if row.get('Priority') else 'medium',
+            'complexity': row.get('Complexity', 'medium').lower() if row.get('Complexity') else 'medium',
+            'assignment_date': row.get('Assignment date'),
+            'duration_effort': float(row.get('Duration / Effort (Hrs)')) if row.get(
+                'Duration / Effort (Hrs)') else 0.0,
+            'initial_deadline': row.get('Initial Dateline'),
+            'nb_postpones': int(row.get('Nb of Postpones')) if row.get('Nb of Postpones') else 0,
+            'actual_deadline': row.get('Actual Deadline'),
+            # Utilisation de 'state' à la place de 'status'
+            'state': row.get('Status', 'draft').lower() if row.get('Status') else 'draft',
+            'completion_percentage': float(row.get('% of completion')) if row.get('% of completion') else 0.0,
+            'satisfaction_level': row.get('Satisfaction Level', '').lower() if row.get(
+                'Satisfaction Level') else False,
+            'comments': row.get('Comments / Remarques / Problems encountered / Additionals informations'),
+            'champ1': row.get('Champ 1', ''),
+            'champ2': row.get('Champ 2', '')
+        }
+
     @api.model
     def import_work_program(self, row):
         try:
-            # Note: Le champ 'status' de l'import doit être adapté pour les nouvelles valeurs de 'state'
-            vals = {
-                'name': row.get('Task Description', 'Nouveau programme'),
-                # Utilisation des clés stables définies ci-dessus
-                'my_month': MONTH_KEYS_MAP.get(row.get('Month', '').lower()) if row.get('Month') else False,
-                'week_of': int(row.get('Week of')) if row.get('Week of') else False,
-                'inputs_needed': row.get('Inputs needed (If applicable)'),
-                'priority': row.get('Priority', 'medium').lower() if row.get('Priority') else 'medium',
-                'complexity': row.get('Complexity', 'medium').lower() if row.get('Complexity') else 'medium',
-                'assignment_date': row.get('Assignment date'),
-                'duration_effort': float(row.get('Duration / Effort (Hrs)')) if row.get(
-                    'Duration / Effort (Hrs)') else 0.0,
-                'initial_deadline': row.get('Initial Dateline'),
-                'nb_postpones': int(row.get('Nb of Postpones')) if row.get('Nb of Postpones') else 0,
-                'actual_deadline': row.get('Actual Deadline'),
-                # Utilisation de 'state' à la place de 'status'
-                'state': row.get('Status', 'draft').lower() if row.get('Status') else 'draft',
-                'completion_percentage': float(row.get('% of completion')) if row.get('% of completion') else 0.0,
-                'satisfaction_level': row.get('Satisfaction Level', '').lower() if row.get(
-                    'Satisfaction Level') else False,
-                'comments': row.get('Comments / Remarques / Problems encountered / Additionals informations'),
-                'champ1': row.get('Champ 1', ''),
-                'champ2': row.get('Champ 2', '')
-            }
+            vals = self._prepare_import_vals(row)
 
             # Gestion des relations Many2one et Many2many (inchangée)
             if row.get('Departments'):
@@ -396,11 +564,359 @@ class WorkProgram(models.Model):
             _logger.error(f"Erreur lors de l'importation de la ligne du programme de travail : {row}. Erreur : {e}",
                           exc_info=True)
             return self.create({
-                'name': f"ERREUR-IMPORT-{vals.get('name', 'UNKNOWN')}",
+                'name': f"ERREUR-IMPORT-{row.get('Task Description', 'UNKNOWN')}",
                 'comments': f"Échec de l'importation : {row}. Erreur : {e}",
                 'state': 'cancelled'
             })
 
+    # -------------------------------------------------------------------------
+    # IMPORT EN MASSE (ensembliste)
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _split_import_names(self, value):
+        """ Découpe une cellule multi-valeurs ('A, B, C') en liste de noms. """
+        return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+    @api.model
+    def _resolve_import_names(self, rows):
+        """
+        Résout toutes les colonnes de noms de l'import avec une seule requête
+        `name in [...]` par modèle cible.
+
+        :return: dict {modèle: {nom: id}} ; en cas d'homonymes, le premier
+                 enregistrement selon l'ordre du modèle est retenu (comme `limit=1`).
+        """
+        names_by_model = defaultdict(set)
+        for row in rows:
+            for column, _field, model_name in IMPORT_MANY2ONE_COLUMNS:
+                if row.get(column):
+                    names_by_model[model_name].add(row[column])
+            for column, _field, model_name in IMPORT_MANY2MANY_COLUMNS:
+                names_by_model[model_name].update(self._split_import_names(row.get(column)))
+
+        name_maps = {}
+        for model_name, names in names_by_model.items():
+            name_map = {}
+            for record in self.env[model_name].search_read([('name', 'in', list(names))], ['name']):
+                name_map.setdefault(record['name'], record['id'])
+            name_maps[model_name] = name_map
+        return name_maps
+
+    @api.model
+    def _check_import_selections(self, vals):
+        """ Vérifie les valeurs de sélection avant l'écriture groupée. """
+        for field_name in ('my_month', 'priority', 'complexity', 'state', 'satisfaction_level'):
+            value = vals.get(field_name)
+            if value and value not in self._fields[field_name].get_values(self.env):
+                raise ValidationError(_("Valeur '%s' invalide pour le champ '%s'.") % (value, field_name))
+
+    @api.model
+    def _build_import_vals(self, row, name_maps):
+        """ Construit les valeurs complètes d'une ligne à partir des noms pré-résolus. """
+        vals = self._prepare_import_vals(row)
+        self._check_import_selections(vals)
+        for column, field_name, model_name in IMPORT_MANY2ONE_COLUMNS:
+            record_id = name_maps.get(model_name, {}).get(row.get(column))
+            if record_id:
+                vals[field_name] = record_id
+        for column, field_name, model_name in IMPORT_MANY2MANY_COLUMNS:
+            if row.get(column):
+                name_map = name_maps.get(model_name, {})
+                record_ids = [name_map[name] for name in self._split_import_names(row[column]) if name in name_map]
+                vals[field_name] = [(6, 0, record_ids)]
+        return vals
+
+    @api.model
+    def import_work_programs(self, rows):
+        """
+        Importe un lot de lignes en mode ensembliste.
+
+        Les colonnes de noms sont résolues par une requête par modèle, la
+        séparation création / mise à jour se fait par une seule recherche sur
+        `name`, puis les enregistrements sont écrits par `create(vals_list)`
+        et par `write` groupés sur les valeurs identiques.
+
+        Aucun enregistrement 'ERREUR-IMPORT-*' n'est créé : chaque ligne est
+        décrite dans le rapport retourné.
+
+        :param rows: itérable de dict (mêmes colonnes que `import_work_program`)
+        :return: liste de dict {'row', 'name', 'status', 'id', 'message'} où
+                 status vaut 'created', 'updated' ou 'error'
+        """
+        rows = list(rows)
+        report = [{'row': index, 'name': row.get('Task Description', 'Nouveau programme'),
+                   'status': 'error', 'id': False, 'message': ''}
+                  for index, row in enumerate(rows)]
+        name_maps = self._resolve_import_names(rows)
+
+        # 1. Conversion des lignes ; une même référence présente plusieurs fois
+        #    est fusionnée dans l'ordre du fichier (la dernière valeur l'emporte).
+        vals_by_name = {}
+        indexes_by_name = defaultdict(list)
+        for index, row in enumerate(rows):
+            try:
+                vals = self._build_import_vals(row, name_maps)
+            except Exception as e:
+                report[index]['message'] = str(e)
+                continue
+            vals_by_name.setdefault(vals['name'], {}).update(vals)
+            indexes_by_name[vals['name']].append(index)
+
+        # 2. Séparation création / mise à jour avec une seule recherche
+        existing = {}
+        for record in self.search_read([('name', 'in', list(vals_by_name))], ['name']):
+            existing.setdefault(record['name'], record['id'])
+
+        def _report(name, status, record_id=False, message=''):
+            for index in indexes_by_name[name]:
+                report[index].update(status=status, id=record_id, message=message)
+
+        # 3. Mises à jour groupées : un seul write par jeu de valeurs identique
+        #    ('name' est exclu, il est déjà égal à celui de l'enregistrement existant)
+        writes = defaultdict(list)
+        for name, vals in vals_by_name.items():
+            if name in existing:
+                update_vals = {key: value for key, value in vals.items() if key != 'name'}
+                writes[repr(sorted(update_vals.items()))].append((name, update_vals))
+        for group in writes.values():
+            names = [name for name, _vals in group]
+            records = self.browse([existing[name] for name in names])
+            try:
+                with self.env.cr.savepoint():
+                    records.write(group[0][1])
+            except Exception as e:
+                _logger.error(f"Erreur lors de la mise à jour groupée des programmes {names} : {e}")
+                for name in names:
+                    _report(name, 'error', existing[name], str(e))
+                continue
+            for name in names:
+                _report(name, 'updated', existing[name])
+
+        # 4. Créations en lot ; en cas d'échec, repli ligne par ligne pour isoler les erreurs
+        to_create = [name for name in vals_by_name if name not in existing]
+        for start in range(0, len(to_create), IMPORT_BATCH_SIZE):
+            names = to_create[start:start + IMPORT_BATCH_SIZE]
+            try:
+                with self.env.cr.savepoint():
+                    records = self.create([vals_by_name[name] for name in names])
+                for name, record in zip(names, records):
+                    _report(name, 'created', record.id)
+            except Exception:
+                for name in names:
+                    try:
+                        with self.env.cr.savepoint():
+                            record = self.create(vals_by_name[name])
+                        _report(name, 'created', record.id)
+                    except Exception as e:
+                        _report(name, 'error', message=str(e))
+
+        _logger.info("Import en masse des programmes de travail : %s lignes, %s créées, %s mises à jour, %s erreurs",
+                     len(rows),
+                     sum(1 for line in report if line['status'] == 'created'),
+                     sum(1 for line in report if line['status'] == 'updated'),
+                     sum(1 for line in report if line['status'] == 'error'))
+        return report
+
+    # -------------------------------------------------------------------------
+    # EXPORT
+    # -------------------------------------------------------------------------
+
+    def action_export_programs(self, file_format='csv', whole_domain=False):
+        """
+        Télécharge les programmes sélectionnés au format de l'import, par
+        l'export en flux /work_program/export. Le domaine de la liste
+        (`active_domain` du contexte) n'est exporté que si l'appelant
+        l'indique par `whole_domain` : le contexte le transmet aussi pour une
+        sélection partielle.
+        """
+        domain = [('id', 'in', self.ids)]
+        if whole_domain and self.env.context.get('active_domain') is not None:
+            domain = self.env.context['active_domain']
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/work_program/export?%s' % url_encode({'format': file_format, 'domain': json.dumps(domain)}),
+            'target': 'self',
+        }
+
+    # -------------------------------------------------------------------------
+    # SOUMISSION PAR LOT
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _prepare_submission_vals(self, payload):
+        """
+        Convertit une soumission (champs du formulaire public) en valeurs du
+        modèle. Les Many2many sont des listes d'ids.
+        """
+        vals = {
+            field_name: int(payload[field_name]) if payload.get(field_name) else False
+            for field_name in SUBMIT_MANY2ONE_FIELDS
+        }
+        vals.update({
+            field_name: [(6, 0, [int(record_id) for record_id in payload.get(field_name) or []])]
+            for field_name in SUBMIT_MANY2MANY_FIELDS
+        })
+        vals.update({
+            'inputs_needed': payload.get('inputs_needed'),
+            'my_month': payload.get('my_month'),
+            'my_week_of': payload.get('my_week_of'),
+            'priority': payload.get('priority'),
+            'complexity': payload.get('complexity'),
+            'assignment_date': payload.get('assignment_date'),
+            'duration_effort': float(payload.get('duration_effort') or 0.0),
+            'initial_deadline': payload.get('initial_deadline'),
+            'nb_postpones': int(payload.get('nb_postpones') or 0),
+            'actual_deadline': payload.get('actual_deadline'),
+            'completion_percentage': float(payload.get('completion_percentage') or 0.0),
+            'satisfaction_level': payload.get('satisfaction_level'),
+            'comments': payload.get('comments'),
+            'champ1': payload.get('champ1'),
+            'champ2': payload.get('champ2'),
+        })
+        return vals
+
+    @api.model
+    def _check_submission_ids(self, vals_by_index):
+        """
+        Vérifie tous les ids étrangers du lot avec une recherche par modèle.
+
+        :return: dict {index: message d'erreur} des soumissions invalides
+        """
+        ids_by_model = defaultdict(set)
+        for vals in vals_by_index.values():
+            for field_name, model_name in SUBMIT_MANY2ONE_FIELDS.items():
+                if vals[field_name]:
+                    ids_by_model[model_name].add(vals[field_name])
+            for field_name, model_name in SUBMIT_MANY2MANY_FIELDS.items():
+                ids_by_model[model_name].update(vals[field_name][0][2])
+        valid_ids = {
+            model_name: set(self.env[model_name].with_context(active_test=False).search([('id', 'in', list(ids))]).ids)
+            for model_name, ids in ids_by_model.items()
+        }
+
+        errors = {}
+        for index, vals in vals_by_index.items():
+            unknown = []
+            for field_name, model_name in SUBMIT_MANY2ONE_FIELDS.items():
+                if vals[field_name] and vals[field_name] not in valid_ids[model_name]:
+                    unknown.append(f"{field_name}={vals[field_name]}")
+            for field_name, model_name in SUBMIT_MANY2MANY_FIELDS.items():
+                unknown += [f"{field_name}={record_id}" for record_id in vals[field_name][0][2]
+                            if record_id not in valid_ids[model_name]]
+            if unknown:
+                errors[index] = _("Identifiant(s) inconnu(s) : %s") % ', '.join(unknown)
+        return errors
+
+    @api.model
+    def _get_committed_submission(self, key):
+        """
+        Id du programme committé avec la clé d'idempotence `key`, lu dans une
+        nouvelle transaction : l'instantané de la transaction courante ne
+        voit pas une soumission concurrente committée après son début.
+        """
+        with self.pool.cursor() as cr:
+            cr.execute(f'SELECT id FROM "{self._table}" WHERE submission_key = %s', [key])
+            row = cr.fetchone()
+        return row[0] if row else False
+
+    @api.model
+    def submit_work_programs(self, payloads):
+        """
+        Crée un lot de programmes de travail soumis par un outil externe.
+
+        Chaque soumission reprend les champs de `/work_program/submit` et peut
+        porter une `idempotency_key` : une clé déjà connue (en base ou plus
+        haut dans le lot) renvoie le programme existant au lieu d'en créer un
+        nouveau. Les ids étrangers sont vérifiés par une recherche par modèle,
+        puis le lot est créé par un `create(vals_list)` ; en cas d'échec, les
+        soumissions sont recréées une à une dans des savepoints pour isoler
+        les erreurs. Une clé committée entre-temps par une soumission
+        concurrente (violation d'unicité) est aussi rapportée 'existing'.
+
+        :param payloads: liste de dict
+        :return: liste de dict {'index', 'idempotency_key', 'status', 'id', 'message'}
+                 où status vaut 'created', 'existing' ou 'error'
+        """
+        if len(payloads) > SUBMIT_MAX_BATCH_SIZE:
+            raise UserError(_("Un lot ne peut pas dépasser %s programmes.") % SUBMIT_MAX_BATCH_SIZE)
+        report = [{'index': index, 'idempotency_key': payload.get('idempotency_key') or False,
+                   'status': 'error', 'id': False, 'message': ''}
+                  for index, payload in enumerate(payloads)]
+
+        # 1. Clés déjà connues, en une recherche (y compris hors des règles d'accès de l'appelant)
+        keys = {line['idempotency_key'] for line in report if line['idempotency_key']}
+        existing = {
+            record['submission_key']: record['id']
+            for record in self.sudo().search_read([('submission_key', 'in', list(keys))], ['submission_key'])
+        } if keys else {}
+
+        # 2. Conversion ; une clé répétée dans le lot renvoie à sa première occurrence
+        vals_by_index = {}
+        first_index_by_key = {}
+        for index, payload in enumerate(payloads):
+            key = report[index]['idempotency_key']
+            if key in existing:
+                report[index].update(status='existing', id=existing[key])
+                continue
+            if key and key in first_index_by_key:
+                continue
+            try:
+                vals = self._prepare_submission_vals(payload)
+                self._check_import_selections(vals)
+            except (ValueError, TypeError, ValidationError) as e:
+                report[index]['message'] = str(e)
+                continue
+            if key:
+                vals['submission_key'] = key
+                first_index_by_key[key] = index
+            vals_by_index[index] = vals
+
+        # 3. Ids étrangers
+        for index, message in self._check_submission_ids(vals_by_index).items():
+            report[index]['message'] = message
+            del vals_by_index[index]
+
+        # 4. Création du lot, repli unitaire en cas d'échec
+        indexes = list(vals_by_index)
+        try:
+            with self.env.cr.savepoint():
+                records = self.create([vals_by_index[index] for index in indexes])
+            for index, record in zip(indexes, records):
+                report[index].update(status='created', id=record.id)
+        except Exception:
+            for index in indexes:
+                try:
+                    with self.env.cr.savepoint():
+                        record = self.create(vals_by_index[index])
+                    report[index].update(status='created', id=record.id)
+                except IntegrityError as e:
+                    # Clé committée par une soumission concurrente après la recherche de l'étape 1
+                    key = vals_by_index[index].get('submission_key')
+                    existing_id = self._get_committed_submission(key) \
+                        if key and e.pgcode == errorcodes.UNIQUE_VIOLATION else False
+                    if existing_id:
+                        report[index].update(status='existing', id=existing_id)
+                    else:
+                        report[index]['message'] = str(e)
+                except Exception as e:
+                    report[index]['message'] = str(e)
+
+        # 5. Clés répétées dans le lot
+        for line in report:
+            first_index = first_index_by_key.get(line['idempotency_key'])
+            if first_index is None or first_index == line['index']:
+                continue
+            if report[first_index]['id']:
+                line.update(status='existing', id=report[first_index]['id'])
+            else:
+                line['message'] = _("Clé déjà soumise dans ce lot (ligne %s), en erreur.") % first_index
+
+        _logger.info(f"Soumission par lot : {len(payloads)} programmes, "
+                     f"{sum(1 for line in report if line['status'] == 'created')} créés, "
+                     f"{sum(1 for line in report if line['status'] == 'error')} erreurs")
+        return report
+
     @api.onchange('work_programm_department_id')
     def _onchange_department_id(self):
         """Filtrer les projets selon le type du département."""
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import math
+import statistics
+import time
+
+from odoo import models, api, fields
+from odoo.exceptions import UserError
+
+from .work_program import PERFORMANCE_INDEXES
+
+_logger = logging.getLogger(__name__)
+
+# Champs de work.program indexés pour les filtres fréquents (index ORM work_program_<champ>_index)
+INDEXED_FIELDS = [
+    'state', 'responsible_id', 'project_id', 'work_programm_department_id',
+    'assignment_date', 'initial_deadline', 'actual_deadline', 'user_id',
+]
+
+# Taille d'une page de la vue liste
+LIST_PAGE_SIZE = 80
+
+
+class WorkProgramBenchmark(models.AbstractModel):
+    """
+    Audit des plans de requête des filtres fréquents de work.program.
+
+    Chaque cas (requête de page de liste, comptage, requêtes du dashboard)
+    est exécuté sous EXPLAIN (ANALYZE, BUFFERS) et chronométré, une fois
+    sans les index de performance (supprimés dans un savepoint annulé
+    ensuite) puis avec. À lancer sur une base de test : la suppression des
+    index verrouille la table pendant la mesure « avant ».
+    """
+    _name = 'work.program.benchmark'
+    _description = 'Audit des plans de requête des programmes de travail'
+
+    # -------------------------------------------------------------------------
+    # JEU DE DONNÉES
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _ensure_dataset(self, dataset_size, seed=None):
+        """
+        Complète la table work_program jusqu'à `dataset_size` lignes avec le
+        générateur par COPY (13 mois × 2 types de département).
+        """
+        self.env.cr.execute("SELECT COUNT(*) FROM work_program")
+        missing = dataset_size - self.env.cr.fetchone()[0]
+        if missing <= 0:
+            return
+        months_past = months_future = 6
+        programs_per_month = math.ceil(missing / ((months_past + months_future + 1) * 2))
+        _logger.info(f"Benchmark : génération de {missing} programmes ({programs_per_month} par mois et type)")
+        self.env['work.program.data.generator'].generate_work_programs_copy(
+            months_past=months_past, months_future=months_future,
+            programs_per_month=programs_per_month, seed=seed,
+        )
+
+    @api.model
+    def _get_sample_values(self):
+        """ Utilisateur et département les plus représentés, pour des filtres réalistes. """
+        self.env.cr.execute("""
+            SELECT emp.user_id
+              FROM work_program wp
+              JOIN hr_employee emp ON emp.id = wp.responsible_id
+             WHERE emp.user_id IS NOT NULL
+             GROUP BY emp.user_id
+             ORDER BY COUNT(*) DESC
+             LIMIT 1
+        """)
+        user_row = self.env.cr.fetchone()
+        self.env.cr.execute("""
+            SELECT work_programm_department_id
+              FROM work_program
+             WHERE work_programm_department_id IS NOT NULL
+             GROUP BY work_programm_department_id
+             ORDER BY COUNT(*) DESC
+             LIMIT 1
+        """)
+        department_row = self.env.cr.fetchone()
+        return {
+            'user_id': user_row[0] if user_row else self.env.uid,
+            'department_id': department_row[0] if department_row else False,
+        }
+
+    # -------------------------------------------------------------------------
+    # CAS MESURÉS
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _get_search_domains(self, samples):
+        """ Domaines des filtres de la vue de recherche : [(nom, domaine)]. """
+        today = fields.Date.context_today(self)
+        monday = self.env['work.program.calendar'].get_monday(today)
+        domains = [
+            ('mes_taches', [('responsible_id.user_id', '=', samples['user_id'])]),
+            ('mon_departement', [('work_programm_department_id', '=', samples['department_id'])]),
+            ('semaine_en_cours', [('week_start', '=', monday),
+                                  ('state', 'in', ['ongoing', 'to_redo', 'to_validate'])]),
+            ('en_retard', [('state', 'not in', ['validated', 'done', 'cancelled']),
+                           ('initial_deadline', '<', today)]),
+        ]
+        domains += [(f'etat_{state}', [('state', '=', state)])
+                    for state, label in self.env['work.program']._fields['state']._description_selection(self.env)]
+        return domains
+
+    @api.model
+    def _get_benchmark_cases(self, samples):
+        """
+        Requêtes à mesurer : pour chaque filtre, la page de la vue liste et
+        le comptage de la barre de pagination, comme les génère l'ORM.
+
+        :return: liste de (nom, requête, paramètres)
+        """
+        WorkProgram = self.env['work.program']
+        cases = []
+        for name, domain in self._get_search_domains(samples):
+            list_query, list_params = WorkProgram._search(domain, limit=LIST_PAGE_SIZE).select()
+            cases.append((f'{name}_liste', list_query, list_params))
+            query = WorkProgram._where_calc(domain)
+            WorkProgram._apply_ir_rules(query, 'read')
+            from_clause, where_clause, params = query.get_sql()
+            cases.append((f'{name}_comptage',
+                          f"SELECT COUNT(1) FROM {from_clause} WHERE {where_clause or 'TRUE'}", params))
+        return cases
+
+    # -------------------------------------------------------------------------
+    # MESURE
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _get_plan_indexes(self, plan):
+        """ Nœuds d'un plan JSON : liste des 'Type de nœud (index)' dans l'ordre du plan. """
+        nodes = []
+        stack = [plan]
+        while stack:
+            node = stack.pop()
+            label = node['Node Type']
+            if node.get('Index Name'):
+                label = f"{label} ({node['Index Name']})"
+            nodes.append(label)
+            stack.extend(reversed(node.get('Plans', [])))
+        return nodes
+
+    @api.model
+    def _measure_case(self, query, params, repeat):
+        """ Plan EXPLAIN ANALYZE et médiane des temps d'exécution (ms) d'une requête. """
+        self.env.cr.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", params)
+        explain = self.env.cr.fetchone()[0]
+        if isinstance(explain, str):
+            explain = json.loads(explain)
+        timings = []
+        for __ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            self.env.cr.execute(query, params)
+            self.env.cr.fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+        return {
+            'median_ms': round(statistics.median(timings), 3),
+            'execution_ms': explain[0]['Execution Time'],
+            'planning_ms': explain[0]['Planning Time'],
+            'nodes': self._get_plan_indexes(explain[0]['Plan']),
+            'plan': explain[0]['Plan'],
+        }
+
+    @api.model
+    def _measure_cases(self, cases, repeat):
+        return {name: self._measure_case(query, params, repeat) for name, query, params in cases}
+
+    @api.model
+    def _drop_performance_indexes(self):
+        index_names = [f'work_program_{field_name}_index' for field_name in INDEXED_FIELDS]
+        index_names += list(PERFORMANCE_INDEXES)
+        for index_name in index_names:
+            self.env.cr.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+    @api.model
+    def run_benchmark(self, dataset_size=1000000, repeat=5, seed=42, output_path=None):
+        """
+        Mesure les plans et temps des requêtes fréquentes avant et après les
+        index de performance, sur un jeu d'au moins `dataset_size` programmes.
+
+        :param repeat: nombre d'exécutions chronométrées par requête (médiane retenue)
+        :param output_path: fichier JSON où écrire le rapport complet (plans inclus)
+        :return: {'dataset_size', 'cases': {nom: {'before', 'after'}}} sans les plans complets
+        """
+        if not self.env.is_superuser() and not self.env.user.has_group('base.group_system'):
+            raise UserError("Seul un administrateur peut lancer l'audit des requêtes.")
+        self._ensure_dataset(dataset_size, seed=seed)
+        self.env['work.program'].flush()
+        self.env.cr.execute("ANALYZE work_program")
+        samples = self._get_sample_values()
+        cases = self._get_benchmark_cases(samples)
+
+        self.env.cr.execute("SAVEPOINT work_program_benchmark")
+        try:
+            self._drop_performance_indexes()
+            before = self._measure_cases(cases, repeat)
+        finally:
+            self.env.cr.execute("ROLLBACK TO SAVEPOINT work_program_benchmark")
+        after = self._measure_cases(cases, repeat)
+
+        self.env.cr.execute("SELECT COUNT(*) FROM work_program")
+        report = {
+            'dataset_size': self.env.cr.fetchone()[0],
+            'samples': samples,
+            'cases': {name: {'before': before[name], 'after': after[name]} for name in before},
+        }
+        if output_path:
+            with open(output_path, 'w') as output:
+                json.dump(report, output, indent=2, default=str)
+
+        for name, result in report['cases'].items():
+            _logger.info(f"Benchmark {name} : {result['before']['median_ms']} ms -> "
+                         f"{result['after']['median_ms']} ms ({', '.join(result['after']['nodes'])})")
+        for result in report['cases'].values():
+            for measure in result.values():
+                measure.pop('plan')
+        return report
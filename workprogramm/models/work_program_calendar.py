@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+from datetime import date, timedelta
+
+from odoo import models, api, fields, tools, _
+
+# Clés stables des mois (valeurs du champ my_month), dans l'ordre du calendrier
+MONTH_KEYS = [
+    'janvier', 'fevrier', 'mars', 'avril', 'mai', 'juin',
+    'juillet', 'aout', 'septembre', 'octobre', 'novembre', 'decembre',
+]
+
+# Fenêtre par défaut de la sélection des semaines, en années autour de l'année courante
+# (paramètres système workprogramm.week_selection_years_before / _after)
+DEFAULT_YEARS_BEFORE = 2
+DEFAULT_YEARS_AFTER = 1
+
+
+class WorkProgramCalendar(models.AbstractModel):
+    """
+    Service de calendrier des programmes de travail : semaines (lundis) et
+    mois au format des champs my_week_of / my_month. La liste des semaines
+    est mise en cache par (année courante, langue, fenêtre) ; le changement
+    d'année change la clé et la liste est reconstruite automatiquement.
+    """
+    _name = 'work.program.calendar'
+    _description = 'Calendrier des programmes de travail'
+
+    @api.model
+    def get_monday(self, day):
+        """ Lundi de la semaine d'une date. """
+        day = fields.Date.to_date(day)
+        return day - timedelta(days=day.weekday())
+
+    @api.model
+    def get_monday_str(self, day):
+        """ Lundi de la semaine au format YYYY-MM-DD (valeur de my_week_of). """
+        return self.get_monday(day).strftime('%Y-%m-%d')
+
+    @api.model
+    def get_month_key(self, day):
+        """ Clé stable du mois d'une date (valeur de my_month). """
+        return MONTH_KEYS[fields.Date.to_date(day).month - 1]
+
+    @api.model
+    def _get_week_window(self):
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        return (int(get_param('workprogramm.week_selection_years_before', DEFAULT_YEARS_BEFORE)),
+                int(get_param('workprogramm.week_selection_years_after', DEFAULT_YEARS_AFTER)))
+
+    @api.model
+    @tools.ormcache('year', 'lang', 'years_before', 'years_after')
+    def _build_week_selection(self, year, lang, years_before, years_after):
+        """
+        Lundis de toutes les semaines des années [year - years_before,
+        year + years_after]. Les libellés des autres années que l'année
+        courante portent l'année pour rester distincts.
+        """
+        weeks = []
+        seen = set()
+        for current_year in range(year - years_before, year + years_after + 1):
+            # Lundi de la première semaine contenant le 1er janvier
+            week_start = self.get_monday(date(current_year, 1, 1))
+            while week_start.year <= current_year:
+                value = week_start.strftime('%Y-%m-%d')
+                if value not in seen:
+                    seen.add(value)
+                    label = f"{week_start.day} - {_(week_start.strftime('%B'))}"
+                    if week_start.year != year:
+                        label = f"{label} {week_start.year}"
+                    weeks.append((value, label))
+                week_start += timedelta(weeks=1)
+        return tuple(weeks)
+
+    @api.model
+    def get_week_selection(self):
+        """ Sélection des semaines (valeur, libellé) pour la langue de l'utilisateur. """
+        years_before, years_after = self._get_week_window()
+        return list(self._build_week_selection(date.today().year, self.env.lang or 'en_US',
+                                               years_before, years_after))
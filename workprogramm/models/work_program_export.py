@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+import csv
+import io
+import logging
+import tempfile
+
+from odoo import models, api, _
+from odoo.exceptions import UserError
+
+from .work_program import MONTH_KEYS_MAP, IMPORT_MANY2ONE_COLUMNS, IMPORT_MANY2MANY_COLUMNS
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# Nombre de programmes lus par requête : la mémoire utilisée ne dépend pas du nombre de lignes exportées
+EXPORT_CHUNK_SIZE = 2000
+
+# Taille des blocs de la réponse HTTP lors de l'envoi d'un fichier XLSX
+EXPORT_STREAM_BLOCK_SIZE = 64 * 1024
+
+# Formats d'export : format -> (type MIME, méthode génératrice)
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'iter_csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'iter_xlsx'),
+}
+
+# Colonnes scalaires de l'import : (colonne du fichier, champ work.program)
+EXPORT_SCALAR_COLUMNS = [
+    ('Month', 'my_month'),
+    ('Week of', 'week_of'),
+    ('Inputs needed (If applicable)', 'inputs_needed'),
+    ('Priority', 'priority'),
+    ('Complexity', 'complexity'),
+    ('Assignment date', 'assignment_date'),
+    ('Duration / Effort (Hrs)', 'duration_effort'),
+    ('Initial Dateline', 'initial_deadline'),
+    ('Nb of Postpones', 'nb_postpones'),
+    ('Actual Deadline', 'actual_deadline'),
+    ('Status', 'state'),
+    ('% of completion', 'completion_percentage'),
+    ('Satisfaction Level', 'satisfaction_level'),
+    ('Comments / Remarques / Problems encountered / Additionals informations', 'comments'),
+    ('Champ 1', 'champ1'),
+    ('Champ 2', 'champ2'),
+]
+
+# Clé stable du mois (my_month) -> nom anglais lu par l'import
+MONTH_NAMES = {key: name.capitalize() for name, key in MONTH_KEYS_MAP.items()}
+
+
+class WorkProgramExport(models.AbstractModel):
+    """
+    Export des programmes de travail au format de l'import en masse
+    (`import_work_programs`) : un fichier exporté peut être réimporté tel
+    quel, la colonne 'Task Description' portant la référence du programme.
+
+    Les lignes sont lues par SQL, par lots de EXPORT_CHUNK_SIZE parcourus
+    par id croissant, avec les noms des enregistrements liés résolus dans
+    la même requête : aucun enregistrement n'est chargé dans le cache de
+    l'ORM et la mémoire reste constante quel que soit le nombre de lignes.
+    Les règles d'accès de l'utilisateur sont appliquées.
+    """
+    _name = 'work.program.export'
+    _description = 'Export des programmes de travail'
+
+    @api.model
+    def _check_format(self, file_format):
+        """ Vérifie le format demandé avant l'envoi des en-têtes de la réponse. """
+        if file_format not in EXPORT_FORMATS:
+            raise UserError(_("Format d'export inconnu : %s") % file_format)
+        if file_format == 'xlsx' and openpyxl is None:
+            raise UserError(_("La bibliothèque Python 'openpyxl' est requise pour exporter des fichiers XLSX."))
+
+    @api.model
+    def get_columns(self):
+        """ En-tête du fichier, dans l'ordre des colonnes de l'import. """
+        columns = ['Task Description']
+        columns += [column for column, _field, _model in IMPORT_MANY2ONE_COLUMNS if column != 'Task Description']
+        columns += [column for column, _field, _model in IMPORT_MANY2MANY_COLUMNS]
+        columns += [column for column, _field in EXPORT_SCALAR_COLUMNS]
+        return columns
+
+    @api.model
+    def _get_export_select(self):
+        """
+        Expressions SQL de la requête d'export, dans l'ordre de `get_columns`.
+        Les Many2many sont agrégées en 'Nom 1, Nom 2' (format de l'import).
+        """
+        WorkProgram = self.env['work.program']
+        joins = []
+        expressions = ['wp.name']
+        for index, (column, field_name, model_name) in enumerate(IMPORT_MANY2ONE_COLUMNS):
+            if column == 'Task Description':
+                continue
+            alias = f'm2o_{index}'
+            joins.append(f'LEFT JOIN "{self.env[model_name]._table}" {alias} ON {alias}.id = wp."{field_name}"')
+            expressions.append(f'{alias}.name')
+        for column, field_name, model_name in IMPORT_MANY2MANY_COLUMNS:
+            field = WorkProgram._fields[field_name]
+            expressions.append(f"""
+                (SELECT string_agg(target.name, ', ' ORDER BY target.name)
+                   FROM "{field.relation}" rel
+                   JOIN "{self.env[model_name]._table}" target ON target.id = rel."{field.column2}"
+                  WHERE rel."{field.column1}" = wp.id)
+            """)
+        expressions += [f'wp."{field_name}"' for _column, field_name in EXPORT_SCALAR_COLUMNS]
+        return expressions, joins
+
+    @api.model
+    def _format_value(self, field_name, value):
+        """ Valeur d'une cellule telle que l'import la relit. """
+        if value is None or value is False:
+            return ''
+        if field_name == 'my_month':
+            return MONTH_NAMES.get(value, value)
+        if field_name in ('assignment_date', 'initial_deadline', 'actual_deadline'):
+            return value.isoformat()
+        return value
+
+    @api.model
+    def _iter_export_rows(self, domain=None):
+        """
+        Générateur des lignes (listes de valeurs dans l'ordre de
+        `get_columns`) des programmes du domaine, lot par lot.
+        """
+        WorkProgram = self.env['work.program']
+        WorkProgram.flush()
+        expressions, joins = self._get_export_select()
+        nb_relational = len(expressions) - len(EXPORT_SCALAR_COLUMNS)
+        scalar_fields = [field_name for _column, field_name in EXPORT_SCALAR_COLUMNS]
+        domain = list(domain or [])
+        last_id = 0
+        while True:
+            # Page suivante par id (règles d'accès incluses), sans OFFSET
+            ids_query, ids_params = WorkProgram._search(
+                domain + [('id', '>', last_id)], limit=EXPORT_CHUNK_SIZE, order='id').select()
+            self.env.cr.execute(f"""
+                SELECT wp.id, {', '.join(expressions)}
+                  FROM work_program wp
+                  {' '.join(joins)}
+                 WHERE wp.id IN ({ids_query})
+                 ORDER BY wp.id
+            """, ids_params)
+            rows = self.env.cr.fetchall()
+            if not rows:
+                return
+            for row in rows:
+                values = list(row[1:nb_relational + 1])
+                values += [self._format_value(field_name, value)
+                           for field_name, value in zip(scalar_fields, row[nb_relational + 1:])]
+                yield ['' if value is None else value for value in values]
+            last_id = rows[-1][0]
+            if len(rows) < EXPORT_CHUNK_SIZE:
+                return
+
+    @api.model
+    def iter_csv(self, domain=None, delimiter=','):
+        """ Générateur des blocs (bytes UTF-8) d'un fichier CSV, un bloc par lot de lignes. """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=delimiter or ',')
+        # BOM : le fichier s'ouvre correctement dans Excel et l'import le retire (utf-8-sig)
+        buffer.write('\ufeff')
+        writer.writerow(self.get_columns())
+        for index, row in enumerate(self._iter_export_rows(domain), 1):
+            writer.writerow(row)
+            if index % EXPORT_CHUNK_SIZE == 0:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode('utf-8')
+
+    @api.model
+    def iter_xlsx(self, domain=None):
+        """
+        Générateur des blocs d'un fichier XLSX. Le classeur est écrit en mode
+        `write_only` (lignes écrites sur disque au fil de l'eau) dans un
+        fichier temporaire, envoyé ensuite par blocs : un XLSX est une
+        archive zip qui ne peut pas être émise avant d'être complète.
+        """
+        self._check_format('xlsx')
+        with tempfile.TemporaryFile() as output:
+            workbook = openpyxl.Workbook(write_only=True)
+            sheet = workbook.create_sheet('Work programs')
+            sheet.append(self.get_columns())
+            nb_rows = 0
+            for row in self._iter_export_rows(domain):
+                sheet.append(row)
+                nb_rows += 1
+            workbook.save(output)
+            _logger.info(f"Export XLSX des programmes de travail : {nb_rows} lignes")
+            output.seek(0)
+            while True:
+                block = output.read(EXPORT_STREAM_BLOCK_SIZE)
+                if not block:
+                    return
+                yield block
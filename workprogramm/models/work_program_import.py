@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+import base64
+import csv
+import io
+import logging
+from itertools import islice
+
+from odoo import models, api, fields, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# Nombre maximal de lignes d'erreur conservées dans le journal d'un import
+MAX_ERROR_LINES = 500
+
+
+class WorkProgramImport(models.Model):
+    _name = 'work.program.import'
+    _description = 'Import de programmes de travail (CSV/XLSX en flux)'
+    _order = 'create_date desc, id desc'
+
+    name = fields.Char(string='Nom', required=True, default=lambda self: _('Import programmes de travail'))
+    file = fields.Binary(string='Fichier', attachment=True, required=True)
+    file_name = fields.Char(string='Nom du fichier')
+    file_type = fields.Selection([
+        ('csv', 'CSV'),
+        ('xlsx', 'XLSX'),
+    ], string='Format', compute='_compute_file_type', store=True, readonly=False)
+    csv_delimiter = fields.Char(string='Séparateur CSV', default=',', size=1)
+    chunk_size = fields.Integer(string='Lignes par lot', default=1000,
+                                help="Nombre de lignes converties puis committées en base par lot.")
+    state = fields.Selection([
+        ('draft', 'Brouillon'),
+        ('running', 'En cours'),
+        ('done', 'Terminé'),
+        ('failed', 'Échec'),
+    ], string='État', default='draft', readonly=True)
+    offset = fields.Integer(string='Lignes traitées', default=0, readonly=True,
+                            help="Nombre de lignes déjà traitées et committées ; un import interrompu reprend ici.")
+    nb_created = fields.Integer(string='Créés', readonly=True)
+    nb_updated = fields.Integer(string='Mis à jour', readonly=True)
+    nb_errors = fields.Integer(string='Erreurs', readonly=True)
+    error_log = fields.Text(string='Journal des erreurs', readonly=True)
+    job_ids = fields.One2many('work.program.job', 'import_id', string='Tâches de fond', readonly=True)
+
+    @api.depends('file_name')
+    def _compute_file_type(self):
+        for record in self:
+            file_name = (record.file_name or '').lower()
+            record.file_type = 'xlsx' if file_name.endswith('.xlsx') else 'csv'
+
+    # -------------------------------------------------------------------------
+    # LECTURE EN FLUX
+    # -------------------------------------------------------------------------
+
+    def _open_file(self):
+        """
+        Ouvre le fichier importé sans le charger en mémoire lorsque la pièce
+        jointe est stockée dans le filestore.
+        """
+        self.ensure_one()
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_id', '=', self.id),
+            ('res_field', '=', 'file'),
+        ], limit=1)
+        if attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), 'rb')
+        return io.BytesIO(base64.b64decode(self.with_context(bin_size=False).file or b''))
+
+    @api.model
+    def _iter_csv_rows(self, stream, delimiter=','):
+        """ Générateur de lignes (dict) d'un fichier CSV. """
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        for row in csv.DictReader(text, delimiter=delimiter or ','):
+            yield row
+
+    @api.model
+    def _iter_xlsx_rows(self, stream):
+        """ Générateur de lignes (dict) d'un fichier XLSX lu en mode `read_only`. """
+        if openpyxl is None:
+            raise UserError(_("La bibliothèque Python 'openpyxl' est requise pour importer des fichiers XLSX."))
+        workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(cell).strip() if cell is not None else '' for cell in next(rows, ())]
+            for values in rows:
+                if not any(value not in (None, '') for value in values):
+                    continue
+                yield {
+                    column: ('' if value is None else str(value) if isinstance(value, (int, float)) else value)
+                    for column, value in zip(header, values) if column
+                }
+        finally:
+            workbook.close()
+
+    def _iter_rows(self, stream):
+        self.ensure_one()
+        if self.file_type == 'xlsx':
+            return self._iter_xlsx_rows(stream)
+        return self._iter_csv_rows(stream, self.csv_delimiter)
+
+    @api.model
+    def _iter_chunks(self, rows, size):
+        """ Regroupe un itérable de lignes en listes de `size` éléments. """
+        while True:
+            chunk = list(islice(rows, size))
+            if not chunk:
+                return
+            yield chunk
+
+    # -------------------------------------------------------------------------
+    # EXÉCUTION
+    # -------------------------------------------------------------------------
+
+    def _process_chunk(self, chunk, first_row):
+        """
+        Importe un lot dans un savepoint et retourne les compteurs du lot.
+        Un lot en échec est annulé en entier et journalisé sans interrompre l'import.
+        """
+        self.ensure_one()
+        counts = {'created': 0, 'updated': 0, 'error': 0}
+        errors = []
+        try:
+            with self.env.cr.savepoint():
+                report = self.env['work.program'].import_work_programs(chunk)
+        except Exception as e:
+            _logger.error(f"Échec du lot {first_row}-{first_row + len(chunk) - 1} de l'import {self.id} : {e}",
+                          exc_info=True)
+            counts['error'] = len(chunk)
+            errors.append(_("Lignes %s à %s : %s") % (first_row, first_row + len(chunk) - 1, e))
+            return counts, errors
+        for line in report:
+            counts[line['status']] += 1
+            if line['status'] == 'error':
+                errors.append(_("Ligne %s (%s) : %s") % (first_row + line['row'], line['name'], line['message']))
+        return counts, errors
+
+    def _run_import(self, max_chunks=None):
+        """
+        Traite le fichier à partir de `offset`, lot par lot, avec un commit
+        après chaque lot. Retourne True lorsque le fichier est entièrement traité.
+
+        :param max_chunks: nombre maximal de lots à traiter lors de cet appel
+                           (None = jusqu'à la fin du fichier)
+        """
+        self.ensure_one()
+        chunk_size = max(self.chunk_size, 1)
+        self.write({'state': 'running'})
+        self.env.cr.commit()
+
+        with self._open_file() as stream:
+            # Reprise : les lignes déjà committées sont lues mais ni validées ni importées
+            rows = islice(self._iter_rows(stream), self.offset, None)
+            for nb_chunks, chunk in enumerate(self._iter_chunks(rows, chunk_size)):
+                if max_chunks is not None and nb_chunks >= max_chunks:
+                    return False
+                first_row = self.offset + 1
+                counts, errors = self._process_chunk(chunk, first_row)
+                error_log = self.error_log or ''
+                # Journal tronqué à MAX_ERROR_LINES lignes ; nb_errors compte toutes les erreurs
+                remaining = MAX_ERROR_LINES - error_log.count('\n')
+                if errors and remaining > 0:
+                    error_log += '\n'.join(errors[:remaining]) + '\n'
+                self.write({
+                    'offset': self.offset + len(chunk),
+                    'nb_created': self.nb_created + counts['created'],
+                    'nb_updated': self.nb_updated + counts['updated'],
+                    'nb_errors': self.nb_errors + counts['error'],
+                    'error_log': error_log,
+                })
+                self.env.cr.commit()
+                # Libère les enregistrements du lot précédent pour garder une mémoire constante
+                self.env['work.program'].invalidate_cache()
+                _logger.info(f"Import {self.id} : {self.offset} lignes traitées")
+
+        self.write({'state': 'done'})
+        self.env.cr.commit()
+        return True
+
+    def action_run(self):
+        """
+        Met l'import en file (ou le reprend) : le cron le traite lot par lot
+        depuis le dernier lot committé, hors de la requête HTTP.
+        """
+        jobs = self.env['work.program.job']
+        for record in self:
+            if record.state == 'done' or record.job_ids.filtered(lambda job: job.state in ('queued', 'running')):
+                continue
+            jobs |= jobs._enqueue({
+                'name': _("Import : %s") % (record.file_name or record.name),
+                'job_type': 'import',
+                'import_id': record.id,
+            })
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _("Import mis en file"),
+                'message': (_("L'import est traité en arrière-plan (tâche(s) %s).") % ', '.join(map(str, jobs.ids))
+                            if jobs else _("L'import est déjà en file ou terminé.")),
+                'type': 'info',
+                'sticky': False,
+            }
+        }
+
+    def action_reset(self):
+        """ Repart du début du fichier. """
+        self.write({
+            'state': 'draft',
+            'offset': 0,
+            'nb_created': 0,
+            'nb_updated': 0,
+            'nb_errors': 0,
+            'error_log': False,
+        })
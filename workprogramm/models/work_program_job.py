@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import time
+
+from odoo import models, api, fields, _
+from odoo.service.model import PG_CONCURRENCY_ERRORS_TO_RETRY
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Durée maximale (secondes) d'un passage du cron ; les étapes restantes sont reprises au passage suivant
+JOB_TIME_LIMIT = 240
+
+# Nombre de passages au-delà duquel une tâche toujours en cours (worker tué à chaque reprise) est abandonnée
+JOB_MAX_ATTEMPTS = 5
+
+
+class WorkProgramJob(models.Model):
+    """
+    Tâche de fond exécutée par le cron (imports de fichiers, génération de
+    données). Chaque étape est committée avec la progression de la tâche :
+    après un redémarrage du worker, le cron reprend la tâche à la première
+    étape non committée. L'appelant reçoit immédiatement l'id de la tâche
+    et suit son avancement avec `get_progress`.
+
+    Le cron (superutilisateur) ne fait que le suivi des tâches : chaque
+    étape est exécutée avec les droits de l'utilisateur qui a demandé la
+    tâche, à qui sont attribués les enregistrements créés.
+    """
+    _name = 'work.program.job'
+    _description = 'Tâche de fond des programmes de travail'
+    _order = 'create_date desc, id desc'
+
+    name = fields.Char(string='Nom', required=True, readonly=True)
+    job_type = fields.Selection([
+        ('import', 'Import de fichier'),
+        ('generate', 'Génération de données'),
+    ], string='Type', required=True, readonly=True)
+    state = fields.Selection([
+        ('queued', 'En attente'),
+        ('running', 'En cours'),
+        ('done', 'Terminé'),
+        ('failed', 'Échec'),
+        ('cancelled', 'Annulé'),
+    ], string='État', default='queued', required=True, readonly=True, index=True)
+    import_id = fields.Many2one('work.program.import', string='Import', ondelete='cascade', readonly=True)
+    params = fields.Text(string='Paramètres', readonly=True, help="Paramètres de la tâche (JSON).")
+    total_steps = fields.Integer(string='Étapes', readonly=True)
+    done_steps = fields.Integer(string='Étapes terminées', readonly=True,
+                                help="Étapes committées ; une tâche interrompue reprend ici.")
+    progress = fields.Float(string='Progression (%)', compute='_compute_progress')
+    nb_records = fields.Integer(string='Enregistrements traités', readonly=True)
+    throughput = fields.Float(string='Débit (enr./s)', compute='_compute_progress')
+    attempts = fields.Integer(string='Passages', readonly=True)
+    date_started = fields.Datetime(string='Démarrée le', readonly=True)
+    date_heartbeat = fields.Datetime(string='Dernière progression', readonly=True)
+    date_finished = fields.Datetime(string='Terminée le', readonly=True)
+    error_log = fields.Text(string='Erreur', readonly=True)
+    user_id = fields.Many2one('res.users', string='Demandée par', default=lambda self: self.env.user, readonly=True)
+
+    @api.depends('total_steps', 'done_steps', 'nb_records', 'date_started', 'date_heartbeat')
+    def _compute_progress(self):
+        for job in self:
+            job.progress = 100.0 * job.done_steps / job.total_steps if job.total_steps else 0.0
+            elapsed = (job.date_heartbeat - job.date_started).total_seconds() \
+                if job.date_started and job.date_heartbeat else 0
+            job.throughput = round(job.nb_records / elapsed, 2) if elapsed > 0 else 0.0
+
+    # -------------------------------------------------------------------------
+    # MISE EN FILE
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _enqueue(self, vals):
+        """ Crée une tâche et réveille le cron ; retourne la tâche. """
+        job = self.create(vals)
+        self.env.ref('workprogramm.ir_cron_work_program_job').sudo()._trigger()
+        return job
+
+    def get_progress(self):
+        """ État des tâches pour le suivi côté client (polling). """
+        return [{
+            'id': job.id,
+            'state': job.state,
+            'progress': round(job.progress, 2),
+            'done_steps': job.done_steps,
+            'total_steps': job.total_steps,
+            'nb_records': job.nb_records,
+            'throughput': job.throughput,
+            'error': job.error_log or False,
+        } for job in self]
+
+    def action_cancel(self):
+        self.filtered(lambda job: job.state in ('queued', 'running')).write({'state': 'cancelled'})
+
+    def action_retry(self):
+        """ Remet en file une tâche en échec ; elle reprend à la dernière étape committée. """
+        self.filtered(lambda job: job.state in ('failed', 'cancelled')).write({
+            'state': 'queued',
+            'attempts': 0,
+            'error_log': False,
+            'date_finished': False,
+        })
+        self.env.ref('workprogramm.ir_cron_work_program_job').sudo()._trigger()
+
+    # -------------------------------------------------------------------------
+    # EXÉCUTION
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _cron_run_jobs(self):
+        """
+        Exécute les tâches en file (les tâches interrompues d'abord, dans
+        l'ordre de création) jusqu'à épuisement du temps alloué au passage.
+        """
+        deadline = time.monotonic() + JOB_TIME_LIMIT
+        while time.monotonic() < deadline:
+            job = self.search([('state', '=', 'running')], order='id', limit=1) \
+                or self.search([('state', '=', 'queued')], order='id', limit=1)
+            if not job:
+                return
+            job._run(deadline)
+            if job.state == 'running':
+                # Temps écoulé : la suite au prochain passage
+                self.env.ref('workprogramm.ir_cron_work_program_job').sudo()._trigger()
+                return
+
+    def _run(self, deadline):
+        """ Exécute des étapes de la tâche jusqu'à sa fin ou jusqu'à `deadline`, avec un commit par étape. """
+        self.ensure_one()
+        if self.attempts >= JOB_MAX_ATTEMPTS:
+            self._fail(_("Abandon après %s passages interrompus.") % self.attempts)
+            return
+        if self.state == 'running':
+            _logger.info(f"Reprise de la tâche {self.id} à l'étape {self.done_steps}")
+        now = fields.Datetime.now()
+        self.write({
+            'state': 'running',
+            'attempts': self.attempts + 1,
+            'date_started': self.date_started or now,
+            'date_heartbeat': self.date_heartbeat or now,
+        })
+        self.env.cr.commit()
+
+        try:
+            while time.monotonic() < deadline:
+                finished = getattr(self, f'_run_step_{self.job_type}')()
+                self.write({'date_heartbeat': fields.Datetime.now(), 'attempts': 0})
+                self.env.cr.commit()
+                # État relu dans la transaction suivante : annulation depuis l'interface
+                self.invalidate_cache()
+                if self.state == 'cancelled':
+                    return
+                if finished:
+                    self.write({'state': 'done', 'date_finished': fields.Datetime.now()})
+                    self.env.cr.commit()
+                    _logger.info(f"Tâche {self.id} terminée : {self.nb_records} enregistrements "
+                                 f"({self.throughput} enr./s)")
+                    return
+        except Exception as e:
+            self.env.cr.rollback()
+            self.env.clear()
+            if getattr(e, 'pgcode', None) in PG_CONCURRENCY_ERRORS_TO_RETRY:
+                # Ligne de la tâche modifiée en parallèle (annulation depuis l'interface) ou
+                # conflit d'écriture : l'état est relu dans une nouvelle transaction
+                if self.state == 'cancelled':
+                    _logger.info(f"Tâche {self.id} annulée pendant l'étape {self.done_steps}")
+                else:
+                    _logger.info(f"Tâche {self.id} : écriture concurrente, étape {self.done_steps} "
+                                 f"reprise au prochain passage")
+                return
+            _logger.error(f"Échec de la tâche {self.id} à l'étape {self.done_steps} : {e}", exc_info=True)
+            self._fail(str(e))
+
+    def _get_requester_env(self):
+        """ Environnement d'exécution des étapes : l'utilisateur qui a demandé la tâche. """
+        self.ensure_one()
+        return self.with_user(self.user_id or self.env.user).env
+
+    def _fail(self, message):
+        self.write({
+            'state': 'failed',
+            'error_log': message,
+            'date_finished': fields.Datetime.now(),
+        })
+        if self.import_id:
+            self.import_id.write({
+                'state': 'failed',
+                'error_log': (self.import_id.error_log or '') + message + '\n',
+            })
+        self.env.cr.commit()
+
+    def _run_step_import(self):
+        """ Un lot de l'import (committé par l'import lui-même) ; retourne True en fin de fichier. """
+        work_import = self.import_id
+        finished = work_import.with_env(self._get_requester_env())._run_import(max_chunks=1)
+        self.write({
+            'done_steps': work_import.offset,
+            'nb_records': work_import.nb_created + work_import.nb_updated,
+        })
+        return finished
+
+    def _run_step_generate(self):
+        """
+        Un mois × type de département de la génération par COPY. Chaque
+        étape a sa propre graine : une étape rejouée après une interruption
+        produit les mêmes programmes.
+        """
+        params = json.loads(self.params or '{}')
+        generator = self.env['work.program.data.generator']
+        steps = generator._get_copy_steps(params['months_past'], params['months_future'])
+        if self.done_steps < len(steps):
+            month_offset, dpt_type = steps[self.done_steps]
+            seed = params.get('seed')
+            rng = np.random.default_rng(None if seed is None else [seed, self.done_steps])
+            self.env['work.program'].flush()
+            generator = generator.with_env(self._get_requester_env())
+            created = generator._generate_copy_step(
+                rng, generator._get_base_data(), generator._preload_workflow_maps(),
+                month_offset, dpt_type, params['programs_per_month'])
+            self.write({'done_steps': self.done_steps + 1, 'nb_records': self.nb_records + created})
+        if self.done_steps < len(steps):
+            return False
+        WorkProgram = self.env['work.program']
+        WorkProgram.invalidate_cache()
+        self.env.cr.execute(f'ANALYZE "{WorkProgram._table}"')
+        return True
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo import models, api, fields
+
+_logger = logging.getLogger(__name__)
+
+# Regroupements possibles des indicateurs : clé -> (expression SQL, modèle du groupe)
+ANALYTICS_GROUPS = {
+    'department': ('emp.department_id', 'hr.department'),
+    'responsible': ('wp.responsible_id', 'hr.employee'),
+}
+
+
+class WorkProgramTransition(models.Model):
+    """
+    Journal compact et en ajout seul des changements d'état des programmes de
+    travail, écrit par les actions du workflow. Les indicateurs (délai de
+    cycle, délai de validation, taux de reprise) sont calculés en SQL sur ce
+    journal, sans passer par mail_message / mail_tracking_value.
+    """
+    _name = 'work.program.transition'
+    _description = 'Transition d\'état d\'un programme de travail'
+    _order = 'date desc, id desc'
+    _log_access = False
+
+    program_id = fields.Many2one('work.program', string='Programme', required=True, ondelete='cascade',
+                                 readonly=True)
+    from_state = fields.Selection(selection=lambda self: self.env['work.program']._fields['state'].selection,
+                                  string='État de départ', readonly=True)
+    to_state = fields.Selection(selection=lambda self: self.env['work.program']._fields['state'].selection,
+                                string='État d\'arrivée', required=True, readonly=True)
+    user_id = fields.Many2one('res.users', string='Utilisateur', readonly=True)
+    date = fields.Datetime(string='Date', required=True, readonly=True)
+
+    def init(self):
+        # Index couvrants : historique d'un programme, et transitions par état d'arrivée sur une période
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS work_program_transition_program_date_idx
+                ON work_program_transition (program_id, date, id, from_state, to_state)
+        """)
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS work_program_transition_to_state_date_idx
+                ON work_program_transition (to_state, date, program_id)
+        """)
+
+    @api.model
+    def _log_transitions(self, from_states, to_state):
+        """
+        Ajoute au journal une transition par programme dont l'état change.
+
+        :param from_states: {id du programme: état avant l'écriture}
+        :param to_state: nouvel état
+        """
+        rows = [(program_id, from_state or None, to_state, self.env.uid)
+                for program_id, from_state in from_states.items() if from_state != to_state]
+        if not rows:
+            return
+        self.env.cr.execute(f"""
+            INSERT INTO work_program_transition (program_id, from_state, to_state, user_id, date)
+            SELECT v.program_id, v.from_state, v.to_state, v.user_id, (now() at time zone 'UTC')
+              FROM (VALUES {', '.join(['%s'] * len(rows))}) AS v(program_id, from_state, to_state, user_id)
+        """, rows)
+
+    # -------------------------------------------------------------------------
+    # INDICATEURS
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def get_workflow_analytics(self, group_by='department', date_from=None, date_to=None):
+        """
+        Indicateurs du workflow par département (du responsable) ou par
+        responsable, calculés en une requête sur le journal des transitions :
+
+        - cycle_time_hours : délai moyen entre la première mise en cours et la
+          première validation (ou clôture) d'un programme
+        - validation_lead_time_hours : délai moyen entre une soumission à
+          validation et la décision (validé / refusé)
+        - redo_rate : part des programmes soumis qui ont été remis 'À refaire'
+
+        Seuls les programmes visibles par l'utilisateur courant sont pris en compte.
+
+        :return: liste de dicts {'id', 'name', 'nb_programs', 'cycle_time_hours',
+                 'validation_lead_time_hours', 'redo_rate'}
+        """
+        group_column, group_model = ANALYTICS_GROUPS[group_by]
+        programs = self.env['work.program']
+        programs.flush(['responsible_id'])
+        query = programs._where_calc([])
+        programs._apply_ir_rules(query, 'read')
+        from_clause, where_clause, params = query.get_sql()
+
+        period, period_params = ['TRUE'], []
+        if date_from:
+            period.append("t.date >= %s")
+            period_params.append(date_from)
+        if date_to:
+            period.append("t.date < %s::date + 1")
+            period_params.append(date_to)
+
+        self.env.cr.execute(f"""
+            WITH t AS (
+                SELECT program_id, from_state, to_state, date,
+                       LAG(date) OVER (PARTITION BY program_id ORDER BY date, id) AS previous_date
+                  FROM work_program_transition
+            ), per_program AS (
+                SELECT t.program_id,
+                       MIN(t.date) FILTER (WHERE t.to_state = 'ongoing') AS started,
+                       MIN(t.date) FILTER (WHERE t.to_state IN ('validated', 'done')) AS finished,
+                       AVG(EXTRACT(EPOCH FROM t.date - t.previous_date))
+                           FILTER (WHERE t.from_state = 'to_validate' AND t.to_state IN ('validated', 'refused'))
+                           AS validation_seconds,
+                       BOOL_OR(t.to_state = 'to_redo') AS redone,
+                       BOOL_OR(t.to_state = 'to_validate') AS submitted
+                  FROM t
+                 WHERE {' AND '.join(period)}
+                 GROUP BY t.program_id
+            )
+            SELECT {group_column},
+                   COUNT(*),
+                   (AVG(EXTRACT(EPOCH FROM pp.finished - pp.started)) FILTER (WHERE pp.finished > pp.started)
+                       / 3600)::float,
+                   (AVG(pp.validation_seconds) / 3600)::float,
+                   COUNT(*) FILTER (WHERE pp.redone)::float / NULLIF(COUNT(*) FILTER (WHERE pp.submitted), 0)
+              FROM per_program pp
+              JOIN work_program wp ON wp.id = pp.program_id
+              LEFT JOIN hr_employee emp ON emp.id = wp.responsible_id
+             WHERE pp.program_id IN (SELECT "work_program"."id" FROM {from_clause} WHERE {where_clause or 'TRUE'})
+             GROUP BY {group_column}
+             ORDER BY {group_column}
+        """, period_params + params)
+        rows = self.env.cr.fetchall()
+
+        names = dict(self.env[group_model].sudo().browse([row[0] for row in rows if row[0]]).name_get())
+        return [{
+            'id': group_id or False,
+            'name': names.get(group_id, ''),
+            'nb_programs': nb_programs,
+            'cycle_time_hours': round(cycle_time, 2) if cycle_time is not None else None,
+            'validation_lead_time_hours': round(lead_time, 2) if lead_time is not None else None,
+            'redo_rate': round(redo_rate, 4) if redo_rate is not None else None,
+        } for group_id, nb_programs, cycle_time, lead_time, redo_rate in rows]
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+import logging
+import threading
+from collections import defaultdict
+
+from odoo import models, api
+
+_logger = logging.getLogger(__name__)
+
+# Modèles du référentiel mis en cache : modèle -> champ parent (None pour une racine)
+REFERENTIAL_MODELS = {
+    'workflow.domain': None,
+    'workflow.process': 'domain_id',
+    'workflow.subprocess': 'process_id',
+    'workflow.activity': 'sub_process_id',
+    'workflow.procedure': 'activity_id',
+    'workflow.deliverable': 'activity_id',
+    'workflow.task.formulation': 'procedure_id',
+    'practice.practice': None,
+    'practice.subcategory': 'practice_id',
+}
+
+# Ancêtres stockés (champs related indexés) chargés avec l'arbre : modèle -> champs
+REFERENTIAL_ANCESTORS = {
+    'workflow.activity': ('process_id', 'domain_id'),
+    'workflow.procedure': ('sub_process_id', 'process_id', 'domain_id'),
+    'workflow.deliverable': ('sub_process_id', 'process_id', 'domain_id'),
+    'workflow.task.formulation': ('activity_id', 'sub_process_id', 'process_id', 'domain_id'),
+}
+
+# Fonction du trigger qui date chaque ligne créée ou modifiée du référentiel par sa transaction
+CHANGE_TXID_FUNCTION = 'workflow_referential_set_change_txid'
+
+# Cache par worker : nom de base -> (version, arbre)
+_cache = {}
+_cache_lock = threading.RLock()
+_cache_stats = {'hits': 0, 'misses': 0}
+
+
+class WorkflowReferentialCache(models.AbstractModel):
+    """
+    Cache par worker de tout l'arbre du référentiel (workflow et practices),
+    indexé par une version lue dans les tables elles-mêmes : par table, la
+    transaction de la dernière écriture (change_txid, tenu par trigger) et
+    le nombre de lignes (suppressions). Aucune ligne partagée n'est écrite :
+    les écritures du référentiel ne se bloquent pas entre elles. La version
+    et l'arbre sont lus dans le même instantané.
+
+    Les recherches parent / enfants / nom sont des accès dictionnaire. Le
+    cache est construit en superutilisateur : il retourne des ids, que
+    l'appelant relit avec ses propres droits si nécessaire.
+    """
+    _name = 'workflow.referential.cache'
+    _description = 'Cache du référentiel workflow'
+
+    # -------------------------------------------------------------------------
+    # VERSION
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _get_version(self):
+        """
+        Version du référentiel dans l'instantané courant, et si elle peut
+        être mise en cache.
+
+        Une transaction encore en cours peut committer plus tard des lignes
+        d'un txid inférieur au plus grand txid visible : la version ne
+        change alors pas. Elle n'est donc mise en cache que si toutes les
+        transactions jusqu'à ce txid sont terminées (txid < xmin de
+        l'instantané) ; toute écriture ultérieure a un txid supérieur.
+
+        :return: (version, cacheable)
+        """
+        # Écritures en attente de la transaction courante : visibles (et donc non mises en cache)
+        for model_name in REFERENTIAL_MODELS:
+            self.env[model_name].flush()
+        stamps = ', '.join(
+            f'(SELECT max(change_txid) FROM "{table}"), (SELECT count(*) FROM "{table}")'
+            for table in (self.env[model_name]._table for model_name in REFERENTIAL_MODELS))
+        self.env.cr.execute(f"SELECT txid_snapshot_xmin(txid_current_snapshot()), {stamps}")
+        xmin, *version = self.env.cr.fetchone()
+        max_txid = max((txid for txid in version[::2] if txid is not None), default=0)
+        return tuple(version), max_txid < xmin
+
+    # -------------------------------------------------------------------------
+    # ARBRE
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _load_tree(self):
+        """
+        Charge le référentiel complet, une requête par modèle.
+
+        :return: dict modèle -> {'names': {id: nom}, 'parents': {id: id parent},
+                 'children': {id parent: (ids enfants dans l'ordre du modèle)},
+                 'descendants': {champ d'ancêtre: {id ancêtre: (ids dans l'ordre du modèle)}}}
+        """
+        tree = {}
+        for model_name, parent_field in REFERENTIAL_MODELS.items():
+            ancestor_fields = REFERENTIAL_ANCESTORS.get(model_name, ())
+            fields_to_read = ['name'] + ([parent_field] if parent_field else []) + list(ancestor_fields)
+            names, parents, children = {}, {}, defaultdict(list)
+            descendants = {field_name: defaultdict(list) for field_name in ancestor_fields}
+            for row in self.env[model_name].sudo().with_context(active_test=False).search_read([], fields_to_read):
+                names[row['id']] = row['name']
+                if parent_field:
+                    parent_id = row[parent_field] and row[parent_field][0]
+                    parents[row['id']] = parent_id
+                    children[parent_id].append(row['id'])
+                for field_name in ancestor_fields:
+                    descendants[field_name][row[field_name] and row[field_name][0]].append(row['id'])
+            tree[model_name] = {
+                'names': names,
+                'parents': parents,
+                'children': {parent_id: tuple(ids) for parent_id, ids in children.items()},
+                'descendants': {
+                    field_name: {ancestor_id: tuple(ids) for ancestor_id, ids in by_ancestor.items()}
+                    for field_name, by_ancestor in descendants.items()
+                },
+            }
+        return tree
+
+    @api.model
+    def _get_tree(self):
+        """ Arbre du référentiel à jour pour la base courante. """
+        version, cacheable = self._get_version()
+        dbname = self.env.cr.dbname
+        with _cache_lock:
+            cached = _cache.get(dbname)
+            if cached and cached[0] == version:
+                _cache_stats['hits'] += 1
+                return cached[1]
+            _cache_stats['misses'] += 1
+        # Même instantané que la version : l'arbre lu correspond exactement à `version`
+        tree = self._load_tree()
+        if cacheable:
+            with _cache_lock:
+                _cache[dbname] = (version, tree)
+        _logger.info(f"Référentiel workflow rechargé{'' if cacheable else ' (non mis en cache)'}")
+        return tree
+
+    @api.model
+    def get_name(self, model_name, record_id):
+        return self._get_tree()[model_name]['names'].get(record_id)
+
+    @api.model
+    def get_parent(self, model_name, record_id):
+        """ Id du parent direct (False si aucun). """
+        return self._get_tree()[model_name]['parents'].get(record_id) or False
+
+    @api.model
+    def get_children(self, model_name, parent_id):
+        """ Ids des enregistrements de `model_name` dont le parent est `parent_id`. """
+        return list(self._get_tree()[model_name]['children'].get(parent_id, ()))
+
+    @api.model
+    def get_children_map(self, model_name):
+        """ Correspondance complète {id parent: (ids enfants)} de `model_name`. """
+        return self._get_tree()[model_name]['children']
+
+    @api.model
+    def get_by_ancestor(self, model_name, ancestor_field, ancestor_id):
+        """
+        Ids des enregistrements de `model_name` dont l'ancêtre `ancestor_field`
+        (parent direct ou ancêtre stocké, voir REFERENTIAL_ANCESTORS) est
+        `ancestor_id`, dans l'ordre du modèle.
+        """
+        tree = self._get_tree()[model_name]
+        if ancestor_field == REFERENTIAL_MODELS[model_name]:
+            return list(tree['children'].get(ancestor_id, ()))
+        return list(tree['descendants'][ancestor_field].get(ancestor_id, ()))
+
+    @api.model
+    def get_descendants(self, model_names, parent_ids):
+        """
+        Descend la hiérarchie depuis `parent_ids` en suivant `model_names`
+        (du premier niveau enfant au niveau voulu).
+
+        :return: ids du dernier niveau, dans l'ordre du modèle
+        """
+        tree = self._get_tree()
+        ids = list(parent_ids)
+        for model_name in model_names:
+            children = tree[model_name]['children']
+            ids = [child_id for parent_id in ids for child_id in children.get(parent_id, ())]
+        return ids
+
+    @api.model
+    def get_cache_stats(self):
+        """ Compteurs du worker courant : {'hits', 'misses', 'version'}. """
+        with _cache_lock:
+            cached = _cache.get(self.env.cr.dbname)
+            return dict(_cache_stats, version=cached[0] if cached else None)
+
+
+class WorkflowReferentialMixin(models.AbstractModel):
+    """
+    Colonne change_txid des modèles du référentiel : transaction de la
+    dernière création / modification de chaque ligne, tenue par trigger
+    (ORM et SQL direct), lue par le cache du référentiel.
+    """
+    _name = 'workflow.referential.mixin'
+    _description = 'Version des lignes du référentiel workflow'
+
+    def init(self):
+        if self._abstract:
+            return
+        cr = self.env.cr
+        cr.execute(f'ALTER TABLE "{self._table}" ADD COLUMN IF NOT EXISTS change_txid BIGINT')
+        cr.execute(f"""
+            CREATE OR REPLACE FUNCTION {CHANGE_TXID_FUNCTION}() RETURNS trigger AS $$
+            BEGIN
+                NEW.change_txid := txid_current();
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        trigger_name = f'{self._table}_change_txid'
+        cr.execute("SELECT 1 FROM pg_trigger WHERE tgname = %s AND tgrelid = %s::regclass",
+                   [trigger_name, self._table])
+        if not cr.fetchone():
+            cr.execute(f"""
+                CREATE TRIGGER "{trigger_name}" BEFORE INSERT OR UPDATE ON "{self._table}"
+                FOR EACH ROW EXECUTE PROCEDURE {CHANGE_TXID_FUNCTION}()
+            """)
+        cr.execute(f'CREATE INDEX IF NOT EXISTS "{self._table}_change_txid_idx" ON "{self._table}" (change_txid)')
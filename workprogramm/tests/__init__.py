@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+
+from . import test_form_options
+from . import test_project_constraints
+from . import test_work_program_import
+from . import test_work_program_streaming_import
+from . import test_work_program_submission
+from . import test_work_program_transition
+from . import test_workflow_hierarchy_import
+from . import test_workflow_hierarchy_filters
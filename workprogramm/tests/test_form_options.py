@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import HttpCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestFormOptions(HttpCase):
+
+    def test_options_not_modified(self):
+        """ Un ETag renvoyé dans If-None-Match donne une réponse 304 sans contenu. """
+        url = '/work_program/form/options/departments'
+        response = self.url_open(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers.get('ETag')
+        self.assertTrue(etag)
+
+        response = self.url_open(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.content)
+
+    def test_options_modified(self):
+        """ Un ETag inconnu donne la liste complète. """
+        response = self.url_open('/work_program/form/options/departments', headers={'If-None-Match': '"obsolete"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('options', response.json())
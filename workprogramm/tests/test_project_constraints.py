@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from odoo.exceptions import ValidationError
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestProjectConstraints(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Project = cls.env['project.project']
+        cls.internal_department, cls.external_department = cls.env['hr.department'].create([
+            {'name': 'Projet Dpt Interne', 'dpt_type': 'internal'},
+            {'name': 'Projet Dpt Externe', 'dpt_type': 'external'},
+        ])
+        cls.practice = cls.env['practice.practice'].create({'name': 'Projet Practice', 'type': 'consulting'})
+
+    def test_departments_batch(self):
+        """ Un lot de projets de types différents est validé ; un seul département incohérent bloque le lot. """
+        internal, external = self.Project.create([
+            {'name': 'CSTR-INT', 'project_type': 'internal',
+             'test_department_ids': [(6, 0, self.internal_department.ids)]},
+            {'name': 'CSTR-EXT', 'project_type': 'external',
+             'test_department_ids': [(6, 0, self.external_department.ids)], 'practice_id': self.practice.id},
+        ])
+        self.assertEqual(external.practice_id, self.practice)
+
+        with self.assertRaises(ValidationError):
+            (internal | external).write({'test_department_ids': [(4, self.external_department.id)]})
+
+        with self.assertRaises(ValidationError):
+            self.Project.create([
+                {'name': 'CSTR-OK', 'project_type': 'internal'},
+                {'name': 'CSTR-KO', 'project_type': 'internal',
+                 'test_department_ids': [(6, 0, self.external_department.ids)]},
+            ])
+
+    def test_practice_external_only(self):
+        """ Une practice sur un projet interne est refusée par la contrainte Python, même en lot. """
+        projects = self.Project.create([
+            {'name': 'CSTR-P1', 'project_type': 'external'},
+            {'name': 'CSTR-P2', 'project_type': 'internal'},
+        ])
+        with self.assertRaises(ValidationError):
+            projects.write({'practice_id': self.practice.id})
+
+        projects[0].practice_id = self.practice
+        with self.assertRaises(ValidationError):
+            projects[0].project_type = 'internal'
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestWorkProgramBulkImport(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.WorkProgram = cls.env['work.program']
+        cls.department = cls.env['hr.department'].create({'name': 'Import Dpt'})
+        cls.employee = cls.env['hr.employee'].create({'name': 'Import Responsable'})
+        cls.existing = cls.WorkProgram.create({'name': 'IMPORT-EXISTING', 'comments': 'avant'})
+
+    def _row(self, name, **values):
+        row = {'Task Description': name, 'Departments': 'Import Dpt', 'Responsible': 'Import Responsable'}
+        row.update(values)
+        return row
+
+    def test_update_create_split(self):
+        """ Une référence existante est mise à jour, une référence inconnue est créée. """
+        report = self.WorkProgram.import_work_programs([
+            self._row('IMPORT-EXISTING', **{'Priority': 'High'}),
+            self._row('IMPORT-NEW'),
+        ])
+        self.assertEqual([line['status'] for line in report], ['updated', 'created'])
+        self.assertEqual(report[0]['id'], self.existing.id)
+        self.assertEqual(self.existing.priority, 'high')
+        self.assertEqual(self.existing.work_programm_department_id, self.department)
+
+        created = self.WorkProgram.browse(report[1]['id'])
+        self.assertEqual(created.name, 'IMPORT-NEW')
+        self.assertEqual(created.responsible_id, self.employee)
+
+    def test_duplicate_rows_merged(self):
+        """ Une référence présente deux fois donne un seul programme, avec la dernière valeur. """
+        report = self.WorkProgram.import_work_programs([
+            self._row('IMPORT-DUP', **{'Priority': 'Low'}),
+            self._row('IMPORT-DUP', **{'Complexity': 'High'}),
+        ])
+        self.assertEqual([line['status'] for line in report], ['created', 'created'])
+        self.assertEqual(report[0]['id'], report[1]['id'])
+        program = self.WorkProgram.search([('name', '=', 'IMPORT-DUP')])
+        self.assertEqual(len(program), 1)
+        self.assertEqual((program.priority, program.complexity), ('low', 'high'))
+
+    def test_identical_updates_grouped(self):
+        """ Deux mises à jour aux valeurs identiques sont toutes deux appliquées. """
+        other = self.WorkProgram.create({'name': 'IMPORT-EXISTING-2'})
+        report = self.WorkProgram.import_work_programs([
+            self._row('IMPORT-EXISTING', **{'Comments / Remarques / Problems encountered / Additionals informations': 'après'}),
+            self._row('IMPORT-EXISTING-2', **{'Comments / Remarques / Problems encountered / Additionals informations': 'après'}),
+        ])
+        self.assertEqual([line['status'] for line in report], ['updated', 'updated'])
+        self.assertEqual((self.existing | other).mapped('comments'), ['après', 'après'])
+
+    def test_invalid_row_isolated(self):
+        """ Une ligne invalide est signalée sans empêcher la création des autres lignes du lot. """
+        report = self.WorkProgram.import_work_programs([
+            self._row('IMPORT-OK-1'),
+            self._row('IMPORT-KO', **{'% of completion': '150'}),
+            self._row('IMPORT-OK-2'),
+            self._row('IMPORT-BAD-STATE', **{'Status': 'unknown'}),
+        ])
+        self.assertEqual([line['status'] for line in report], ['created', 'error', 'created', 'error'])
+        self.assertTrue(report[1]['message'])
+        self.assertEqual(self.WorkProgram.search_count([('name', 'in', ['IMPORT-OK-1', 'IMPORT-OK-2'])]), 2)
+        self.assertFalse(self.WorkProgram.search([('name', '=like', 'ERREUR-IMPORT-%')]))
+        self.assertFalse(self.WorkProgram.search([('name', 'in', ['IMPORT-KO', 'IMPORT-BAD-STATE'])]))
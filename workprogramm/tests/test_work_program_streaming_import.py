@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import base64
+import csv
+import io
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestWorkProgramStreamingImport(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        # Le traitement committe après chaque lot : neutralisé pour garder le test dans sa transaction
+        self.patch(self.env.cr, 'commit', lambda: None)
+
+    def _create_import(self, rows, chunk_size):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=['Task Description', '% of completion'])
+        writer.writeheader()
+        writer.writerows(rows)
+        return self.env['work.program.import'].create({
+            'file': base64.b64encode(buffer.getvalue().encode('utf-8')),
+            'file_name': 'programmes.csv',
+            'chunk_size': chunk_size,
+        })
+
+    def test_resume_from_offset(self):
+        """ Un import interrompu reprend au premier lot non committé, sans réimporter les précédents. """
+        names = [f'STREAM-{index}' for index in range(5)]
+        record = self._create_import([{'Task Description': name, '% of completion': '10'} for name in names], 2)
+
+        self.assertFalse(record._run_import(max_chunks=1))
+        self.assertEqual((record.state, record.offset, record.nb_created), ('running', 2, 2))
+
+        # Les lignes déjà traitées ne sont plus lues comme des créations
+        self.env['work.program'].search([('name', 'in', names[:2])]).write({'comments': 'déjà importé'})
+        self.assertTrue(record._run_import())
+        self.assertEqual((record.state, record.offset, record.nb_created, record.nb_updated), ('done', 5, 5, 0))
+        programs = self.env['work.program'].search([('name', 'in', names)])
+        self.assertEqual(len(programs), 5)
+        self.assertEqual(programs.filtered(lambda program: program.name in names[:2]).mapped('comments'),
+                         ['déjà importé', 'déjà importé'])
+
+    def test_error_log_capped(self):
+        """ Le journal ne dépasse pas MAX_ERROR_LINES lignes, même au milieu d'un lot ; nb_errors compte tout. """
+        rows = [{'Task Description': f'STREAM-KO-{index}', '% of completion': '150'} for index in range(5)]
+        record = self._create_import(rows, 10)
+        with patch('odoo.addons.workprogramm.models.work_program_import.MAX_ERROR_LINES', 3):
+            self.assertTrue(record._run_import())
+        self.assertEqual(record.nb_errors, 5)
+        self.assertEqual(record.error_log.count('\n'), 3)
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import mute_logger
+
+
+@tagged('post_install', '-at_install')
+class TestWorkProgramSubmission(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.WorkProgram = cls.env['work.program']
+        cls.project = cls.env['project.project'].create({'name': 'Soumission Projet'})
+
+    def _payload(self, key, **values):
+        payload = {'idempotency_key': key, 'project_id': self.project.id, 'comments': key}
+        payload.update(values)
+        return payload
+
+    def test_replayed_keys(self):
+        """ Une clé rejouée, dans un autre lot ou plus bas dans le même lot, renvoie le programme existant. """
+        first = self.WorkProgram.submit_work_programs([self._payload('SUB-1'), self._payload('SUB-2')])
+        self.assertEqual([line['status'] for line in first], ['created', 'created'])
+
+        replay = self.WorkProgram.submit_work_programs([
+            self._payload('SUB-1'),
+            self._payload('SUB-3'),
+            self._payload('SUB-3'),
+        ])
+        self.assertEqual([line['status'] for line in replay], ['existing', 'created', 'existing'])
+        self.assertEqual(replay[0]['id'], first[0]['id'])
+        self.assertEqual(replay[2]['id'], replay[1]['id'])
+        self.assertEqual(self.WorkProgram.search_count([('submission_key', 'in', ['SUB-1', 'SUB-2', 'SUB-3'])]), 3)
+
+    def test_replayed_key_of_invalid_submission(self):
+        """ Une clé répétée derrière une soumission en erreur est signalée en erreur, sans création. """
+        report = self.WorkProgram.submit_work_programs([
+            self._payload('SUB-KO', project_id=0x7FFFFFFF),
+            self._payload('SUB-KO'),
+        ])
+        self.assertEqual([line['status'] for line in report], ['error', 'error'])
+        self.assertFalse(self.WorkProgram.search([('submission_key', '=', 'SUB-KO')]))
+
+    def test_concurrent_key(self):
+        """ Une clé committée par une soumission concurrente après la recherche initiale est rapportée 'existing'. """
+        concurrent = self.WorkProgram.create({'name': 'SUB-CONCURRENT', 'submission_key': 'SUB-RACE'})
+        WorkProgramModel = type(self.WorkProgram)
+        original_search_read = WorkProgramModel.search_read
+
+        def search_read(model, domain=None, fields=None, **kwargs):
+            # La soumission concurrente n'est pas encore visible lors de la recherche des clés connues
+            if domain and domain[0][0] == 'submission_key':
+                return []
+            return original_search_read(model, domain, fields, **kwargs)
+        self.patch(WorkProgramModel, 'search_read', search_read)
+        # Lue dans une autre transaction, qui ne voit pas les données non committées du test
+        self.patch(WorkProgramModel, '_get_committed_submission', lambda model, key: concurrent.id)
+
+        with mute_logger('odoo.sql_db'):
+            report = self.WorkProgram.submit_work_programs([self._payload('SUB-RACE'), self._payload('SUB-AFTER')])
+        self.assertEqual([line['status'] for line in report], ['existing', 'created'])
+        self.assertEqual(report[0]['id'], concurrent.id)
+        self.assertEqual(self.WorkProgram.search_count([('submission_key', '=', 'SUB-RACE')]), 1)
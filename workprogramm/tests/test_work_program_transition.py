@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+from odoo.exceptions import UserError
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestWorkProgramTransition(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.WorkProgram = cls.env['work.program']
+        cls.partner_1, cls.partner_2 = cls.env['res.partner'].create([{'name': 'Abonné 1'}, {'name': 'Abonné 2'}])
+        cls.programs = cls.WorkProgram.create([{'name': f'TRANS-{index}'} for index in range(3)])
+        cls.programs.message_subscribe(partner_ids=cls.partner_1.ids)
+        cls.programs[0].message_subscribe(partner_ids=cls.partner_2.ids)
+
+    def _patch_notify(self):
+        notifications = []
+
+        def message_notify(model, partner_ids=None, subject=None, body=None, **kwargs):
+            notifications.append((tuple(partner_ids), body))
+        self.patch(type(self.WorkProgram), 'message_notify', message_notify)
+        return notifications
+
+    def _tracking_count(self, programs):
+        # Le suivi du chatter est finalisé juste avant le commit
+        self.env.cr.precommit.run()
+        return self.env['mail.tracking.value'].search_count([
+            ('mail_message_id.model', '=', self.WorkProgram._name),
+            ('mail_message_id.res_id', 'in', programs.ids),
+        ])
+
+    def test_preconditions(self):
+        """ Un seul programme dans un état non autorisé bloque tout le lot. """
+        self.programs[:2].action_start()
+        self.programs[:2].action_submit_for_validation()
+        with self.assertRaises(UserError):
+            self.programs.action_validate()
+        self.assertEqual(self.programs.mapped('state'), ['to_validate', 'to_validate', 'draft'])
+
+        self.programs[0].action_done()
+        with self.assertRaises(UserError):
+            self.programs.action_mark_incomplete()
+        self.assertEqual(self.programs.mapped('state'), ['done', 'to_validate', 'draft'])
+
+    def test_batch_digest(self):
+        """ Un lot notifie chaque abonné une seule fois avec ses programmes, sans suivi par programme. """
+        notifications = self._patch_notify()
+        action = self.programs.action_start()
+        self.assertEqual(action, {'type': 'ir.actions.client', 'tag': 'soft_reload'})
+        self.assertEqual(self.programs.mapped('state'), ['ongoing'] * 3)
+
+        body_by_partner = dict(notifications)
+        self.assertEqual(len(notifications), 2)
+        self.assertEqual(set(body_by_partner), {(self.partner_1.id,), (self.partner_2.id,)})
+        self.assertTrue(all(program.name in body_by_partner[(self.partner_1.id,)] for program in self.programs))
+        self.assertNotIn(self.programs[1].name, body_by_partner[(self.partner_2.id,)])
+        self.assertEqual(self._tracking_count(self.programs), 0)
+        self.assertEqual(self.env['work.program.transition'].search_count([
+            ('program_id', 'in', self.programs.ids), ('to_state', '=', 'ongoing'),
+        ]), 3)
+
+    def test_single_record_tracked(self):
+        """ Un programme seul garde le suivi standard du chatter, sans notification récapitulative. """
+        notifications = self._patch_notify()
+        self.programs[0].action_start()
+        self.assertFalse(notifications)
+        self.assertEqual(self._tracking_count(self.programs[0]), 1)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestWorkflowHierarchyFilters(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.domain_1, cls.domain_2 = cls.env['workflow.domain'].create([{'name': 'FLT-D1'}, {'name': 'FLT-D2'}])
+        cls.process_1, cls.process_2 = cls.env['workflow.process'].create([
+            {'name': 'FLT-P1', 'domain_id': cls.domain_1.id},
+            {'name': 'FLT-P2', 'domain_id': cls.domain_2.id},
+        ])
+        cls.subprocess_1 = cls.env['workflow.subprocess'].create({'name': 'FLT-S1', 'process_id': cls.process_1.id})
+        cls.subprocess_2 = cls.env['workflow.subprocess'].create({'name': 'FLT-S2', 'process_id': cls.process_2.id})
+        cls.activity_1 = cls.env['workflow.activity'].create({'name': 'FLT-A1', 'sub_process_id': cls.subprocess_1.id})
+        cls.activity_2 = cls.env['workflow.activity'].create({'name': 'FLT-A2', 'sub_process_id': cls.subprocess_2.id})
+        cls.procedure_1 = cls.env['workflow.procedure'].create({'name': 'FLT-R1', 'activity_id': cls.activity_1.id})
+
+    def _create_entry(self, name, **vals):
+        return self.env['workflow.hierarchy'].create(dict(name=name, **vals))
+
+    def test_filtered_elements(self):
+        """ Chaque niveau ne propose que les descendants de la sélection valide du niveau supérieur. """
+        entry = self._create_entry(
+            'FLT-H1',
+            domain_ids=[(6, 0, self.domain_1.ids)],
+            process_ids=[(6, 0, (self.process_1 | self.process_2).ids)],
+            sub_process_ids=[(6, 0, (self.subprocess_1 | self.subprocess_2).ids)],
+            activity_ids=[(6, 0, self.activity_1.ids)],
+        )
+        self.assertEqual(entry.filtered_process_ids, self.process_1)
+        self.assertEqual(entry.filtered_subprocess_ids, self.subprocess_1)
+        self.assertEqual(entry.filtered_activity_ids, self.activity_1)
+        self.assertEqual(entry.filtered_procedure_ids, self.procedure_1)
+
+    def test_filtered_elements_batch(self):
+        """ Le calcul ensembliste donne à chaque entrée d'un lot ses propres éléments valides. """
+        entry_1 = self._create_entry('FLT-H2', domain_ids=[(6, 0, self.domain_1.ids)])
+        entry_2 = self._create_entry('FLT-H3', domain_ids=[(6, 0, self.domain_2.ids)])
+        entries = entry_1 | entry_2
+        entries.invalidate_cache()
+        self.assertEqual([entry.filtered_process_ids for entry in entries], [self.process_1, self.process_2])
+
+    def test_prune_is_explicit(self):
+        """ Créer ou modifier une entrée ne retire rien de sa sélection ; le nettoyage est une action. """
+        entries = self._create_entry(
+            'FLT-H4',
+            domain_ids=[(6, 0, self.domain_1.ids)],
+            process_ids=[(6, 0, (self.process_1 | self.process_2).ids)],
+            sub_process_ids=[(6, 0, (self.subprocess_1 | self.subprocess_2).ids)],
+        ) | self._create_entry(
+            'FLT-H5',
+            domain_ids=[(6, 0, self.domain_1.ids)],
+            process_ids=[(6, 0, (self.process_1 | self.process_2).ids)],
+            sub_process_ids=[(6, 0, (self.subprocess_1 | self.subprocess_2).ids)],
+        )
+        entries.write({'activity_ids': [(6, 0, (self.activity_1 | self.activity_2).ids)]})
+        for entry in entries:
+            self.assertEqual(entry.process_ids, self.process_1 | self.process_2)
+            self.assertEqual(entry.activity_ids, self.activity_1 | self.activity_2)
+
+        entries.action_prune_selections()
+        for entry in entries:
+            self.assertEqual(entry.process_ids, self.process_1)
+            self.assertEqual(entry.sub_process_ids, self.subprocess_1)
+            self.assertEqual(entry.activity_ids, self.activity_1)
+            self.assertEqual(entry.domain_ids, self.domain_1)
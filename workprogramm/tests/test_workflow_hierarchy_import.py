@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+from odoo import api
+from odoo.exceptions import ValidationError
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestWorkflowHierarchyImport(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Hierarchy = cls.env['workflow.hierarchy']
+
+    def test_names_created_once(self):
+        """ Un nom répété dans le fichier est créé une seule fois ; une entrée répétée est fusionnée. """
+        report = self.Hierarchy.import_hierarchies([
+            {'name': 'H-1', 'domain': 'IMP-D1', 'deliverable': 'IMP-L1, IMP-L2'},
+            {'name': 'H-2', 'domain': 'IMP-D1', 'deliverable': 'IMP-L2'},
+            {'name': 'H-1', 'domain': 'IMP-D1', 'deliverable': 'IMP-L1', 'notes': 'fusion'},
+        ])
+        self.assertEqual([line['status'] for line in report], ['created'] * 3)
+        self.assertEqual(report[0]['id'], report[2]['id'])
+        self.assertEqual(self.env['workflow.domain'].search_count([('name', '=', 'IMP-D1')]), 1)
+        self.assertEqual(self.env['workflow.deliverable'].search_count([('name', 'in', ['IMP-L1', 'IMP-L2'])]), 2)
+
+        entry = self.Hierarchy.browse(report[0]['id'])
+        self.assertEqual(entry.deliverable_ids.mapped('name'), ['IMP-L1'])
+        self.assertEqual(entry.notes, 'fusion')
+
+    def test_existing_entries_updated(self):
+        """ Les entrées existantes (archivées comprises) sont mises à jour, les autres créées. """
+        active = self.Hierarchy.create({'name': 'H-ACTIVE'})
+        archived = self.Hierarchy.create({'name': 'H-ARCHIVED', 'active': False})
+        report = self.Hierarchy.import_hierarchies([
+            {'name': 'H-ACTIVE', 'domain': 'IMP-D2'},
+            {'name': 'H-ARCHIVED', 'domain': 'IMP-D2', 'active': '0'},
+            {'name': 'H-NEW', 'domain': 'IMP-D2'},
+        ])
+        self.assertEqual([line['status'] for line in report], ['updated', 'updated', 'created'])
+        self.assertEqual([report[0]['id'], report[1]['id']], [active.id, archived.id])
+        self.assertEqual((active | archived).mapped('domain_ids.name'), ['IMP-D2'])
+
+    def test_rejected_name_isolated(self):
+        """ Un nom refusé à la création n'empêche ni la création des autres noms ni les autres lignes. """
+        Process = type(self.env['workflow.process'])
+        original_create = Process.create
+
+        @api.model_create_multi
+        def create(model, vals_list):
+            if any(vals.get('name') == 'IMP-P-KO' for vals in vals_list):
+                raise ValidationError("Nom refusé")
+            return original_create(model, vals_list)
+        self.patch(Process, 'create', create)
+
+        report = self.Hierarchy.import_hierarchies([
+            {'name': 'H-OK', 'process': 'IMP-P-OK'},
+            {'name': 'H-KO', 'process': 'IMP-P-KO'},
+        ])
+        self.assertEqual([line['status'] for line in report], ['created', 'error'])
+        self.assertIn('IMP-P-KO', report[1]['message'])
+        self.assertTrue(self.env['workflow.process'].search([('name', '=', 'IMP-P-OK')]))
+        self.assertFalse(self.Hierarchy.search([('name', '=', 'H-KO')]))
+
+    def test_single_row_import(self):
+        """ import_hierarchy passe par l'import en masse et ne crée pas d'entrée 'ERREUR-IMPORT-*'. """
+        entry = self.Hierarchy.import_hierarchy({'name': 'H-SINGLE', 'domain': 'IMP-D3'})
+        self.assertEqual(entry.domain_ids.mapped('name'), ['IMP-D3'])
+        self.assertEqual(self.Hierarchy.import_hierarchy({'name': 'H-SINGLE', 'domain': 'IMP-D3'}), entry)
+        self.assertFalse(self.Hierarchy.with_context(active_test=False).search([('name', '=like', 'ERREUR-IMPORT-%')]))